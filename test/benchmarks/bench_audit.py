@@ -0,0 +1,71 @@
+"""
+Publishing cost of AUTHORIZATION.RESULTS events when the EventLogger logs
+them as they are published, and when it queues them for async audit.
+
+Records are formatted by the JSONFormatter and written to os.devnull, so that
+the cost measured on the publishing thread is that of serializing and
+formatting.  In async mode, the queue's counters are reported once it drains.
+
+Run from the project root with a settings file available:
+
+    YOSAI_CORE_SETTINGS=/path/to/settings.yaml \\
+        python -m test.benchmarks.bench_audit
+"""
+import argparse
+import logging
+import os
+import time
+
+from yosai.core import (
+    DefaultPermission,
+    DirectEventBus,
+    EventLogger,
+    SimpleIdentifierCollection,
+)
+from yosai.core.logging.formatters import JSONFormatter
+
+
+def run(event_bus, messages):
+    identifiers = SimpleIdentifierCollection(source_name='AccountStoreRealm',
+                                             identifier='thedude')
+    items = [(DefaultPermission(wildcard_string='domain:action{0}:target'.
+                                format(index)), True) for index in range(3)]
+    publish = event_bus.publish
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        publish('AUTHORIZATION.RESULTS', identifiers=identifiers, items=items)
+    elapsed = time.perf_counter() - start
+    return elapsed / messages * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=1000)
+    args = parser.parse_args()
+
+    stream = open(os.devnull, 'w')
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    audit_logger = logging.getLogger('yosai.core.event.event')
+    audit_logger.addHandler(handler)
+    audit_logger.setLevel(logging.INFO)
+    audit_logger.propagate = False
+
+    event_bus = DirectEventBus()
+    event_logger = EventLogger(event_bus)
+
+    cost = run(event_bus, args.messages)
+    print('{0:<8} {1:>8.1f} usec per event'.format('sync', cost))
+
+    event_logger.enable_async_audit(max_events=args.messages)
+    cost = run(event_bus, args.messages)
+    print('{0:<8} {1:>8.1f} usec per event'.format('async', cost))
+    event_logger.audit_queue.flush()
+    print(event_logger.audit_counters)
+    event_logger.disable_async_audit()
+    stream.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Publishing throughput of the DirectEventBus against the pypubsub proxy.
+
+Each bus publishes an AUTHORIZATION.RESULTS-like message, carrying the same
+keyword arguments as the authorizer's, to a topic without listeners, with one
+listener and with four listeners.  The listeners are bound methods that do
+nothing, so that the cost measured is that of dispatch alone.
+
+Run from the project root with a settings file available:
+
+    YOSAI_CORE_SETTINGS=/path/to/settings.yaml \\
+        python -m test.benchmarks.bench_event_bus
+"""
+import argparse
+import time
+
+from yosai.core import (
+    DefaultEventBus,
+    DirectEventBus,
+)
+
+
+class Listener:
+
+    def listen(self, identifiers=None, items=None):
+        pass
+
+
+def run(event_bus, topic_name, messages):
+    identifiers = 'thedude'
+    items = [('domain:action:target', True)]
+    publish = event_bus.publish
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        publish(topic_name, identifiers=identifiers, items=items)
+    elapsed = time.perf_counter() - start
+    return messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+
+    listeners = [Listener() for _ in range(4)]  # kept alive for either bus
+
+    for name, event_bus in (('pypubsub proxy', DefaultEventBus()),
+                            ('direct', DirectEventBus())):
+        for count in (0, 1, 4):
+            topic_name = 'BENCHMARK.LISTENERS{0}'.format(count)
+            for listener in listeners[:count]:
+                event_bus.register(listener.listen, topic_name)
+
+            rate = run(event_bus, topic_name, args.messages)
+            print('{0:<16} {1} listeners {2:>14,.0f} messages/sec'.format(
+                name, count, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Memory footprint benchmark for sessions and permissions.
+
+Reports the bytes allocated per instance, as measured by tracemalloc, for a
+SimpleSession holding an authenticated identity, along with its session key,
+and for a DefaultPermission.
+
+Run from the project root with a settings file available:
+
+    YOSAI_CORE_SETTINGS=/path/to/settings.yaml \\
+        python -m test.benchmarks.bench_memory
+"""
+import argparse
+import gc
+import tracemalloc
+
+from yosai.core import (
+    DefaultPermission,
+    DefaultSessionKey,
+    SimpleIdentifierCollection,
+    SimpleSession,
+)
+
+
+def make_session(index):
+    session = SimpleSession(host='127.0.0.1')
+    session.session_id = 'session{0:032d}'.format(index)
+    identifiers = SimpleIdentifierCollection(
+        source_name='AccountStoreRealm', identifier='user{0}'.format(index))
+    session.set_internal_attribute('identifiers_session_key', identifiers)
+    session.set_internal_attribute('authenticated_session_key', True)
+    return session, DefaultSessionKey(session.session_id)
+
+
+def make_permission(index):
+    return DefaultPermission('domain{0}:read,write:{0}'.format(index % 100))
+
+
+def measure(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory(index) for index in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=100000,
+                        help='instances created per measurement')
+    args = parser.parse_args()
+
+    for name, factory in [('session', make_session),
+                          ('permission', make_permission)]:
+        size = measure(factory, args.count)
+        print('{0:<12} {1:>8,.0f} bytes'.format(name, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Multi-threaded throughput benchmark for MemorySessionStore.
+
+Each thread repeatedly creates a session, reads it back several times,
+updates it and finally deletes it, as a request-handling thread would.  The
+benchmark compares a single shard, which behaves like one globally locked
+dict, with the default number of shards.  A capacity-bounded store is also
+measured with sessions that are abandoned rather than deleted, so that it
+evicts continuously.
+
+Run from the project root with a settings file available:
+
+    YOSAI_CORE_SETTINGS=/path/to/settings.yaml \\
+        python -m test.benchmarks.bench_session_store
+"""
+import argparse
+import threading
+import time
+
+from yosai.core import (
+    MemorySessionStore,
+    SimpleSession,
+    event_bus,
+)
+
+
+def worker(store, operations, reads_per_session, delete):
+    for _ in range(operations):
+        session_id = store.create(SimpleSession())
+        for _ in range(reads_per_session):
+            session = store.read(session_id)
+        store.update(session)
+        if delete:
+            store.delete(session)
+
+
+def run(store, threads, operations, reads_per_session, delete=True):
+    workers = [threading.Thread(target=worker,
+                                args=(store, operations, reads_per_session,
+                                      delete))
+               for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # create + reads + update (+ delete):
+    total = threads * operations * (reads_per_session + 2 + delete)
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=5000,
+                        help='sessions created per thread')
+    parser.add_argument('--reads', type=int, default=5,
+                        help='reads per session')
+    args = parser.parse_args()
+
+    bounded = MemorySessionStore(max_sessions=1000)
+    bounded.event_bus = event_bus  # evictions publish SESSION.EXPIRE
+
+    scenarios = [('1 shard', MemorySessionStore(shard_count=1), True),
+                 ('16 shards', MemorySessionStore(), True),
+                 ('16 shards, evicting at 1000', bounded, False)]
+
+    for name, store, delete in scenarios:
+        ops = run(store, args.threads, args.operations, args.reads, delete)
+        print('{0:<32} {1:>12,.0f} ops/sec'.format(name, ops))
+
+
+if __name__ == '__main__':
+    main()
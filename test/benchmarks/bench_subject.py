@@ -0,0 +1,108 @@
+"""
+Per-request cost of building a Subject within an existing session.
+
+Each request builds a Subject from a session id, as a web request presenting
+a session cookie would, for an authenticated and for an anonymous session.
+Builds that resume the subject's state from a single session lookup are
+compared with the full resolution path, which looks the session up for each
+piece of subject state and saves the subject afterwards.  Sessions are held
+by a MemorySessionStore, whose reads and updates are counted.
+
+Run from the project root with a settings file available:
+
+    YOSAI_CORE_SETTINGS=/path/to/settings.yaml \\
+        python -m test.benchmarks.bench_subject
+"""
+import argparse
+import time
+
+from yosai.core import (
+    AccountStoreRealm,
+    DefaultNativeSessionManager,
+    DefaultSessionContext,
+    MemorySessionStore,
+    NativeSecurityManager,
+    SecurityUtils,
+    SimpleIdentifierCollection,
+    SubjectBuilder,
+    account_abcs,
+    event_bus,
+)
+
+
+class CountingSessionStore(MemorySessionStore):
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+        self.updates = 0
+
+    def read(self, session_id):
+        self.reads += 1
+        return super().read(session_id)
+
+    def update(self, session):
+        self.updates += 1
+        return super().update(session)
+
+
+def security_utils(session_store):
+    realm = AccountStoreRealm(name='AccountStoreRealm',
+                              account_store=account_abcs.AccountStore())
+    session_manager = DefaultNativeSessionManager()
+    session_manager.session_handler.session_store = session_store
+    security_manager = NativeSecurityManager(realms=(realm,),
+                                             session_manager=session_manager)
+    security_manager.event_bus = event_bus
+    return SecurityUtils(security_manager)
+
+
+def start_session(security_manager, authenticated):
+    session = security_manager.session_manager.start(DefaultSessionContext())
+    if authenticated:
+        identifiers = SimpleIdentifierCollection(
+            source_name='AccountStoreRealm', identifier='thedude')
+        session.set_internal_attribute('identifiers_session_key',
+                                       identifiers)
+        session.set_internal_attribute('authenticated_session_key', True)
+    return session.session_id
+
+
+def run(su, session_store, session_id, requests):
+    security_manager = su.security_manager
+    session_store.reads = session_store.updates = 0
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        SubjectBuilder(security_utils=su, security_manager=security_manager,
+                       session_id=session_id).build_subject()
+    elapsed = time.perf_counter() - start
+
+    return (elapsed / requests * 1e6,
+            session_store.reads / requests,
+            session_store.updates / requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    for path in ('resumed', 'full resolution'):
+        session_store = CountingSessionStore()
+        su = security_utils(session_store)
+        if path == 'full resolution':
+            su.security_manager.is_resumable = lambda subject_context: False
+
+        for authenticated in (True, False):
+            session_id = start_session(su.security_manager, authenticated)
+            usec, reads, updates = run(su, session_store, session_id,
+                                       args.requests)
+            print('{0:<16} {1:<14} {2:>8.1f} usec/request {3:>5.1f} reads '
+                  '{4:>5.1f} updates'.format(
+                      path, 'authenticated' if authenticated else 'anonymous',
+                      usec, reads, updates))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,10 @@ from yosai.core import (
     AccountStoreRealm,
     AuthenticationException,
     AuthenticationEventException,
-    DefaultEventBus,
+    DirectEventBus,
+    ExcessiveAttemptsException,
+    IncorrectCredentialsException,
+    LoginAttemptLimiter,
     InvalidTokenPasswordException,
     MultiRealmAuthenticationException,
     UnsupportedTokenException,
@@ -319,7 +322,7 @@ def test_da_notify_failure(
     da = default_authenticator
     authc_token = username_password_token
 
-    with mock.patch.object(DefaultEventBus, 'publish') as eb_pub:
+    with mock.patch.object(DirectEventBus, 'publish') as eb_pub:
         eb_pub.return_value = None
 
         da.notify_failure(authc_token, 'throwable')
@@ -343,6 +346,73 @@ def test_da_notify_falure_raises(default_authenticator, monkeypatch):
     with pytest.raises(AuthenticationEventException):
         da.notify_failure('token', 'throwable')
 
+
+def test_da_authc_acct_throttled_skips_realms(
+        default_authenticator, username_password_token, monkeypatch):
+    """
+    unit tested:  authenticate_account
+
+    test case:
+    a throttled attempt raises ExcessiveAttemptsException without consulting
+    any realm and without being counted as another failure
+    """
+    da = default_authenticator
+    token = username_password_token
+    limiter = mock.create_autospec(LoginAttemptLimiter)
+    limiter.assert_attempt_allowed.side_effect = ExcessiveAttemptsException
+    monkeypatch.setattr(da, 'login_attempt_limiter', limiter)
+    monkeypatch.setattr(da, 'notify_failure', lambda x, y: None)
+
+    with mock.patch.object(da, 'do_authenticate_account') as mock_daa:
+        with pytest.raises(ExcessiveAttemptsException):
+            da.authenticate_account(token)
+
+        assert not mock_daa.called
+        assert not limiter.record_failure.called
+
+
+def test_da_authc_acct_failure_is_recorded(
+        default_authenticator, username_password_token, monkeypatch):
+    da = default_authenticator
+    token = username_password_token
+    limiter = mock.create_autospec(LoginAttemptLimiter)
+    monkeypatch.setattr(da, 'login_attempt_limiter', limiter)
+    monkeypatch.setattr(da, 'notify_failure', lambda x, y: None)
+
+    def raise_incorrect(x):
+        raise IncorrectCredentialsException
+
+    monkeypatch.setattr(da, 'do_authenticate_account', raise_incorrect)
+
+    with pytest.raises(AuthenticationException):
+        da.authenticate_account(token)
+
+    limiter.record_failure.assert_called_once_with(token)
+
+
+def test_da_authc_acct_success_clears_failures(
+        default_authenticator, username_password_token, monkeypatch,
+        full_mock_account):
+    da = default_authenticator
+    token = username_password_token
+    limiter = mock.create_autospec(LoginAttemptLimiter)
+    monkeypatch.setattr(da, 'login_attempt_limiter', limiter)
+    monkeypatch.setattr(da, 'do_authenticate_account',
+                        lambda x: full_mock_account)
+    monkeypatch.setattr(da, 'notify_success', lambda x: None)
+
+    da.authenticate_account(token)
+
+    limiter.clear.assert_called_once_with(token)
+
+
+def test_da_cache_handler_passes_through(default_authenticator, monkeypatch):
+    da = default_authenticator
+    limiter = LoginAttemptLimiter()
+    monkeypatch.setattr(da, 'login_attempt_limiter', limiter)
+    da.cache_handler = 'cachehandler'
+    assert limiter.cache_handler == 'cachehandler'
+
 # -----------------------------------------------------------------------------
 # Decorator Tests
 # -----------------------------------------------------------------------------
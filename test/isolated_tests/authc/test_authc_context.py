@@ -61,6 +61,21 @@ def test_generate_context_with_authc_items(cryptcontext_factory):
     result = ccf.generate_context(algorithm='sha256_crypt')
     assert len(result) > 1
 
+def test_generate_context_with_deprecated_algorithms(cryptcontext_factory):
+    """
+    test case:
+    deprecated algorithms are included as schemes, with their settings, while
+    the requested algorithm remains the default
+    """
+    ccf = cryptcontext_factory
+    result = ccf.generate_context(algorithm='bcrypt_sha256',
+                                  deprecated_algorithms=['bcrypt_sha256',
+                                                         'sha256_crypt'])
+    assert (result['schemes'] == ['bcrypt_sha256', 'sha256_crypt'] and
+            result['default'] == 'bcrypt_sha256' and
+            result['deprecated'] == ['sha256_crypt'] and
+            'sha256_crypt__default_rounds' in result)
+
 def test_create_crypt_context_with_algorithm(cryptcontext_factory):
     """
     test case:
@@ -100,3 +115,31 @@ def test_create_crypt_with_unsup_hash_algorithm(cryptcontext_factory):
     ccf = cryptcontext_factory
     with pytest.raises(CryptContextException):
         ccf.create_crypt_context(algorithm='blabla')
+
+def test_get_crypt_context_is_shared(cryptcontext_factory, monkeypatch):
+    """
+    unit tested:  get_crypt_context
+
+    test case:
+    a context is built once per configuration and then shared
+    """
+    ccf = cryptcontext_factory
+    monkeypatch.setattr(CryptContextFactory, '_registry', {})
+
+    with mock.patch.object(ccf, 'create_crypt_context',
+                           wraps=ccf.create_crypt_context) as mock_ccc:
+        first = ccf.get_crypt_context('sha256_crypt')
+        second = CryptContextFactory(ccf.authc_settings).\
+            get_crypt_context('sha256_crypt')
+        other = ccf.get_crypt_context('bcrypt_sha256')
+
+        assert (first is second and first is not other and
+                mock_ccc.call_count == 2)
+
+
+def test_clear_registry(cryptcontext_factory, monkeypatch):
+    ccf = cryptcontext_factory
+    monkeypatch.setattr(CryptContextFactory, '_registry', {})
+    first = ccf.get_crypt_context('sha256_crypt')
+    CryptContextFactory.clear_registry()
+    assert ccf.get_crypt_context('sha256_crypt') is not first
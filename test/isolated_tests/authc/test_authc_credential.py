@@ -1,14 +1,26 @@
 import pytest
+from unittest import mock
+from passlib.context import CryptContext
 
 from yosai.core import (
+    BoundedExecutor,
     Credential,
+    CryptContextFactory,
+    DefaultPasswordService,
+    ExecutorSaturatedException,
     IllegalStateException,
     MissingCredentialsException,
     PasswordVerifierInvalidAccountException,
     PasswordVerifierInvalidTokenException,
+    PasswordServiceSaturatedException,
     AllowAllCredentialsVerifier,
     PasswordVerifier,
     SimpleCredentialsVerifier,
+    VerifiedCredentialCache,
+)
+from yosai.core.authc.credential import (
+    verify_and_update_password,
+    verify_password,
 )
 
 # -----------------------------------------------------------------------------
@@ -54,6 +66,137 @@ def test_dpm_get_stored_password_fails(
     with pytest.raises(PasswordVerifierInvalidAccountException):
         dpm.get_stored_password(full_mock_account)
 
+def test_dpm_credentials_match_remembers_verification(
+        default_password_matcher, username_password_token, full_mock_account,
+        monkeypatch):
+    """
+    unit tested:  credentials_match
+
+    test case:
+    once verified, the same credentials skip the password service until the
+    identifier's verifications are cleared
+    """
+    dpm = default_password_matcher
+    monkeypatch.setattr(dpm, 'verified_credentials', VerifiedCredentialCache())
+
+    with mock.patch.object(dpm.password_service, 'passwords_match') as mock_pm:
+        mock_pm.return_value = True
+        assert dpm.credentials_match(username_password_token, full_mock_account)
+        assert dpm.credentials_match(username_password_token, full_mock_account)
+        assert mock_pm.call_count == 1
+
+        dpm.clear_verified_credentials(full_mock_account.account_id)
+        dpm.credentials_match(username_password_token, full_mock_account)
+        assert mock_pm.call_count == 2
+
+
+def test_dpm_credentials_match_doesnt_remember_failure(
+        default_password_matcher, username_password_token, full_mock_account,
+        monkeypatch):
+    dpm = default_password_matcher
+    monkeypatch.setattr(dpm, 'verified_credentials', VerifiedCredentialCache())
+
+    with mock.patch.object(dpm.password_service, 'passwords_match') as mock_pm:
+        mock_pm.return_value = False
+        assert not dpm.credentials_match(username_password_token,
+                                         full_mock_account)
+        assert not dpm.credentials_match(username_password_token,
+                                         full_mock_account)
+        assert mock_pm.call_count == 2
+
+
+def test_dpm_credentials_match_publishes_rehash(
+        default_password_matcher, username_password_token, full_mock_account,
+        monkeypatch):
+    """
+    unit tested:  credentials_match
+
+    test case:
+    with rehash_on_login enabled, a match against an outdated hash publishes
+    the replacement hash
+    """
+    dpm = default_password_matcher
+    monkeypatch.setattr(dpm.password_service, 'rehash_on_login', True)
+    monkeypatch.setattr(dpm, 'verified_credentials', None)
+    dpm.event_bus = mock.Mock()
+
+    with mock.patch.object(dpm.password_service,
+                           'verify_and_update') as mock_vau:
+        mock_vau.return_value = (True, 'new_hash')
+        assert dpm.credentials_match(username_password_token, full_mock_account)
+
+    dpm.event_bus.publish.assert_called_once_with(
+        'CREDENTIALS.REHASH', identifier=full_mock_account.account_id,
+        credential='new_hash')
+
+
+def test_dpm_credentials_match_current_hash_doesnt_publish(
+        default_password_matcher, username_password_token, full_mock_account,
+        monkeypatch):
+    dpm = default_password_matcher
+    monkeypatch.setattr(dpm.password_service, 'rehash_on_login', True)
+    monkeypatch.setattr(dpm, 'verified_credentials', None)
+    dpm.event_bus = mock.Mock()
+
+    with mock.patch.object(dpm.password_service,
+                           'verify_and_update') as mock_vau:
+        mock_vau.return_value = (True, None)
+        assert dpm.credentials_match(username_password_token, full_mock_account)
+
+    assert not dpm.event_bus.publish.called
+
+
+def test_dpm_notify_rehash_without_event_bus(default_password_matcher,
+                                             full_mock_account):
+    """
+    test case:
+    a missing event bus doesn't fail the login
+    """
+    dpm = default_password_matcher
+    dpm.event_bus = None
+    dpm.notify_rehash(full_mock_account, 'new_hash')
+
+# -----------------------------------------------------------------------------
+# VerifiedCredentialCache Tests
+# -----------------------------------------------------------------------------
+
+def test_vcc_digest_distinguishes_parts():
+    vcc = VerifiedCredentialCache()
+    assert (vcc.digest('ab', 'c', 'hash') != vcc.digest('a', 'bc', 'hash') and
+            vcc.digest('a', bytearray(b'pw'), 'hash') ==
+            vcc.digest('a', 'pw', b'hash'))
+
+
+def test_vcc_entries_expire():
+    vcc = VerifiedCredentialCache(ttl=60)
+    digest = vcc.digest('user', 'pw', 'hash')
+
+    with mock.patch('yosai.core.authc.credential.time.time') as mock_time:
+        mock_time.return_value = 1000.0
+        vcc.add('user', digest)
+        assert vcc.contains('user', digest)
+
+        mock_time.return_value = 1061.0
+        assert not vcc.contains('user', digest)
+
+
+def test_vcc_add_purges_when_full():
+    vcc = VerifiedCredentialCache(ttl=60, max_entries=2)
+
+    with mock.patch('yosai.core.authc.credential.time.time') as mock_time:
+        mock_time.return_value = 1000.0
+        vcc.add('user1', b'digest1')
+        vcc.add('user2', b'digest2')
+
+        mock_time.return_value = 1030.0
+        vcc.add('user3', b'digest3')  # both entries current:  starts over
+        assert list(vcc._entries) == ['user3']
+
+        mock_time.return_value = 1100.0
+        vcc.add('user4', b'digest4')
+        vcc.add('user5', b'digest5')  # user3 has expired
+        assert sorted(vcc._entries) == ['user4', 'user5']
+
 # -----------------------------------------------------------------------------
 # SimpleCredentialsVerifier Tests
 # -----------------------------------------------------------------------------
@@ -131,3 +274,122 @@ def test_scm_credentials_match_fails(
     monkeypatch.setattr(fma, '_credentials', 'ofmiceandmen')
     with pytest.raises(MissingCredentialsException):
         dscm.credentials_match(upt, fma)
+
+# -----------------------------------------------------------------------------
+# DefaultPasswordService Tests
+# -----------------------------------------------------------------------------
+
+def test_dps_passwords_match_inline(default_password_service, monkeypatch):
+    """
+    unit tested:  passwords_match
+
+    test case:
+    without a hashing_executor, verification runs on the calling thread
+    """
+    dps = default_password_service
+    monkeypatch.setattr(dps, 'hashing_executor', None)
+    with mock.patch.object(dps, 'verify_in_executor') as mock_vie:
+        dps.crypt_context = mock.create_autospec(CryptContext)
+        dps.crypt_context.verify.return_value = True
+        assert dps.passwords_match('secret', 'saved')
+        assert not mock_vie.called
+
+
+def test_dps_passwords_match_uses_executor(default_password_service,
+                                           monkeypatch):
+    dps = default_password_service
+    dps.crypt_context = CryptContext(schemes=['sha256_crypt'],
+                                     sha256_crypt__default_rounds=1000)
+    saved = dps.crypt_context.encrypt('secret')
+    executor = BoundedExecutor(max_workers=1, max_queue_depth=0)
+    monkeypatch.setattr(dps, 'hashing_executor', executor)
+
+    assert dps.passwords_match('secret', saved)
+    assert not dps.passwords_match('wrong', saved)
+    executor.shutdown()
+
+
+def test_dps_verify_in_executor_saturated_raises(default_password_service,
+                                                 monkeypatch):
+    dps = default_password_service
+    executor = mock.create_autospec(BoundedExecutor)
+    executor.use_processes = False
+    executor.submit.side_effect = ExecutorSaturatedException
+    monkeypatch.setattr(dps, 'hashing_executor', executor)
+
+    with pytest.raises(PasswordServiceSaturatedException):
+        dps.passwords_match('secret', 'saved')
+
+
+def test_verify_password_rebuilds_context():
+    crypt_context = CryptContext(schemes=['sha256_crypt'],
+                                 sha256_crypt__default_rounds=1000)
+    saved = crypt_context.encrypt('secret')
+    assert verify_password(crypt_context.to_string(), 'secret', saved)
+
+
+def test_dps_crypt_context_is_lazy_and_shared(monkeypatch):
+    """
+    unit tested:  crypt_context
+
+    test case:
+    a password service doesn't obtain its context until it is used, and then
+    obtains the shared one
+    """
+    with mock.patch.object(CryptContextFactory,
+                           'get_crypt_context') as mock_gcc:
+        mock_gcc.return_value = 'shared_context'
+        dps = DefaultPasswordService()
+        assert not mock_gcc.called
+        assert dps.crypt_context == 'shared_context'
+        assert DefaultPasswordService().crypt_context == 'shared_context'
+
+
+def test_dps_verify_and_update_replaces_deprecated_hash(
+        default_password_service):
+    """
+    unit tested:  verify_and_update
+
+    test case:
+    a hash created by a deprecated scheme is replaced by one created by the
+    default scheme, whereas a current hash is left alone
+    """
+    dps = default_password_service
+    dps.crypt_context = CryptContext(schemes=['sha256_crypt', 'md5_crypt'],
+                                     default='sha256_crypt',
+                                     deprecated=['md5_crypt'],
+                                     sha256_crypt__default_rounds=1000)
+    old_hash = dps.crypt_context.encrypt('secret', scheme='md5_crypt')
+
+    matched, new_hash = dps.verify_and_update('secret', old_hash)
+    assert matched and new_hash.startswith('$5$')
+
+    assert dps.verify_and_update('secret', new_hash) == (True, None)
+    assert dps.verify_and_update('wrong', old_hash) == (False, None)
+
+
+def test_dps_verify_and_update_uses_executor(default_password_service,
+                                             monkeypatch):
+    dps = default_password_service
+    dps.crypt_context = CryptContext(schemes=['sha256_crypt', 'md5_crypt'],
+                                     default='sha256_crypt',
+                                     deprecated=['md5_crypt'],
+                                     sha256_crypt__default_rounds=1000)
+    old_hash = dps.crypt_context.encrypt('secret', scheme='md5_crypt')
+    executor = BoundedExecutor(max_workers=1, max_queue_depth=0)
+    monkeypatch.setattr(dps, 'hashing_executor', executor)
+
+    matched, new_hash = dps.verify_and_update('secret', old_hash)
+    assert matched and new_hash.startswith('$5$')
+    executor.shutdown()
+
+
+def test_verify_and_update_password_rebuilds_context():
+    crypt_context = CryptContext(schemes=['sha256_crypt', 'md5_crypt'],
+                                 default='sha256_crypt',
+                                 deprecated=['md5_crypt'],
+                                 sha256_crypt__default_rounds=1000)
+    old_hash = crypt_context.encrypt('secret', scheme='md5_crypt')
+    matched, new_hash = verify_and_update_password(crypt_context.to_string(),
+                                                   'secret', old_hash)
+    assert matched and crypt_context.verify('secret', new_hash)
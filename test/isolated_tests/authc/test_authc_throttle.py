@@ -0,0 +1,134 @@
+import pytest
+from unittest import mock
+
+from yosai.core import (
+    ExcessiveAttemptsException,
+    LoginAttempts,
+    LoginAttemptLimiter,
+    UsernamePasswordToken,
+)
+
+# -----------------------------------------------------------------------------
+# LoginAttempts Tests
+# -----------------------------------------------------------------------------
+
+def test_la_add_discards_stale_and_excess():
+    """
+    unit tested:  add
+
+    test case:
+    only attempts within the window, and no more than the limit, are kept
+    """
+    la = LoginAttempts([1.0, 5.0, 6.0, 7.0])
+    la.add(8.0, since=4.0, limit=3)
+    assert la.timestamps == [6.0, 7.0, 8.0]
+
+
+def test_la_count_since():
+    la = LoginAttempts([1.0, 5.0, 6.0])
+    assert la.count_since(4.0) == 2
+
+
+def test_la_serialization_roundtrip():
+    la = LoginAttempts([1.5, 2.5])
+    assert LoginAttempts.deserialize(la.serialize()).timestamps == [1.5, 2.5]
+
+# -----------------------------------------------------------------------------
+# LoginAttemptLimiter Tests
+# -----------------------------------------------------------------------------
+
+@pytest.fixture(scope='function')
+def login_attempt_limiter():
+    return LoginAttemptLimiter(time_window=60, max_identifier_attempts=3,
+                               max_host_attempts=5)
+
+
+def make_token(username='user123', host='127.0.0.1'):
+    return UsernamePasswordToken(username=username, password='secret',
+                                 host=host)
+
+
+def test_lal_allows_until_identifier_limit(login_attempt_limiter):
+    """
+    unit tested:  assert_attempt_allowed, record_failure
+
+    test case:
+    failures for one identifier are throttled after max_identifier_attempts
+    """
+    lal = login_attempt_limiter
+    token = make_token()
+
+    for _ in range(3):
+        lal.assert_attempt_allowed(token)
+        lal.record_failure(token)
+
+    with pytest.raises(ExcessiveAttemptsException):
+        lal.assert_attempt_allowed(token)
+
+    # another identifier from the same host hasn't reached the host limit:
+    lal.assert_attempt_allowed(make_token(username='other'))
+
+
+def test_lal_throttles_host(login_attempt_limiter):
+    lal = login_attempt_limiter
+    for number in range(5):
+        lal.record_failure(make_token(username='user{0}'.format(number)))
+
+    with pytest.raises(ExcessiveAttemptsException):
+        lal.assert_attempt_allowed(make_token(username='fresh'))
+
+    lal.assert_attempt_allowed(make_token(username='fresh', host='10.0.0.1'))
+
+
+def test_lal_window_slides(login_attempt_limiter):
+    lal = login_attempt_limiter
+    token = make_token()
+
+    with mock.patch('yosai.core.authc.throttle.time.time') as mock_time:
+        mock_time.return_value = 1000.0
+        for _ in range(3):
+            lal.record_failure(token)
+
+        mock_time.return_value = 1061.0
+        lal.assert_attempt_allowed(token)
+
+
+def test_lal_clear_resets_identifier_only(login_attempt_limiter):
+    lal = login_attempt_limiter
+    token = make_token()
+    for _ in range(3):
+        lal.record_failure(token)
+
+    lal.clear(token)
+
+    lal.assert_attempt_allowed(token)
+    assert lal.get_attempts('host_login_attempts', '127.0.0.1')
+
+
+def test_lal_uses_cache_handler(login_attempt_limiter):
+    """
+    test case:
+    with a cache_handler, attempts are recorded in cache rather than memory
+    """
+    lal = login_attempt_limiter
+    cache_handler = mock.MagicMock()
+    cache_handler.get.return_value = None
+    lal.cache_handler = cache_handler
+
+    lal.record_failure(make_token())
+
+    domains = [call[1]['domain'] for call in cache_handler.set.call_args_list]
+    assert (domains == ['login_attempts', 'host_login_attempts'] and
+            not lal._attempts)
+
+
+def test_lal_purges_stale_memory_entries(login_attempt_limiter, monkeypatch):
+    lal = login_attempt_limiter
+    monkeypatch.setattr(lal, 'max_memory_entries', 2)
+    stale = LoginAttempts([1.0])
+    lal._attempts = {('login_attempts', 'a'): stale,
+                     ('login_attempts', 'b'): stale}
+
+    lal.record_failure(make_token(host=None))
+
+    assert list(lal._attempts) == [('login_attempts', 'user123')]
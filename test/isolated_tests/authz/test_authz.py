@@ -1,18 +1,21 @@
 import pytest
+import asyncio
 import collections
 from unittest import mock
 
 from yosai.core import (
     AccountStoreRealm,
     AuthorizationEventException,
+    AuthorizationResultsSampler,
     DefaultPermission,
-    DefaultEventBus,
+    DirectEventBus,
     IllegalStateException,
     IndexedAuthorizationInfo,
     IndexedPermissionVerifier,
     ModularRealmAuthorizer,
     PermissionIndexingException,
     PermissionResolver,
+    SecurityUtils,
     SimpleRole,
     UnauthorizedException,
     requires_permission,
@@ -200,6 +203,50 @@ def test_mra_is_permitted_fails(modular_realm_authorizer_patched, monkeypatch):
         assert set(results) == set([('permission1', False), ('permission2', False)])
 
 
+def test_mra_is_permitted_async_gathers_realms(
+        modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  is_permitted_async
+
+    test case:
+    - the realms' is_permitted_async are awaited concurrently
+    - a realm without is_permitted_async is consulted through is_permitted
+    - only one realm needs to grant a permission for it to be granted
+    """
+    mra = modular_realm_authorizer_patched
+    started = []
+
+    def make_is_permitted_async(granted):
+        async def is_permitted_async(identifiers, permission_s):
+            started.append(granted)
+            await asyncio.sleep(0)  # as would a cache round trip
+            assert len(started) == 2  # every realm was consulted meanwhile
+            return [(x, granted) for x in permission_s]
+        return is_permitted_async
+
+    def is_permitted_yields_false(identifiers, permission_s):
+        for x in permission_s:
+            yield (x, False)
+
+    # there are three realms set for this fixture:
+    monkeypatch.setattr(mra.realms[0], 'is_permitted_async',
+                        make_is_permitted_async(False), raising=False)
+    monkeypatch.setattr(mra.realms[1], 'is_permitted_async',
+                        make_is_permitted_async(True), raising=False)
+    monkeypatch.setattr(mra.realms[2], 'is_permitted', is_permitted_yields_false)
+
+    loop = asyncio.new_event_loop()
+    try:
+        with mock.patch.object(mra, 'notify_results') as mra_nr:
+            results = loop.run_until_complete(mra.is_permitted_async(
+                'identifiers', {'permission1', 'permission2'}))
+    finally:
+        loop.close()
+
+    assert results == frozenset([('permission1', True), ('permission2', True)])
+    mra_nr.assert_called_once_with('identifiers', mock.ANY)
+
+
 @pytest.mark.parametrize('mock_results, logical_operator, expected',
                          [({('permission1', True), ('permission2', True)}, all, True),
                           ({('permission1', True), ('permission2', False)}, all, False),
@@ -478,7 +525,8 @@ def test_mra_register_cache_clear_listener(modular_realm_authorizer_patched):
 
             calls = [mock.call(mra.session_clears_cache, 'SESSION.STOP'),
                      mock.call(mra.session_clears_cache, 'SESSION.EXPIRE'),
-                     mock.call(mra.authc_clears_cache, 'AUTHENTICATION.SUCCEEDED')]
+                     mock.call(mra.authc_clears_cache, 'AUTHENTICATION.SUCCEEDED'),
+                     mock.call(mra.authc_clears_cache, 'AUTHZ.CHANGED')]
 
             eb_r.assert_has_calls(calls)
             eb_ir.assert_has_calls(calls)
@@ -496,7 +544,7 @@ def test_mra_notify_results(modular_realm_authorizer_patched):
 
     topic = 'AUTHORIZATION.RESULTS'
 
-    with mock.patch.object(DefaultEventBus, 'publish') as eb_pub:
+    with mock.patch.object(DirectEventBus, 'publish') as eb_pub:
         eb_pub.return_value = None
 
         mra.notify_results('identifiers', items)
@@ -521,6 +569,69 @@ def test_mra_notify_results_raises(
         mra.notify_results('identifiers', 'result')
 
 
+def test_mra_log_results_samples_granted_results(
+        modular_realm_authorizer_patched):
+    """
+    unit tested:  log_results, log_decision
+
+    test case:
+    granted results are published as sampled, whereas denials always are
+    """
+    mra = modular_realm_authorizer_patched
+    mra.results_sampler = AuthorizationResultsSampler(
+        sample_rates={'AUTHORIZATION.RESULTS': 0,
+                      'AUTHORIZATION.GRANTED': 0,
+                      'AUTHORIZATION.DENIED': 0})
+
+    with mock.patch.object(mra, 'notify_results') as mra_nr:
+        mra.log_results('identifiers', {'permission1': True})
+        assert not mra_nr.called
+        mra.log_results('identifiers', {'permission1': True,
+                                        'permission2': False})
+        mra_nr.assert_called_once_with('identifiers',
+                                       [('permission1', True),
+                                        ('permission2', False)])
+
+    with mock.patch.object(mra, 'notify_success') as mra_ns:
+        with mock.patch.object(mra, 'notify_failure') as mra_nf:
+            mra.log_decision('identifiers', ['permission1'], any, True)
+            mra.log_decision('identifiers', ['permission1'], any, False)
+            assert not mra_ns.called
+            mra_nf.assert_called_once_with('identifiers', ['permission1'], any)
+
+
+def test_mra_log_results_aggregates_per_subject(
+        modular_realm_authorizer_patched):
+    """
+    unit tested:  log_results, flush_results
+
+    test case:
+    within a window, granted results are counted rather than published, and
+    a summary of the counts is published per subject once flushed
+    """
+    mra = modular_realm_authorizer_patched
+    mra.results_sampler = AuthorizationResultsSampler(window=60)
+    thedude = mock.Mock(primary_identifier='thedude')
+    walter = mock.Mock(primary_identifier='walter')
+
+    with mock.patch.object(mra, 'notify_results') as mra_nr:
+        for _ in range(3):
+            mra.log_results(thedude, {'permission1': True})
+        mra.log_results(thedude, {'permission1': False})
+        mra.log_results(walter, {'permission2': True})
+        mra_nr.assert_called_once_with(thedude, [('permission1', False)])
+
+    with mock.patch.object(mra, 'notify_summary') as mra_ns:
+        mra.flush_results()
+        summaries = {call[0][0].primary_identifier: call[0][1]
+                     for call in mra_ns.call_args_list}
+        assert summaries == {'thedude': [('permission1', 4, 3)],
+                             'walter': [('permission2', 1, 1)]}
+
+        mra.flush_results()
+        assert mra_ns.call_count == 2
+
+
 def test_mra_notify_success(modular_realm_authorizer_patched):
     """
     unit tested:  notify_success
@@ -533,7 +644,7 @@ def test_mra_notify_success(modular_realm_authorizer_patched):
 
     topic = 'AUTHORIZATION.GRANTED'
 
-    with mock.patch.object(DefaultEventBus, 'publish') as eb_pub:
+    with mock.patch.object(DirectEventBus, 'publish') as eb_pub:
         eb_pub.return_value = None
 
         mra.notify_success('identifiers', permission_s, any)
@@ -572,7 +683,7 @@ def test_mra_notify_failure(modular_realm_authorizer_patched):
 
     topic = 'AUTHORIZATION.DENIED'
 
-    with mock.patch.object(DefaultEventBus, 'publish') as eb_pub:
+    with mock.patch.object(DirectEventBus, 'publish') as eb_pub:
         eb_pub.return_value = None
 
         mra.notify_failure('identifiers', permission_s, any)
@@ -807,9 +918,10 @@ def test_ipv_is_permitted(
     ipv = indexed_permission_verifier
 
     dp1 = DefaultPermission('domain6:action1')
-    monkeypatch.setattr(dp1, 'implies', lambda x: False)
     dp2 = DefaultPermission('domain7:action1')
-    monkeypatch.setattr(dp2, 'implies', lambda x: True)
+    # permissions have no __dict__, so implies is patched on the class:
+    monkeypatch.setattr(DefaultPermission, 'implies',
+                        lambda self, x: self is dp2)
     authz_perms = frozenset([dp1, dp2])
     monkeypatch.setattr(ipv, 'get_authzd_permissions', lambda x,y: authz_perms)
 
@@ -929,3 +1041,71 @@ def test_requires_role_raises(monkeypatch, mock_subject, configured_securityutil
         with pytest.raises(UnauthorizedException):
             with csu:
                 do_something()
+
+
+def test_requires_permission_async(mock_subject):
+    """
+    unit tested:  requires_permission
+
+    test case:
+    a decorated coroutine function is a coroutine function that awaits the
+    permission check when awaited, using the SecurityUtils entered by the
+    awaiting task
+    """
+    su = SecurityUtils()
+    su._local.subject = mock_subject
+
+    async def check_permission_async(permission_s, logical_operator):
+        pass
+
+    @requires_permission(['domain1:action1'])
+    async def do_something():
+        return "something was done"
+
+    async def handle_request():
+        async with su:
+            return await do_something()
+
+    assert asyncio.iscoroutinefunction(do_something)
+    loop = asyncio.new_event_loop()
+    try:
+        with mock.patch.object(mock_subject, 'check_permission_async',
+                               side_effect=check_permission_async) as cp:
+            result = loop.run_until_complete(handle_request())
+    finally:
+        loop.close()
+
+    cp.assert_called_once_with(['domain1:action1'], all)
+    assert result == "something was done"
+
+
+def test_requires_role_async_raises(mock_subject):
+    """
+    unit tested:  requires_role
+
+    test case:
+    a decorated coroutine function raises when awaited by a subject lacking
+    the role, without running
+    """
+    su = SecurityUtils()
+    su._local.subject = mock_subject
+    done = []
+
+    @requires_role('role1')
+    async def do_something():
+        done.append(True)
+
+    async def handle_request():
+        async with su:
+            await do_something()
+
+    loop = asyncio.new_event_loop()
+    try:
+        with mock.patch.object(mock_subject, 'check_role_async') as cr:
+            cr.side_effect = UnauthorizedException
+            with pytest.raises(UnauthorizedException):
+                loop.run_until_complete(handle_request())
+    finally:
+        loop.close()
+
+    assert not done
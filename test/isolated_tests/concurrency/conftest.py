@@ -1,3 +1,4 @@
 from .fixtures import (
+    bounded_executor,
     stoppable_scheduled_executor,
 )
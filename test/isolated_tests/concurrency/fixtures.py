@@ -1,5 +1,6 @@
 import pytest
 from yosai.core import (
+    BoundedExecutor,
     StoppableScheduledExecutor,
 )
 
@@ -11,3 +12,10 @@ def stoppable_scheduled_executor():
         print('test_func')
 
     return StoppableScheduledExecutor(my_func=test_func, interval=10)  # seconds
+
+
+@pytest.fixture(scope='function')
+def bounded_executor(request):
+    executor = BoundedExecutor(max_workers=1, max_queue_depth=1)
+    request.addfinalizer(executor.shutdown)
+    return executor
@@ -1,8 +1,12 @@
+import pytest
 from unittest import mock
 import threading
 import time
 from yosai.core import (
+    BatchingQueue,
+    ExecutorSaturatedException,
     StoppableScheduledExecutor,
+    WriteBehindQueue,
 )
 
 
@@ -20,3 +24,156 @@ def test_sse_runs(stoppable_scheduled_executor):
         time.sleep(1)
         sse.stop()
         assert mock_run.called
+
+
+def test_be_submit_returns_result(bounded_executor):
+    be = bounded_executor
+    future = be.submit(sum, [1, 2, 3])
+    assert future.result() == 6
+
+
+def test_be_submit_saturated_raises(bounded_executor):
+    """
+    unit tested:  submit
+
+    test case:
+    once every worker and queue slot is occupied, submit fails fast
+    """
+    be = bounded_executor
+    gate = threading.Event()
+    futures = [be.submit(gate.wait) for _ in range(2)]
+
+    with pytest.raises(ExecutorSaturatedException):
+        be.submit(gate.wait)
+
+    gate.set()
+    for future in futures:
+        future.result()
+
+
+def test_be_releases_slot_when_done(bounded_executor):
+    be = bounded_executor
+    for _ in range(5):
+        be.submit(sum, [1]).result()
+    time.sleep(0.1)  # done-callbacks release slots
+    assert be._slots.acquire(blocking=False)
+
+
+def test_wbq_coalesces_writes_per_key():
+    """
+    unit tested:  submit
+
+    test case:
+    only the latest of successive pending writes for a key is performed, and
+    every pending write is performed upon stop
+    """
+    written = []
+    wbq = WriteBehindQueue(batch_size=100, flush_interval=60)
+    for value in range(3):
+        wbq.submit('a', written.append, ('a', value))
+    wbq.submit('b', written.append, ('b', 0))
+    assert wbq.get_pending('a') == (written.append, (('a', 2),))
+
+    wbq.stop()
+    assert written == [('a', 2), ('b', 0)] and len(wbq) == 0
+
+    wbq.submit('c', written.append, ('c', 0))  # stopped, so written at once
+    assert written[-1] == ('c', 0)
+
+
+def test_wbq_merges_pending_writes():
+    """
+    unit tested:  submit
+
+    test case:
+    a merge function combines a write with the one pending for its key
+    """
+    written = []
+    wbq = WriteBehindQueue(flush_interval=60)
+
+    def merge(pending, latest):
+        return (latest[0], (pending[1][0] + latest[1][0],))
+
+    wbq.submit('a', written.append, ['x'], merge=merge)
+    wbq.submit('a', written.append, ['y'], merge=merge)
+    wbq.stop()
+    assert written == [['x', 'y']]
+
+
+def test_wbq_flushes_full_batches():
+    batches = []
+    written = []
+    wbq = WriteBehindQueue(batch_size=2, flush_interval=60,
+                           after_batch=lambda: batches.append(list(written)))
+    for key in range(4):
+        wbq.submit(key, written.append, key)
+    wbq.flush()
+    assert written == [0, 1, 2, 3] and batches == [[0, 1], [0, 1, 2, 3]]
+    wbq.stop()
+
+
+def test_wbq_backpressure_writes_synchronously():
+    """
+    test case:
+    when the queue stays full beyond put_timeout, the write is performed by
+    the submitting thread
+    """
+    release = threading.Event()
+    written = []
+    wbq = WriteBehindQueue(max_pending=1, batch_size=1, flush_interval=0,
+                           put_timeout=0.05)
+    wbq.submit('blocker', release.wait)
+    time.sleep(0.05)  # the worker is now blocked performing 'blocker'
+    wbq.submit('a', written.append, 'a')  # pending
+    wbq.submit('b', written.append, 'b')  # full, so synchronous
+    assert written == ['b']
+
+    release.set()
+    wbq.stop()
+    assert written == ['b', 'a']
+
+
+def test_bq_handles_items_in_batches():
+    batches = []
+    bq = BatchingQueue(batches.append, batch_size=2, flush_interval=60)
+    for item in range(5):
+        assert bq.put(item)
+    bq.flush()
+    assert batches == [[0, 1], [2, 3], [4]]
+
+    bq.stop()
+    assert not bq.put(5)
+    assert bq.counters == {'put': 5, 'handled': 5, 'dropped': 1,
+                           'overflows': 0, 'pending': 0}
+
+
+@pytest.mark.parametrize('policy, expected',
+                         [('drop_newest', ['blocker', 'a']),
+                          ('drop_oldest', ['blocker', 'b']),
+                          ('block', ['blocker', 'a'])])
+def test_bq_overflow_policies(policy, expected):
+    """
+    test case:
+    putting an item into a full queue discards the item put, discards the
+    oldest item held, or waits for room until put_timeout
+    """
+    release = threading.Event()
+    handled = []
+
+    def handler(batch):
+        for item in batch:
+            if item == 'blocker':
+                release.wait()
+            handled.append(item)
+
+    bq = BatchingQueue(handler, max_items=1, batch_size=1, flush_interval=0,
+                       policy=policy, put_timeout=0.05)
+    bq.put('blocker')
+    time.sleep(0.05)  # the worker is now blocked handling 'blocker'
+    assert bq.put('a')
+    assert bq.put('b') is (policy == 'drop_oldest')
+
+    release.set()
+    bq.stop()
+    assert handled == expected
+    assert bq.counters['overflows'] == 1 and bq.counters['dropped'] == 1
@@ -396,6 +396,31 @@ class MockCacheHandler(cache_abcs.CacheHandler):
         pass
 
 
+class DictCacheHandler(MockCacheHandler):
+    """ keeps entries in a dict, counting the requests made of it """
+
+    def __init__(self):
+        self.entries = {}
+        self.requests = 0
+
+    def get(self, domain, identifier):
+        self.requests += 1
+        return self.entries.get((domain, identifier))
+
+    def set(self, domain, identifier, value):
+        self.requests += 1
+        self.entries[(domain, identifier)] = value
+
+    def delete(self, domain, identifier):
+        self.requests += 1
+        self.entries.pop((domain, identifier), None)
+
+    def delete_many(self, domain, identifiers):
+        self.requests += 1
+        for identifier in identifiers:
+            self.entries.pop((domain, identifier), None)
+
+
 class MockSecUtil:
 
     def __init__(self):
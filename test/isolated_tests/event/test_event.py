@@ -1,12 +1,25 @@
 import pytest
 import datetime
+import gc
+import logging
+import time
+from unittest import mock
 
 from yosai.core import (
     DefaultEventBus,
+    DirectEventBus,
     EventBusMessageDataException,
     EventBusTopicException,
     EventBusSubscriptionException,
+    EventLogger,
+    EventRelay,
+    SimpleIdentifierCollection,
+    UnixSocketTransport,
+    event_abcs,
 )
+from yosai.core.session.session import evicted_session_tuple
+from yosai.core import DefaultSessionKey
+
 
 # -----------------------------------------------------------------------------
 # EventBus Tests
@@ -141,3 +154,201 @@ def test_unregister_all(patched_event_bus):
     result = peb.unregister_all()
 
     assert isinstance(result, list)
+
+# -----------------------------------------------------------------------------
+# DirectEventBus Tests
+# -----------------------------------------------------------------------------
+
+
+class Listener:
+
+    def __init__(self):
+        self.received = []
+
+    def listen(self, items=None):
+        self.received.append(items)
+
+
+def test_deb_publishes_to_registered_listeners():
+    """
+    unit tested:  register, publish, is_registered, unregister
+
+    test case:
+    a message reaches each listener of its topic, in order of registration,
+    and no listener once it has unregistered
+    """
+    deb = DirectEventBus()
+    received = []
+    listener = Listener()
+
+    assert deb.register(listener.listen, 'SESSION.STOP') == (listener.listen,
+                                                              True)
+    assert deb.register(listener.listen, 'SESSION.STOP')[1] is False
+    deb.register(lambda items=None: received.append(items), 'SESSION.STOP')
+    assert deb.is_registered(listener.listen, 'SESSION.STOP')
+    assert not deb.is_registered(listener.listen, 'SESSION.START')
+
+    assert deb.publish('SESSION.STOP', items='session1')
+    assert deb.publish('SESSION.START', items='ignored')
+    assert listener.received == ['session1']
+    assert received == ['session1']
+
+    assert deb.unregister(listener.listen, 'SESSION.STOP') == listener.listen
+    assert deb.unregister(listener.listen, 'SESSION.STOP') is None
+    deb.publish('SESSION.STOP', items='session2')
+    assert listener.received == ['session1']
+    assert received == ['session1', 'session2']
+
+    assert len(deb.unregister_all()) == 1
+    assert not deb.has_listeners('SESSION.STOP')
+
+
+def test_deb_references_bound_methods_weakly():
+    """
+    unit tested:  register
+
+    test case:
+    a bound method doesn't keep its instance alive, and is dropped from its
+    topic once the instance is collected
+    """
+    deb = DirectEventBus()
+    listener = Listener()
+    deb.register(listener.listen, 'SESSION.STOP')
+    assert deb.has_listeners('SESSION.STOP')
+
+    del listener
+    gc.collect()
+    assert not deb.has_listeners('SESSION.STOP')
+    assert deb.publish('SESSION.STOP', items='session1')
+
+
+def test_deb_register_raises():
+    deb = DirectEventBus()
+    with pytest.raises(EventBusSubscriptionException):
+        deb.register('not callable', 'SESSION.STOP')
+
+
+# -----------------------------------------------------------------------------
+# EventLogger Tests
+# -----------------------------------------------------------------------------
+
+def test_el_async_audit_logs_from_worker(caplog):
+    """
+    unit tested:  enable_async_audit, log_authz_results, disable_async_audit
+
+    test case:
+    once async audit is enabled, authorization results are serialized and
+    logged by the audit queue's worker, stamped with the time of publication
+    """
+    deb = DirectEventBus()
+    el = EventLogger(deb)
+    el.enable_async_audit(flush_interval=60)
+    identifiers = mock.create_autospec(SimpleIdentifierCollection)
+    identifiers.serialize.return_value = {'source_identifiers': 'thedude'}
+
+    with caplog.at_level(logging.INFO, logger='yosai.core.event.event'):
+        published = datetime.datetime.now(datetime.timezone.utc)
+        deb.publish('AUTHORIZATION.RESULTS', identifiers=identifiers,
+                    items=[('role1', True)])
+        assert not identifiers.serialize.called
+
+        counters = el.audit_counters
+        el.disable_async_audit()
+
+    record, = [r for r in caplog.records
+               if r.getMessage() == 'AUTHORIZATION.RESULTS']
+    assert record.threadName == 'EventLogger'
+    assert record.items == [('role1', True)]
+    assert record.identifiers == {'source_identifiers': 'thedude'}
+    assert (record.time - published).total_seconds() < 1
+    assert counters['put'] == 1
+    assert el.audit_counters is None
+
+
+# -----------------------------------------------------------------------------
+# EventRelay Tests
+# -----------------------------------------------------------------------------
+
+def test_er_relays_events_between_processes(tmpdir):
+    """
+    unit tested:  EventRelay, UnixSocketTransport
+
+    test case:
+    an event published to one bus is republished, once per batch, to the bus
+    of a sibling, which doesn't relay it back
+    """
+    directory = str(tmpdir.join('relay'))
+    local_bus, sibling_bus = DirectEventBus(), DirectEventBus()
+    local = EventRelay(local_bus, UnixSocketTransport(directory, name='local'),
+                       batch_interval=60)
+    sibling = EventRelay(sibling_bus,
+                         UnixSocketTransport(directory, name='sibling'))
+    stopped, changed, echoed = [], [], []
+    sibling_bus.register(lambda items=None: stopped.append(items),
+                         'SESSION.STOP')
+    sibling_bus.register(lambda identifiers=None: changed.append(identifiers),
+                         'AUTHZ.CHANGED')
+    local_bus.register(lambda identifiers=None: echoed.append(identifiers),
+                       'AUTHZ.CHANGED')
+
+    identifiers = SimpleIdentifierCollection(source_name='AccountStoreRealm',
+                                             identifier='thedude')
+    session_stopped = evicted_session_tuple(identifiers,
+                                            DefaultSessionKey('session1'))
+    for _ in range(3):
+        local_bus.publish('SESSION.STOP', items=session_stopped)
+    local_bus.publish('AUTHZ.CHANGED', identifiers=identifiers)
+    local.flush()
+
+    deadline = time.time() + 5
+    while not (stopped and changed) and time.time() < deadline:
+        time.sleep(0.01)
+    sibling.flush()
+    time.sleep(0.05)
+
+    assert len(stopped) == 1
+    assert stopped[0].identifiers == identifiers
+    assert stopped[0].session_key.session_id == 'session1'
+    assert changed == [identifiers]
+    assert echoed == [identifiers]  # published locally alone
+
+    local.close()
+    sibling.close()
+    assert not tmpdir.join('relay').listdir()
+
+
+def test_er_relays_every_event_across_batches():
+    """
+    unit tested:  EventRelay
+
+    test case:
+    events relayed in many batches are each sent once, in some batch
+    """
+    class ListTransport(event_abcs.EventTransport):
+        def __init__(self):
+            self.batches = []
+
+        def start(self, receive):
+            pass
+
+        def send(self, data):
+            self.batches.append(data)
+
+        def close(self):
+            pass
+
+    bus, transport = DirectEventBus(), ListTransport()
+    relay = EventRelay(bus, transport, batch_interval=0.001, batch_size=5)
+    for index in range(500):
+        identifiers = SimpleIdentifierCollection(
+            source_name='AccountStoreRealm', identifier='user{0}'.format(index))
+        bus.publish('AUTHZ.CHANGED', identifiers=identifiers)
+    relay.flush()
+    relay.close()
+
+    serializer = relay.serialization_manager.serializer
+    sent = [event for data in transport.batches
+            for event in serializer.deserialize(data)]
+    assert len(transport.batches) > 1
+    assert len(sent) == 500
+    assert len({tuple(map(str, event)) for event in sent}) == 500
@@ -1,6 +1,7 @@
 import pytest
+import time
 from unittest import mock
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 
 from yosai.core import (
     AbstractRememberMeManager,
@@ -11,15 +12,20 @@ from yosai.core import (
     DefaultSessionKey,
     DefaultSubjectContext,
     DeleteSubjectException,
+    ExpiredSessionException,
     InvalidArgumentException,
+    RememberedIdentityCache,
     ModularRealmAuthorizer,
     SerializationManager,
+    SimpleIdentifierCollection,
     UsernamePasswordToken,
     authc_abcs,
     event_bus,
     mgt_settings,
 )
 
+from yosai.core.session.session import session_state_tuple
+
 from ..session.doubles import (
     MockDefaultNativeSessionManager,
 )
@@ -991,6 +997,89 @@ def test_nsm_resolve_context_session(native_security_manager, monkeypatch):
     assert result == 'session'
 
 
+def test_nsm_create_subject_resumes_session(native_security_manager):
+    """
+    unit tested:  create_subject
+
+    test case:
+    a context that brings nothing but a session id is resolved from a single
+    lookup of the session's state, and the subject isn't saved as its state
+    matches that stored
+    """
+    nsm = native_security_manager
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='thedude')
+    state = session_state_tuple('session', identifiers, True, 'host')
+
+    context = DefaultSubjectContext(security_utils=None)
+    context.security_manager = nsm
+    context.session_id = 'sessionid123'
+
+    with mock.patch.object(nsm.session_manager, 'get_session_state',
+                           return_value=state) as gss:
+        with mock.patch.object(nsm, 'resolve_session') as nsm_rs:
+            with mock.patch.object(nsm, 'do_create_subject') as nsm_dcs:
+                with mock.patch.object(nsm, 'save') as nsm_save:
+                    nsm.create_subject(subject_context=context)
+
+    assert gss.call_count == 1
+    nsm_rs.assert_not_called()
+    nsm_save.assert_not_called()
+    created = nsm_dcs.call_args[0][0]
+    assert created.session_state is state
+    assert (created.session, created.identifiers, created.authenticated,
+            created.host) == ('session', identifiers, True, 'host')
+
+
+def test_nsm_create_subject_resumed_saves_remembered_identity(
+        native_security_manager, monkeypatch):
+    """
+    unit tested:  create_subject
+
+    test case:
+    a resumed session that holds no identifiers is saved once a remembered
+    identity is resolved for it
+    """
+    nsm = native_security_manager
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='thedude')
+    state = session_state_tuple('session', None, False, None)
+    monkeypatch.setattr(nsm.session_manager, 'get_session_state',
+                        lambda key: state)
+    monkeypatch.setattr(nsm, 'get_remembered_identity', lambda x: identifiers)
+
+    context = DefaultSubjectContext(security_utils=None)
+    context.security_manager = nsm
+    context.session_id = 'sessionid123'
+
+    with mock.patch.object(nsm, 'do_create_subject') as nsm_dcs:
+        nsm_dcs.return_value = 'subject'
+        with mock.patch.object(nsm, 'save') as nsm_save:
+            nsm.create_subject(subject_context=context)
+            nsm_save.assert_called_once_with('subject')
+
+
+def test_nsm_resume_session_invalid(native_security_manager, monkeypatch):
+    """
+    unit tested:  resume_session
+
+    test case:
+    an invalid session is ignored, leaving the context without a session
+    """
+    nsm = native_security_manager
+
+    def get_session_state(key):
+        raise ExpiredSessionException
+
+    monkeypatch.setattr(nsm.session_manager, 'get_session_state',
+                        get_session_state)
+    context = DefaultSubjectContext(security_utils=None)
+    context.session_id = 'sessionid123'
+
+    assert nsm.resume_session(context) is None
+    assert context.session is None
+
+
 def test_nsm_get_session_key_w_sessionid(
         native_security_manager, monkeypatch, mock_subject_context):
     """
@@ -1493,7 +1582,6 @@ def test_armm_get_remembered_identifiers_raises(
         assert result == 'identifiers'
 
 
-@pytest.mark.xfail
 def test_armm_get_remembered_identifiers_serialized(
         mock_remember_me_manager, monkeypatch):
     """
@@ -1515,6 +1603,50 @@ def test_armm_get_remembered_identifiers_serialized(
     assert result == 'identifiers'
 
 
+def test_armm_get_remembered_identifiers_cached(
+        mock_remember_me_manager, simple_identifier_collection, monkeypatch):
+    """
+    unit tested:  get_remembered_identifiers, forget_cached_identifiers
+
+    test case:
+    a remembered identity is decrypted once, a copy of its identifiers being
+    returned thereafter until it is forgotten or the keys change
+    """
+    mrmm = mock_remember_me_manager
+    key = Fernet.generate_key().decode('utf-8')
+    mrmm.set_cipher_key(encrypt_key=key, decrypt_key=key)
+    sic = simple_identifier_collection
+    remembered = mrmm.convert_identifiers_to_bytes(sic)
+    monkeypatch.setattr(mrmm, "get_remembered_serialized_identity",
+                        lambda x: remembered)
+
+    with mock.patch.object(mrmm, 'decrypt', wraps=mrmm.decrypt) as decrypt:
+        first = mrmm.get_remembered_identifiers('subject_context')
+        second = mrmm.get_remembered_identifiers('subject_context')
+        assert first == sic and second == sic and first is not second
+        assert decrypt.call_count == 1
+
+        mrmm.forget_cached_identifiers(remembered)
+        mrmm.get_remembered_identifiers('subject_context')
+        assert decrypt.call_count == 2
+
+        mrmm.set_cipher_key(encrypt_key=key, decrypt_key=key)
+        assert len(mrmm.identity_cache) == 0
+
+
+def test_ric_evicts_least_recently_used_and_expired(monkeypatch):
+    ric = RememberedIdentityCache(ttl=60, max_entries=2)
+    ric.put(b'a', 'thedude')
+    ric.put(b'b', 'walter')
+    assert ric.get(b'a') == 'thedude'
+    ric.put(b'c', 'donny')
+    assert ric.get(b'b') is None and len(ric) == 2
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert ric.get(b'a') is None and len(ric) == 1
+
+
 def test_armm_convert_bytes_to_identifiers(
         mock_remember_me_manager, monkeypatch):
     """
@@ -1584,6 +1716,60 @@ def test_armm_decrypt(mock_remember_me_manager, monkeypatch):
         assert result == 'decrypted'
 
 
+def test_armm_builds_ciphers_once(mock_remember_me_manager):
+    """
+    unit tested:  set_cipher_key, encrypt, decrypt
+
+    test case:
+    ciphers are built upon first use, and anew only once the keys change
+    """
+    mrmm = mock_remember_me_manager
+    key = Fernet.generate_key().decode('utf-8')
+    mrmm.set_cipher_key(encrypt_key=key, decrypt_key=key)
+
+    with mock.patch('yosai.core.mgt.mgt.Fernet', wraps=Fernet) as fernet:
+        for _ in range(3):
+            assert mrmm.decrypt(mrmm.encrypt(b'thedude')) == b'thedude'
+        assert fernet.call_count == 2  # an encryptor and a decryptor
+
+        mrmm.set_cipher_key(encrypt_key=key, decrypt_key=key)
+        mrmm.encrypt(b'thedude')
+        assert fernet.call_count == 3
+
+
+@pytest.mark.parametrize('cipher', ['fernet', 'aesgcm'])
+def test_armm_decrypts_with_previous_keys(mock_remember_me_manager, cipher):
+    """
+    unit tested:  set_cipher_key, encrypt, decrypt
+
+    test case:
+    identities encrypted under a previous key, or with the other cipher,
+    remain readable so long as the previous key is a decryption key
+    """
+    mrmm = mock_remember_me_manager
+    old_key = Fernet.generate_key().decode('utf-8')
+    new_key = Fernet.generate_key().decode('utf-8')
+
+    mrmm.set_cipher_key(encrypt_key=old_key, decrypt_key=old_key,
+                        cipher=cipher)
+    remembered = mrmm.encrypt(b'thedude')
+    assert remembered[:1] == (b'\x01' if cipher == 'aesgcm' else b'g')
+
+    other = 'fernet' if cipher == 'aesgcm' else 'aesgcm'
+    mrmm.set_cipher_key(encrypt_key=new_key, decrypt_key=[new_key, old_key],
+                        cipher=other)
+    assert mrmm.decryption_cipher_key == bytes(new_key, 'utf-8')
+    assert mrmm.decrypt(remembered) == b'thedude'
+    assert mrmm.decrypt(mrmm.encrypt(b'walter')) == b'walter'
+
+    mrmm.set_cipher_key(encrypt_key=new_key, decrypt_key=new_key)
+    with pytest.raises(InvalidToken):
+        mrmm.decrypt(remembered)
+
+    with pytest.raises(InvalidArgumentException):
+        mrmm.set_cipher_key(new_key, new_key, cipher='rot13')
+
+
 def test_armm_on_failed_login(mock_remember_me_manager):
     """
     unit tested:  on_failed_login
@@ -1,4 +1,5 @@
 import pytest
+import asyncio
 
 from yosai.core import (
     Account,
@@ -12,6 +13,7 @@ from yosai.core import (
     SimpleIdentifierCollection,
 )
 from ..doubles import (
+    DictCacheHandler,
     MockAccount,
     MockAccountStore,
 )
@@ -96,6 +98,40 @@ def test_asr_clear_cached_credentials(default_accountstorerealm, monkeypatch):
     asr.cache_handler.delete.assert_called_once_with('credentials', 'identifier')
 
 
+def test_asr_clear_cached_credentials_clears_verified(
+        default_accountstorerealm, monkeypatch):
+    """
+    unit tested: clear_cached_credentials
+
+    test case:
+    verifications remembered by the credentials verifier are discarded too
+    """
+    asr = default_accountstorerealm
+    monkeypatch.setattr(asr, 'cache_handler', mock.Mock())
+    monkeypatch.setattr(asr, '_credentials_verifier', mock.Mock())
+    asr.clear_cached_credentials('identifier')
+    asr.credentials_verifier.clear_verified_credentials.\
+        assert_called_once_with('identifier')
+
+
+def test_asr_event_bus_passed_to_credentials_verifier(
+        default_accountstorerealm):
+    """
+    unit tested:  event_bus
+
+    test case:
+    the verifier receives the realm's event_bus, whether the verifier is set
+    before or after it
+    """
+    asr = default_accountstorerealm
+    eventbus = mock.Mock()
+    asr.event_bus = eventbus
+    assert asr.credentials_verifier.event_bus is eventbus
+
+    asr.credentials_verifier = PasswordVerifier()
+    assert asr.credentials_verifier.event_bus is eventbus
+
+
 def test_asr_clear_cached_authorization_info(
         default_accountstorerealm, monkeypatch):
     """
@@ -333,3 +369,65 @@ def test_asr_has_role_no_account_obtained(
 
     results = list(asr.has_role(sic, ['role1', 'role2']))
     assert results == [('role1', False), ('role2', False)]
+
+
+def test_asr_get_authz_info_async_caches_through_adapter(
+        default_accountstorerealm, monkeypatch, simple_identifier_collection):
+    """
+    unit tested:  get_authorization_info_async
+
+    test case:
+    - on a cache miss, the account store's get_authz_info_async is awaited
+    - the authz_info is cached through an adapter of the sync cache handler,
+      from which it is read thereafter
+    """
+    asr = default_accountstorerealm
+    sic = simple_identifier_collection
+    cache_handler = DictCacheHandler()
+    monkeypatch.setattr(asr, 'cache_handler', cache_handler)
+
+    account_store = asr.account_store
+    queried = []
+
+    async def get_authz_info_async(identifier):
+        queried.append(identifier)
+        return account_store.get_authz_info(identifier)
+
+    monkeypatch.setattr(account_store, 'get_authz_info_async',
+                        get_authz_info_async, raising=False)
+
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(asr.get_authorization_info_async(sic))
+        second = loop.run_until_complete(asr.get_authorization_info_async(sic))
+    finally:
+        loop.close()
+
+    assert first.authz_info == second.authz_info == 'stored_authzinfo'
+    assert queried == ['identifier']
+    assert cache_handler.entries[('authz_info', 'identifier')] == 'stored_authzinfo'
+
+
+def test_asr_is_permitted_async_no_account_obtained(
+        default_accountstorerealm, monkeypatch, simple_identifier_collection):
+    """
+    unit tested:  is_permitted_async
+
+    test case:
+    - the account store finds no authz_info, which isn't cached
+    - returns False for each permission requested, as is_permitted yields
+    """
+    asr = default_accountstorerealm
+    sic = simple_identifier_collection
+    monkeypatch.setattr(asr, 'cache_handler', DictCacheHandler())
+    monkeypatch.setattr(asr.account_store, 'get_authz_info', lambda x: None)
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(asr.is_permitted_async(
+            sic, ['domain1:action1', 'domain2:action1']))
+    finally:
+        loop.close()
+
+    assert results == [('domain1:action1', False), ('domain2:action1', False)]
+    assert not asr.cache_handler.entries
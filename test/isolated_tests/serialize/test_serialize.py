@@ -1,6 +1,8 @@
 import pytest
+import copy
 import msgpack
 import datetime
+import pickle
 from unittest import mock
 
 from .doubles import (
@@ -8,7 +10,9 @@ from .doubles import (
 )
 from yosai.core import (
     Credential,
+    DefaultPermission,
     InvalidSerializationFormatException,
+    SimpleSession,
     SerializationException,
     serialize_abcs,
     MSGPackSerializer,
@@ -100,3 +104,22 @@ def test_serializable_deserialize():
     newobj = MockSerializable.deserialize(dumbstate)
     print(newobj)
     assert isinstance(newobj, MockSerializable) and hasattr(newobj, 'myname')
+
+
+@pytest.mark.parametrize('obj', [SimpleSession(host='127.0.0.1'),
+                                 DefaultPermission('domain1:action1')])
+def test_serializable_slotted_state(obj):
+    """
+    unit tested:  __getstate__, __setstate__, __eq__
+
+    test case:
+    a slotted instance has no __dict__, and its state survives serialization,
+    copying and pickling
+    """
+    assert not hasattr(obj, '__dict__')
+    state = obj.__getstate__()
+
+    for clone in (obj.deserialize(obj.serialize()), copy.copy(obj),
+                  pickle.loads(pickle.dumps(obj))):
+        assert clone == obj
+    assert pickle.loads(pickle.dumps(obj)).__getstate__() == state
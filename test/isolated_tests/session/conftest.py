@@ -7,7 +7,7 @@ from yosai.core import (
     DefaultSessionSettings,
     DefaultSessionStorageEvaluator,
     DelegatingSession,
-    # ExecutorServiceSessionValidationScheduler,
+    ExecutorServiceSessionValidationScheduler,
     MemorySessionStore,
     ProxiedSession,
     SessionEventHandler,
@@ -55,10 +55,10 @@ def default_native_session_manager():
 
 
 @pytest.fixture(scope='function')
-def executor_session_validation_scheduler(patched_abstract_native_session_manager):
-    pansm = patched_abstract_native_session_manager
+def executor_session_validation_scheduler(default_native_session_manager):
+    dnsm = default_native_session_manager
     interval = 360
-    return ExecutorServiceSessionValidationScheduler(session_manager=pansm,
+    return ExecutorServiceSessionValidationScheduler(session_manager=dnsm,
                                                      interval=interval)
 
 
@@ -2,6 +2,7 @@ import pytest
 import pytz
 from unittest import mock
 import datetime
+import time
 
 from .doubles import (
     MockSessionManager,
@@ -20,6 +21,7 @@ from yosai.core import (
     IllegalStateException,
     InvalidSessionException,
     SimpleSession,
+    SimpleIdentifierCollection,
     RandomSessionIDGenerator,
     UUIDSessionIDGenerator,
     SimpleSessionFactory,
@@ -220,18 +222,13 @@ def test_ss_is_valid(
     ('is_expired,absolute_timeout,idle_timeout,last_access_time,start_timestamp,timedout'),
     [(True, None, None, None, None, True),
      (False, datetime.timedelta(minutes=60), None,
-      datetime.datetime.now(pytz.utc) - datetime.timedelta(minutes=3),
-      datetime.datetime.now(pytz.utc) - datetime.timedelta(minutes=120), True),
+      time.time() - 3 * 60, time.time() - 120 * 60, True),
      (False, None, datetime.timedelta(minutes=15),
-      datetime.datetime.now(pytz.utc) - datetime.timedelta(minutes=20),
-      datetime.datetime.now(pytz.utc) - datetime.timedelta(minutes=30), True),
+      time.time() - 20 * 60, time.time() - 30 * 60, True),
      (False, datetime.timedelta(minutes=60), datetime.timedelta(minutes=15),
-      datetime.datetime.now(pytz.utc) - datetime.timedelta(minutes=1),
-      datetime.datetime.now(pytz.utc) - datetime.timedelta(minutes=5),
-      False),
+      time.time() - 1 * 60, time.time() - 5 * 60, False),
      (False, None, None,
-      datetime.datetime.utcnow() - datetime.timedelta(minutes=1),
-      datetime.datetime.utcnow() - datetime.timedelta(minutes=5), False)])
+      time.time() - 1 * 60, time.time() - 5 * 60, False)])
 def test_ss_is_timed_out(
         simple_session, is_expired, absolute_timeout,
         idle_timeout, last_access_time, start_timestamp, timedout,
@@ -295,6 +292,81 @@ def test_ss_is_timed_out_raises(
         ss.is_timed_out()
 
 
+def test_ss_timestamps_are_epoch_seconds(simple_session):
+    """
+    unit tested:  start_timestamp, last_access_time, absolute_expiration,
+                  idle_expiration, expiration_time
+
+    test case:
+    timestamps are kept as epoch seconds and presented as utc datetimes, and
+    a datetime assigned to a timestamp is converted to epoch seconds
+    """
+    ss = simple_session
+    ss.absolute_timeout = datetime.timedelta(minutes=30)
+    ss.idle_timeout = datetime.timedelta(minutes=5)
+    started = datetime.datetime(2016, 1, 1, 12, 0, tzinfo=pytz.utc)
+    ss.start_timestamp = started
+    ss.last_access_time = started + datetime.timedelta(minutes=10)
+
+    assert ss._start_timestamp == started.timestamp()
+    assert ss.start_timestamp == started
+    assert ss.absolute_expiration == started + datetime.timedelta(minutes=30)
+    assert ss.idle_expiration == started + datetime.timedelta(minutes=15)
+    assert ss.expiration_time == ss.idle_expiration.timestamp()
+
+    ss.touch()
+    assert ss.expiration_time == ss.absolute_expiration.timestamp()
+    assert ss.is_timed_out()
+
+
+def test_ss_tracks_changes(simple_session):
+    """
+    unit tested:  changed_fields, serialize_changes, clear_changes
+
+    test case:
+    fields and attributes changed since creation are serialized alone, with
+    None for a removed attribute, until the changes are cleared
+    """
+    ss = simple_session
+    assert ss.serialize_changes() == {}
+
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='user')
+    ss.set_internal_attribute('identifiers_session_key', identifiers)
+    ss.set_internal_attribute('authenticated_session_key', True)
+    ss.remove_internal_attribute('authenticated_session_key')
+    ss.touch()
+
+    assert ss.changed_fields == {
+        '_last_access_time',
+        ('_internal_attributes', 'identifiers_session_key'),
+        ('_internal_attributes', 'authenticated_session_key')}
+
+    changes = ss.serialize_changes()
+    assert changes['_last_access_time'] == ss._last_access_time
+    internal = changes['_internal_attributes']
+    assert internal['authenticated_session_key'] is None
+    assert (internal['identifiers_session_key'] ==
+            identifiers.serialize())
+
+    ss.clear_changes()
+    assert ss.serialize_changes() == {}
+
+
+def test_ss_merge_changes():
+    """
+    unit tested:  merge_changes
+
+    test case:
+    later changes take precedence, field by field and attribute by attribute
+    """
+    older = {'_host': 'a', '_attributes': {'x': 1, 'y': 2}}
+    newer = {'_is_expired': True, '_attributes': {'y': None}}
+    assert SimpleSession.merge_changes(older, newer) == {
+        '_host': 'a', '_is_expired': True,
+        '_attributes': {'x': 1, 'y': None}}
+
+
 def test_ss_validate_stopped(simple_session, monkeypatch):
     """
     unit tested:  validate
@@ -317,7 +389,7 @@ def test_ss_validate_not_timedout(simple_session, monkeypatch):
     if not yet timed out, validate returns None
     """
     ss = simple_session
-    monkeypatch.setattr(ss, 'is_timed_out', lambda: False)
+    monkeypatch.setattr(SimpleSession, 'is_timed_out', lambda self: False)
     assert ss.validate() is None
 
 
@@ -329,7 +401,7 @@ def test_ss_validate_is_timedout(simple_session, monkeypatch):
     if not yet stopped but timed out, expired is called and exception is raised
     """
     ss = simple_session
-    monkeypatch.setattr(ss, 'is_timed_out', lambda: True)
+    monkeypatch.setattr(SimpleSession, 'is_timed_out', lambda self: True)
 
     with pytest.raises(ExpiredSessionException) as exc_info:
         ss.validate()
@@ -4,13 +4,18 @@ import datetime
 import pytz
 import collections
 from ..doubles import (
+    DictCacheHandler,
     MockSession,
 )
 
 from yosai.core import (
     CachingSessionStore,
+    DefaultSessionKey,
     DelegatingSession,
-    # ExecutorServiceSessionValidationScheduler,
+    ExecutorServiceSessionValidationScheduler,
+    MemorySessionStore,
+    SimpleIdentifierCollection,
+    SimpleSession,
     ExpiredSessionException,
     InvalidArgumentException,
     SessionEventException,
@@ -562,6 +567,23 @@ def test_sh_on_change(session_handler, monkeypatch, caching_session_store):
         ss_up.assert_called_once_with('session')
 
 
+def test_sh_event_bus_applied_to_session_store(session_handler):
+    """
+    unit tested:  event_bus, session_store
+
+    test case:
+    a session store that publishes events receives the handler's event bus
+    """
+    sh = session_handler
+    store = MemorySessionStore()
+    sh.session_store = store
+    assert store.event_bus is sh.event_bus
+
+    eventbus = mock.Mock()
+    sh.event_bus = eventbus
+    assert store.event_bus is eventbus
+
+
 # ------------------------------------------------------------------------------
 # DefaultNativeSessionManager
 # ------------------------------------------------------------------------------
@@ -614,6 +636,96 @@ def test_nsm_start(default_native_session_manager, monkeypatch):
             assert result == dumbsession
 
 
+def test_nsm_start_enables_session_validation(
+        default_native_session_manager, monkeypatch):
+    nsm = default_native_session_manager
+    monkeypatch.setattr(nsm, 'session_validation_scheduler_enabled', True)
+    monkeypatch.setattr(nsm, '_create_session', lambda x: mock.Mock())
+    monkeypatch.setattr(nsm.session_event_handler, 'notify_start',
+                        lambda x: None)
+
+    with mock.patch.object(ExecutorServiceSessionValidationScheduler,
+                           'enable_session_validation') as mock_esv:
+        nsm.start('session_context')
+        nsm.start('session_context')
+        assert isinstance(nsm.session_validation_scheduler,
+                          ExecutorServiceSessionValidationScheduler)
+        assert mock_esv.call_count == 2  # the mocked scheduler never enables
+
+
+def test_nsm_validate_sessions_expires_in_batches(
+        default_native_session_manager, monkeypatch):
+    """
+    unit tested:  validate_sessions
+
+    test case:
+    expired sessions are obtained from the store in batches, and each is
+    expired, published and deleted
+    """
+    nsm = default_native_session_manager
+    store = MemorySessionStore()
+    monkeypatch.setattr(nsm.session_handler, '_session_store', store)
+    monkeypatch.setattr(nsm, 'validation_batch_size', 2)
+    long_ago = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
+
+    for _ in range(5):
+        session = SimpleSession()
+        session.start_timestamp = long_ago
+        store.create(session)
+    store.create(SimpleSession())
+
+    with mock.patch.object(nsm.session_event_handler,
+                           'notify_expiration') as mock_ne:
+        with mock.patch.object(store, 'get_expired_sessions',
+                               wraps=store.get_expired_sessions) as mock_ges:
+            assert nsm.validate_sessions() == 5
+            assert mock_ges.call_count == 4
+        assert mock_ne.call_count == 5
+
+    assert len(store) == 1
+
+
+def test_nsm_validate_sessions_unsupported_store(
+        default_native_session_manager):
+    nsm = default_native_session_manager
+    assert nsm.validate_sessions() == 0  # a CachingSessionStore
+
+
+def test_nsm_disable_session_validation(default_native_session_manager):
+    nsm = default_native_session_manager
+    nsm.session_validation_scheduler = mock.create_autospec(
+        ExecutorServiceSessionValidationScheduler)
+    scheduler = nsm.session_validation_scheduler
+    nsm.disable_session_validation()
+    scheduler.disable_session_validation.assert_called_once_with()
+    assert nsm.session_validation_scheduler is None
+
+# ----------------------------------------------------------------------------
+# ExecutorServiceSessionValidationScheduler
+# ----------------------------------------------------------------------------
+
+
+def test_esvs_enable_and_disable_session_validation(
+        executor_session_validation_scheduler):
+    esvs = executor_session_validation_scheduler
+    with mock.patch.object(esvs.session_manager,
+                           'validate_sessions') as mock_vs:
+        mock_vs.return_value = 0
+        esvs.enable_session_validation()
+        assert esvs.is_enabled and esvs.service.daemon
+        esvs.disable_session_validation()
+        assert not esvs.is_enabled and esvs.service is None
+        mock_vs.assert_called_once_with()
+
+
+def test_esvs_run_survives_failure(executor_session_validation_scheduler):
+    esvs = executor_session_validation_scheduler
+    with mock.patch.object(esvs.session_manager,
+                           'validate_sessions') as mock_vs:
+        mock_vs.side_effect = ValueError
+        esvs.run()  # logged, not raised
+
+
 def test_nsm_stop(
         default_native_session_manager, monkeypatch, mock_session, session_key):
     """
@@ -1184,3 +1296,61 @@ def test_nsm_remove_attribute_nothing(
                                       attribute_key='attr321')
 
         assert result is None
+
+
+def test_nsm_stop_all_sessions(default_native_session_manager):
+    """
+    unit tested:  stop_all_sessions
+
+    test case:
+    every session of a user is stopped, removed, and announced by a
+    SESSION.STOP event
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = DictCacheHandler()
+    session_store = nsm.session_handler.session_store
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='thedude')
+    session_ids = []
+    for _ in range(2):
+        session = SimpleSession()
+        session.set_internal_attribute('identifiers_session_key', identifiers)
+        session_ids.append(session_store.create(session))
+
+    with mock.patch.object(nsm.session_event_handler, 'notify_stop') as stop:
+        assert nsm.stop_all_sessions('thedude') == 2
+
+    assert stop.call_count == 2
+    assert {call[0][0].session_key.session_id
+            for call in stop.call_args_list} == set(session_ids)
+    assert nsm.get_sessions_for('thedude') == []
+    assert all(session_store.read(session_id) is None
+               for session_id in session_ids)
+
+
+def test_nsm_get_session_state(default_native_session_manager):
+    """
+    unit tested:  get_session_state
+
+    test case:
+    the subject state of a session is read from the one lookup of the
+    session, and the exposed session needn't look its host up again
+    """
+    nsm = default_native_session_manager
+    session_store = MemorySessionStore()
+    nsm.session_handler.session_store = session_store
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='thedude')
+    session = SimpleSession()
+    session.set_internal_attribute('identifiers_session_key', identifiers)
+    session.set_internal_attribute('authenticated_session_key', True)
+    session_id = session_store.create(session)
+
+    with mock.patch.object(session_store, 'read',
+                           wraps=session_store.read) as read:
+        state = nsm.get_session_state(DefaultSessionKey(session_id))
+        assert state.session.host is None
+        assert read.call_count == 1
+
+    assert state.session.session_id == session_id
+    assert (state.identifiers, state.authenticated) == (identifiers, True)
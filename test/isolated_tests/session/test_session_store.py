@@ -1,9 +1,25 @@
+import asyncio
+import datetime
+import os
+import sqlite3
 import pytest
 from unittest import mock
+from cryptography.fernet import Fernet
+from ..doubles import DictCacheHandler
 from yosai.core import (
     AbstractSessionStore,
     CachingSessionStore,
     DefaultSessionKey,
+    MemorySessionStore,
+    SealedSessionStore,
+    SealedSessionTooLargeException,
+    SessionDenyList,
+    SessionExpirationIndex,
+    SessionIdSet,
+    SessionSealer,
+    SimpleIdentifierCollection,
+    SimpleSession,
+    SQLiteSessionStore,
     InvalidArgumentException,
     IllegalStateException,
     RandomSessionIDGenerator,
@@ -226,7 +242,7 @@ def test_msd_do_read_session(
     normal code path exercise, returning a value or None
     """
     msd = memory_session_store
-    monkeypatch.setitem(msd.sessions, 'sessionid123', 'sessionid123session')
+    msd.store_session('sessionid123', 'sessionid123session')
     result = msd._do_read(session_id)
     assert result == expected
 
@@ -256,6 +272,108 @@ def test_msd_delete_raises_ae(memory_session_store):
         msd.delete(session='dumbsession')
 
 
+def test_msd_evicts_least_recently_used():
+    """
+    unit tested:  store_session
+
+    test case:
+    once a shard is full, storing a session evicts the session least recently
+    read or stored, expiring it and publishing SESSION.EXPIRE
+    """
+    msd = MemorySessionStore(max_sessions=2, shard_count=1)
+    msd.event_bus = mock.Mock()
+
+    sessions = [SimpleSession() for _ in range(3)]
+    first, second = [msd.create(session) for session in sessions[:2]]
+    msd.read(first)
+    msd.create(sessions[2])
+
+    assert len(msd) == 2 and msd._do_read(second) is None
+    assert sessions[1].is_expired and not sessions[0].is_expired
+    topic, = msd.event_bus.publish.call_args[0]
+    items = msd.event_bus.publish.call_args[1]['items']
+    assert (topic == 'SESSION.EXPIRE' and
+            items.session_key == DefaultSessionKey(second))
+
+
+def test_msd_eviction_without_event_bus():
+    msd = MemorySessionStore(max_sessions=1, shard_count=1)
+    msd.store_session('one', 'dumbsession')
+    msd.store_session('two', 'dumbsession')  # logged, not raised
+    assert len(msd) == 1
+
+
+def test_msd_expiration_index_discards_deleted():
+    msd = MemorySessionStore(max_sessions=4, shard_count=1)
+    for _ in range(20):
+        msd.create(SimpleSession())
+    assert len(msd) == 4 and len(msd.expiration_index) <= 2 * 4 + 1
+
+
+def test_msd_capacity_is_shared_among_shards():
+    msd = MemorySessionStore(max_sessions=10, shard_count=4)
+    for i in range(100):
+        msd.store_session('session{0}'.format(i), 'dumbsession')
+    assert 10 <= len(msd) <= 12
+
+
+def test_msd_get_expired_sessions(memory_session_store):
+    """
+    unit tested:  get_expired_sessions
+
+    test case:
+    only sessions past their deadline are returned, up to the limit, and a
+    session used since its deadline was recorded is tracked anew
+    """
+    msd = memory_session_store
+    long_ago = datetime.datetime.now(datetime.timezone.utc) -\
+        datetime.timedelta(days=1)
+
+    expired = []
+    for _ in range(3):
+        session = SimpleSession()
+        session.start_timestamp = long_ago
+        msd._do_create(session)
+        expired.append(session.session_id)
+    msd.delete(msd._do_read(expired[2]))  # deleted before it was swept
+
+    touched = SimpleSession()
+    touched.last_access_time = long_ago
+    msd._do_create(touched)
+    touched.touch()
+
+    msd._do_create(SimpleSession())
+
+    first = msd.get_expired_sessions(limit=1)
+    second = msd.get_expired_sessions()
+    assert ({s.session_id for s in first + second} == set(expired[:2]) and
+            len(first) == 1 and len(second) == 1)
+    assert len(msd.expiration_index) == 2  # touched, anew, and the current one
+    assert msd.get_expired_sessions() == []
+
+
+def test_sei_pop_due():
+    sei = SessionExpirationIndex()
+    sessions = [SimpleSession() for _ in range(3)]
+    for session_id, session in zip(['a', 'b', 'c'], sessions):
+        session.session_id = session_id
+        sei.track(session)
+
+    deadline = sei.get_deadline(sessions[0])
+    assert sei.pop_due(now=deadline - 1) == []
+    assert len(sei.pop_due(now=float('inf'), limit=2)) == 2
+    assert len(sei) == 1
+
+
+def test_sei_untracked_without_timeouts():
+    sei = SessionExpirationIndex()
+    session = SimpleSession()
+    session.absolute_timeout = None
+    session.idle_timeout = None
+    sei.track(session)
+    sei.track('dumbsession')
+    assert len(sei) == 0
+
 # -----------------------------------------------------------------------------
 # CachingSessionStore
 # -----------------------------------------------------------------------------
@@ -296,6 +414,23 @@ def test_csd_read_session_exists(
     assert result == mock_session
 
 
+def test_csd_read_through(caching_session_store, monkeypatch, mock_session,
+                          mock_cache_handler):
+    """
+    unit tested:  read
+
+    test case:
+    a session missing from cache is read from the backing store and cached
+    """
+    csd = caching_session_store
+    monkeypatch.setattr(csd, '_get_cached_session', lambda x: None)
+    monkeypatch.setattr(csd, '_do_read', lambda x: mock_session)
+    monkeypatch.setattr(csd, '_cache_handler', mock_cache_handler)
+    with mock.patch.object(csd, '_cache') as mock_cache:
+        assert csd.read('sessionid123') == mock_session
+        mock_cache.assert_called_once_with(mock_session, 'sessionid123')
+
+
 def test_csd_update_isvalid(caching_session_store, mock_session):
     """
     unit tested:  update
@@ -391,14 +526,23 @@ def test_csd_cache_identifiers_to_key_map_w_idents(
     monkeypatch.setattr(csd, 'cache_handler', mock_cache_handler)
     monkeypatch.setattr(mock_session, 'get_internal_attribute', lambda x: sic)
 
-    with mock.patch.object(mock_cache_handler, 'set') as mock_set:
-        mock_set.return_value = None
+    with mock.patch.object(mock_cache_handler, 'get') as mock_get:
+        mock_get.return_value = SessionIdSet(['sessionid456'])
+        with mock.patch.object(mock_cache_handler, 'set') as mock_set:
+            mock_set.return_value = None
 
-        csd._cache_identifiers_to_key_map(mock_session, 'sessionid123')
+            csd._cache_identifiers_to_key_map(mock_session, 'sessionid123')
+
+            mock_set.assert_called_once_with(
+                domain='session',
+                identifier=sic.primary_identifier,
+                value=SessionIdSet(['sessionid123', 'sessionid456']))
 
-        mock_set.assert_called_once_with(domain='session',
-                                         identifier=sic.primary_identifier,
-                                         value=DefaultSessionKey('sessionid123'))
+            # already indexed, so not cached again:
+            mock_set.reset_mock()
+            mock_get.return_value = SessionIdSet(['sessionid123'])
+            csd._cache_identifiers_to_key_map(mock_session, 'sessionid123')
+            mock_set.assert_not_called()
 
 
 def test_csd_cache_identifiers_to_key_map_wo_idents(
@@ -458,12 +602,16 @@ def test_csd_uncache(
     sic = simple_identifier_collection
     monkeypatch.setattr(csd, 'cache_handler', mock_cache_handler)
     monkeypatch.setattr(mock_session, 'get_internal_attribute', lambda x: sic)
-    with mock.patch.object(mock_cache_handler, 'delete') as mock_remove:
-        mock_remove.return_value = None
-        csd._uncache(mock_session)
-        calls = [mock.call(domain='session', identifier=mock_session.session_id),
-                 mock.call(domain='session', identifier=sic.primary_identifier)]
-        mock_remove.assert_has_calls(calls)
+    with mock.patch.object(mock_cache_handler, 'get') as mock_get:
+        mock_get.return_value = SessionIdSet([mock_session.session_id])
+        with mock.patch.object(mock_cache_handler, 'delete') as mock_remove:
+            mock_remove.return_value = None
+            csd._uncache(mock_session)
+            calls = [mock.call(domain='session',
+                               identifier=mock_session.session_id),
+                     mock.call(domain='session',
+                               identifier=sic.primary_identifier)]
+            mock_remove.assert_has_calls(calls)
 
 
 def test_csd_uncache_raises(caching_session_store):
@@ -477,3 +625,397 @@ def test_csd_uncache_raises(caching_session_store):
 
     with pytest.raises(SessionCacheException):
         csd._uncache('session')
+
+def test_csd_indexes_sessions_per_user(caching_session_store):
+    """
+    unit tested:  get_sessions_for, delete_sessions_for
+
+    test case:
+    every session of a user is indexed, sessions that can no longer be read
+    are dropped from the index, and a user's sessions are deleted from cache
+    in a single request
+    """
+    csd = caching_session_store
+    csd.cache_handler = DictCacheHandler()
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='thedude')
+    sessions = []
+    for _ in range(3):
+        session = SimpleSession()
+        session.set_internal_attribute('identifiers_session_key', identifiers)
+        csd.create(session)
+        sessions.append(session)
+
+    assert csd.get_session_ids_for('thedude') == {session.session_id
+                                                  for session in sessions}
+
+    csd.delete(sessions[0])
+    del csd.cache_handler.entries[('session', sessions[1].session_id)]
+    assert csd.get_sessions_for('thedude') == [sessions[2]]
+    assert csd.get_session_ids_for('thedude') == {sessions[2].session_id}
+
+    requests = csd.cache_handler.requests
+    csd.delete_sessions_for('thedude', [sessions[2]])
+    assert csd.cache_handler.requests == requests + 1
+    assert csd.cache_handler.entries == {}
+
+
+def test_csd_read_and_update_async(caching_session_store, monkeypatch):
+    """
+    unit tested:  read_async, update_async
+
+    test case:
+    - a session missing from cache is read through the backing store's
+      _do_read_async and cached
+    - an update caches the session and indexes it for its user, while an
+      update of an invalid session uncaches it
+    """
+    csd = caching_session_store
+    csd.cache_handler = DictCacheHandler()
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='thedude')
+    session = SimpleSession()
+    session.session_id = 'sessionid123'
+    session.set_internal_attribute('identifiers_session_key', identifiers)
+
+    async def do_read_async(session_id):
+        return session if session_id == session.session_id else None
+
+    monkeypatch.setattr(csd, '_do_read_async', do_read_async)
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(csd.read_async('sessionid123')) is session
+        assert loop.run_until_complete(csd.read_async('unknown')) is None
+        assert csd.cache_handler.entries[('session', 'sessionid123')] is session
+
+        loop.run_until_complete(csd.update_async(session))
+        assert csd.get_session_ids_for('thedude') == {'sessionid123'}
+
+        session.stop()
+        loop.run_until_complete(csd.update_async(session))
+    finally:
+        loop.close()
+
+    assert csd.cache_handler.entries == {}
+
+
+# -----------------------------------------------------------------------------
+# SQLiteSessionStore
+# -----------------------------------------------------------------------------
+
+@pytest.fixture(scope='function')
+def sqlite_session_store(tmpdir):
+    store = SQLiteSessionStore(str(tmpdir.join('sessions.db')),
+                               commit_batch_size=1)
+    yield store
+    store.close()
+
+
+def test_sqlss_write_through(sqlite_session_store):
+    """
+    unit tested:  _do_create, _do_read, _do_update, _do_delete
+
+    test case:
+    sessions round-trip through the database
+    """
+    sss = sqlite_session_store
+    session = SimpleSession(host='127.0.0.1')
+    session_id = sss._do_create(session)
+    assert sss._do_read(session_id) == session
+
+    session.host = '10.0.0.1'
+    sss._do_update(session)
+    assert sss._do_read(session_id).host == '10.0.0.1'
+
+    sss._do_delete(session)
+    assert sss._do_read(session_id) is None
+
+
+def test_sqlss_partial_updates(sqlite_session_store):
+    """
+    unit tested:  update, _do_update_changes
+
+    test case:
+    an update writes only the changes, attributes included, an unchanged
+    session isn't written at all, and a partial update of a session missing
+    from the database writes it in full
+    """
+    sss = sqlite_session_store
+    sss.cache_handler = mock.Mock()
+    session = SimpleSession()
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='user')
+    session.set_internal_attribute('identifiers_session_key', identifiers)
+    session_id = sss._do_create(session)
+    session.clear_changes()
+
+    session.touch()
+    session.set_internal_attribute('authenticated_session_key', True)
+    with mock.patch.object(sss, '_do_update') as do_update:
+        with mock.patch.object(sss, '_do_update_changes',
+                               wraps=sss._do_update_changes) as do_changes:
+            sss.update(session)
+            sss.update(session)  # unchanged since
+
+    do_update.assert_not_called()
+    changes = do_changes.call_args[0][1]
+    assert do_changes.call_count == 1
+    assert set(changes) == {'_last_access_time', '_internal_attributes'}
+    assert set(changes['_internal_attributes']) == {'authenticated_session_key'}
+
+    stored = sss._do_read(session_id)
+    assert stored.last_access_time == session.last_access_time
+    assert stored.get_internal_attribute('authenticated_session_key') is True
+    assert (stored.get_internal_attribute('identifiers_session_key') ==
+            identifiers)
+
+    other = SimpleSession()
+    other.session_id = 'not-in-the-database'
+    other.touch()
+    sss.update(other)
+    assert sss._do_read('not-in-the-database') == other
+
+
+def test_sqlss_batched_commits(tmpdir):
+    """
+    unit tested:  _write, flush
+
+    test case:
+    writes become visible to other connections only once a batch commits
+    """
+    path = str(tmpdir.join('sessions.db'))
+    sss = SQLiteSessionStore(path, commit_batch_size=3, commit_interval=60)
+    other = sqlite3.connect(path)
+
+    def count():
+        return other.execute('SELECT COUNT(*) FROM yosai_session').fetchone()[0]
+
+    sss._do_create(SimpleSession())
+    sss._do_create(SimpleSession())
+    assert count() == 0
+    sss._do_create(SimpleSession())
+    assert count() == 3
+
+    sss._do_create(SimpleSession())
+    sss.flush()
+    assert count() == 4
+
+    other.close()
+    sss.close()
+
+
+def test_sqlss_expired_sessions(sqlite_session_store):
+    """
+    unit tested:  get_expired_sessions, purge_expired
+
+    test case:
+    only sessions past their deadline are reported and purged
+    """
+    sss = sqlite_session_store
+    long_ago = datetime.datetime.now(datetime.timezone.utc) -\
+        datetime.timedelta(days=1)
+
+    expired = []
+    for _ in range(3):
+        session = SimpleSession()
+        session.start_timestamp = long_ago
+        expired.append(sss._do_create(session))
+    current = sss._do_create(SimpleSession())
+
+    assert len(sss.get_expired_sessions(limit=2)) == 2
+    assert ({s.session_id for s in sss.get_expired_sessions()} ==
+            set(expired))
+
+    assert sss.purge_expired() == 3
+    assert sss.get_expired_sessions() == []
+    assert sss._do_read(current) is not None
+
+
+def test_sqlss_write_behind(sqlite_session_store):
+    """
+    unit tested:  enable_write_behind, update, delete, read
+
+    test case:
+    writes are deferred to the queue, reads consult the queue first, and
+    disabling write-behind performs the pending writes
+    """
+    sss = sqlite_session_store
+    sss.enable_write_behind(flush_interval=60)
+    session = SimpleSession()
+    session_id = sss._do_create(session)
+
+    session.host = '10.0.0.1'
+    sss.cache_handler = mock.Mock()
+    sss.cache_handler.get.return_value = None  # as if evicted from cache
+
+    sss.update(session)
+    assert sss._do_read(session_id).host is None  # not yet written
+    assert sss.read(session_id) is session
+
+    sss.delete(session)
+    assert sss.read(session_id) is None
+    assert sss._do_read(session_id) is not None
+
+    sss.disable_write_behind()
+    assert sss._do_read(session_id) is None
+
+
+def test_sqlss_write_behind_merges_partial_updates(sqlite_session_store):
+    """
+    unit tested:  _merge_writes
+
+    test case:
+    partial updates coalesced by the write-behind queue keep every change
+    """
+    sss = sqlite_session_store
+    sss.cache_handler = mock.Mock()
+    sss.enable_write_behind(flush_interval=60)
+    session = SimpleSession()
+    session_id = sss._do_create(session)
+
+    session.host = '10.0.0.1'
+    sss.update(session)
+    session.touch()
+    sss.update(session)
+
+    fn, (pending_session, changes) = sss.write_behind_queue.get_pending(
+        session_id)
+    assert set(changes) == {'_host', '_last_access_time'}
+
+    sss.disable_write_behind()
+    stored = sss._do_read(session_id)
+    assert stored.host == '10.0.0.1'
+    assert stored.last_access_time == session.last_access_time
+
+# -----------------------------------------------------------------------------
+# SealedSessionStore
+# -----------------------------------------------------------------------------
+
+class TokenSessionStore(SealedSessionStore):
+    """ carries its token in an attribute, as a cookie would be """
+
+    token = None
+
+    def get_token(self):
+        return self.token
+
+    def set_token(self, token):
+        self.token = token
+
+    def delete_token(self):
+        self.token = None
+
+
+@pytest.mark.parametrize('mode', ['fernet', 'hmac'])
+def test_sealer_round_trip(mode):
+    """
+    unit tested:  SessionSealer.seal, SessionSealer.unseal
+
+    test case:
+    sealed bytes unseal only with the key that sealed them, and not at all
+    once tampered with
+    """
+    sealer = SessionSealer(Fernet.generate_key(), mode)
+    token = sealer.seal(b'payload')
+    assert '=' not in token
+    assert sealer.unseal(token) == b'payload'
+    assert SessionSealer(Fernet.generate_key(), mode).unseal(token) is None
+    assert sealer.unseal(token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB')) is None
+    assert sealer.unseal('not a token') is None
+
+
+@pytest.mark.parametrize('mode', ['fernet', 'hmac'])
+def test_sealedss_round_trip(mode):
+    """
+    unit tested:  create, read, update
+
+    test case:
+    a session is read back from its token, by its id or by the token itself,
+    and an update reseals it only when it changed
+    """
+    store = TokenSessionStore(Fernet.generate_key(), mode)
+    session = SimpleSession()
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier='user')
+    session.set_internal_attribute('identifiers_session_key', identifiers)
+    session_id = store.create(session)
+    token = store.token
+    assert token is not None
+
+    other = TokenSessionStore(store.sealer._key, mode)  # another process
+    other.token = token
+    read = other.read(session_id)
+    assert read == session
+    assert other.read(token) is read  # unsealed once
+
+    other.update(read)  # unchanged
+    assert other.token == token
+
+    read.set_internal_attribute('authenticated_session_key', True)
+    other.update(read)
+    assert other.token != token
+    resealed = store.unseal(other.token)
+    assert resealed.get_internal_attribute('authenticated_session_key') is True
+
+
+def test_sealedss_revocation():
+    """
+    unit tested:  delete, SessionDenyList
+
+    test case:
+    a deleted session's token can't be read again, even when a client
+    presents it anew
+    """
+    store = TokenSessionStore(Fernet.generate_key())
+    session = SimpleSession()
+    session_id = store.create(session)
+    token = store.token
+
+    store.delete(session)
+    assert store.token is None
+    assert store.deny_list.is_revoked(session_id)
+
+    store.token = token
+    with pytest.raises(UnknownSessionException):
+        store.read(session_id)
+    with pytest.raises(UnknownSessionException):
+        store.read(token)
+
+
+def test_sealedss_deny_list_uses_cache():
+    """
+    unit tested:  SessionDenyList.revoke, SessionDenyList.is_revoked
+
+    test case:
+    revocations are shared through cache, which is consulted only for ids not
+    revoked locally
+    """
+    deny_list = SessionDenyList()
+    deny_list.cache_handler = mock.Mock()
+    deny_list.cache_handler.get.return_value = None
+    deny_list.revoke('session1')
+
+    assert deny_list.is_revoked('session1')
+    deny_list.cache_handler.get.assert_not_called()
+    assert deny_list.cache_handler.set.call_args[1]['identifier'] == 'session1'
+
+    assert not deny_list.is_revoked('session2')
+    deny_list.cache_handler.get.return_value = DefaultSessionKey('session2')
+    assert deny_list.is_revoked('session2')
+
+
+def test_sealedss_token_too_large():
+    """
+    unit tested:  seal
+
+    test case:
+    a session too large for a cookie can't be sealed
+    """
+    store = TokenSessionStore(Fernet.generate_key())
+    session = SimpleSession()
+    identifiers = SimpleIdentifierCollection(source_name='realm',
+                                             identifier=os.urandom(4000).hex())
+    session.set_internal_attribute('identifiers_session_key', identifiers)
+    with pytest.raises(SealedSessionTooLargeException):
+        store.create(session)
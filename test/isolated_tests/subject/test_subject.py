@@ -19,6 +19,8 @@ from yosai.core import (
     SecurityUtils,
     thread_local,
     UnauthenticatedException,
+    get_current_lib,
+    global_security_manager,
 )
 
 from ..doubles import (
@@ -170,6 +172,25 @@ def test_dsc_resolve_identifiers_none_sessionreturns(
     assert result == 'identifiers'
 
 
+def test_dsc_resolve_identifiers_none_sessionstate(
+        default_subject_context, monkeypatch, mock_session):
+    """
+    unit tested:  resolve_identifiers
+
+    test case:
+    when the subject state of the session was read along with the session,
+    its identifiers are used rather than reading the session again
+    """
+    dsc = default_subject_context
+    state = collections.namedtuple('state', 'identifiers')(None)
+    monkeypatch.setattr(dsc, 'get', lambda x: state if 'SESSION_STATE' in x
+                        else None)
+    monkeypatch.setattr(dsc, 'resolve_session', lambda: mock_session)
+    with mock.patch.object(mock_session, 'get_internal_attribute') as gia:
+        assert dsc.resolve_identifiers() is None
+        gia.assert_not_called()
+
+
 def test_dsc_resolve_session_exists(default_subject_context):
     """
     unit tested:  resolve_session
@@ -789,6 +810,39 @@ def test_get_session_withoutsessionattribute_createsnew(
             assert result == mock_session
 
 
+def test_get_session_lazy_creation(delegating_subject, monkeypatch):
+    """
+    unit tested:  get_session
+
+    test case:
+    with lazy session creation, a session is started upon its first write
+    and not when it's obtained or read
+    """
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'session', None)
+    monkeypatch.setattr(ds, 'create_session_context', lambda: 'sessioncontext')
+    session_manager = mock.Mock(lazy_session_creation=True)
+    monkeypatch.setattr(ds.security_manager, 'session_manager',
+                        session_manager, raising=False)
+    started = mock.MagicMock(session_id='sessionid')
+
+    with mock.patch.object(MockSecurityManager, 'start') as mock_start:
+        mock_start.return_value = started
+        session = ds.get_session()
+        assert session.session_id is None
+        assert session.get_attribute('cart') is None
+        session.touch()
+        monkeypatch.setattr(ds, '_identifiers', None)  # anonymous
+        DefaultSubjectStore().save_to_session(ds)
+        mock_start.assert_not_called()
+
+        session.set_attribute('cart', ['item'])
+        mock_start.assert_called_once_with('sessioncontext')
+        assert session.session_id == 'sessionid'
+        started.set_attribute.assert_called_once_with('cart', ['item'])
+        assert ds.get_session() is session
+
+
 def test_create_session_context_without_host(delegating_subject, monkeypatch):
     """
     unit tested:  create_session_context
@@ -967,6 +1021,43 @@ def test_ds_get_run_as_identifiers_stack(
     assert result == expected
 
 
+def test_ds_run_as_stack_read_once(delegating_subject, mock_session,
+                                   monkeypatch):
+    """
+    unit tested:  identifiers, get_run_as_identifiers_stack, push_identity,
+                  pop_identity
+
+    test case:
+    the run-as stack is read from the session once, and then kept in step
+    with the session by push_identity and pop_identity, until the subject's
+    session changes
+    """
+    ds = delegating_subject
+    ds.session = mock_session
+    identifiers = ds._identifiers
+    other = SimpleIdentifierCollection(source_name='realm', identifier='other')
+
+    with mock.patch.object(mock_session, 'get_internal_attribute') as get:
+        get.return_value = None
+        with mock.patch.object(mock_session, 'set_internal_attribute') as put:
+            for _ in range(3):
+                assert ds.identifiers == identifiers
+            assert not ds.is_run_as
+
+            ds.push_identity(other)
+            assert ds.identifiers == other
+            put.assert_called_once_with(ds.run_as_identifiers_session_key,
+                                        collections.deque([other]))
+
+            assert ds.pop_identity() == other
+            assert ds.identifiers == identifiers
+        get.assert_called_once_with(ds.run_as_identifiers_session_key)
+
+        ds.session = mock_session
+        assert ds.identifiers == identifiers
+        assert get.call_count == 2
+
+
 def test_ds_clear_run_as_identities(
         delegating_subject, mock_session, monkeypatch):
     """
@@ -1545,7 +1636,7 @@ def test_su_get_subject_notinthreadlocal(
     with csu:
         with mock.patch('yosai.core.SubjectBuilder', return_value=msb):
             result = csu.subject
-            assert csu._subject == result
+            assert csu._local.subject == result
 
 
 def test_su_get_subject_inthreadlocal(monkeypatch, mock_subject_builder,
@@ -1557,7 +1648,38 @@ def test_su_get_subject_inthreadlocal(monkeypatch, mock_subject_builder,
     when a subject is bound to a SecurityUtils, it is returned
     """
     csu = configured_securityutils
-    monkeypatch.setattr(csu, '_subject', 'subject', raising=False)
+    monkeypatch.setattr(csu._local, 'subject', 'subject')
     with csu:
         result = csu.subject
         assert result == 'subject'
+
+
+def test_su_context_is_local_to_execution_context():
+    """
+    unit tested:  __enter__, __exit__
+
+    test case:
+    a SecurityUtils entered, and the subject it loads, are current only within
+    the execution context that entered it, and not within a copy of the
+    context taken beforehand
+    """
+    contextvars = pytest.importorskip('contextvars')
+    su = SecurityUtils()
+    stack = global_security_manager.stack
+    other = contextvars.copy_context()
+
+    def enter_other():
+        with SecurityUtils() as other_su:
+            return get_current_lib() is other_su
+
+    with su:
+        su._local.subject = 'subject'
+        assert get_current_lib() is su
+        assert other.run(lambda: global_security_manager.stack) == stack
+        assert other.run(lambda: su._local.subject) is None
+        assert other.run(enter_other)
+        assert get_current_lib() is su
+        assert su.subject == 'subject'
+
+    assert global_security_manager.stack == stack
+    assert su._local.subject is None
@@ -52,6 +52,7 @@ from .exceptions import (
     EventException,
     EventRegistrationException,
     ExecutionException,
+    ExecutorSaturatedException,
     ExcessiveAttemptsException,
     ExpiredCredentialsException,
     ExpiredSessionException,
@@ -81,12 +82,14 @@ from .exceptions import (
     MissingPrivateSaltException,
     MultiRealmAuthenticationException,
     PasswordMatchException,
+    PasswordServiceSaturatedException,
     PasswordVerifierInvalidTokenException,
     PasswordVerifierInvalidAccountException,
     PreparePasswordException,
     PermissionIndexingException,
     RealmAttributesException,
     SaveSubjectException,
+    SealedSessionTooLargeException,
     SecurityManagerException,
     SecurityManagerNotSetException,
     SerializationException,
@@ -146,14 +149,25 @@ from yosai.core.account.account import (
 )
 
 
-from yosai.core.event.event import (
-    DefaultEventBus,
-    event_bus,
+from yosai.core.cache.cache import (
+    AsyncCacheHandlerAdapter,
 )
 
 
 from yosai.core.concurrency.concurrency import (
+    BatchingQueue,
+    BoundedExecutor,
     StoppableScheduledExecutor,
+    WriteBehindQueue,
+)
+
+
+from yosai.core.event.event import (
+    DefaultEventBus,
+    DirectEventBus,
+    EventLogger,
+    event_bus,
+    event_logger,
 )
 
 
@@ -161,6 +175,7 @@ from yosai.core.utils.utils import (
     OrderedSet,
     memoized_property,
     unix_epoch_time,
+    ContextLocal,
     global_security_manager,
     get_current_lib,
 )
@@ -196,10 +211,13 @@ from yosai.core.session.session import (
     DefaultSessionKey,
     DefaultNativeSessionManager,
     DelegatingSession,
+    ExecutorServiceSessionValidationScheduler,
     DefaultSessionStorageEvaluator,
-    # ExecutorServiceSessionValidationScheduler,
     MemorySessionStore,
+    SessionExpirationIndex,
+    SessionIdSet,
     ProxiedSession,
+    LazySession,
     # SessionTokenGenerator,
     # ScheduledSessionValidator,
     DefaultNativeSessionHandler,
@@ -208,6 +226,22 @@ from yosai.core.session.session import (
 )
 
 
+from yosai.core.session.sqlite_store import (
+    SQLiteSessionStore,
+)
+
+from yosai.core.session.sealed_store import (
+    SealedSessionStore,
+    SessionDenyList,
+    SessionSealer,
+)
+
+from yosai.core.event.relay import (
+    EventRelay,
+    UnixSocketTransport,
+)
+
+
 thread_local = threading.local()  # use only one global instance
 
 from yosai.core.subject.subject import(
@@ -238,6 +272,11 @@ from yosai.core.authc.context import (
     authc_settings,
 )
 
+from yosai.core.authc.throttle import (
+    LoginAttempts,
+    LoginAttemptLimiter,
+)
+
 from yosai.core.authc.authc import (
     Credential,
     CredentialResolver,
@@ -249,11 +288,13 @@ from yosai.core.authc.credential import (
     DefaultPasswordService,
     PasswordVerifier,
     SimpleCredentialsVerifier,
+    VerifiedCredentialCache,
     AllowAllCredentialsVerifier,
 )
 
 from yosai.core.authz.authz import (
     AllPermission,
+    AuthorizationResultsSampler,
     AuthzInfoResolver,
     DefaultPermission,
     PermissionResolver,
@@ -281,6 +322,7 @@ from yosai.core.mgt.mgt_settings import(
 from yosai.core.mgt.mgt import (
     AbstractRememberMeManager,
     NativeSecurityManager,
+    RememberedIdentityCache,
 )
 
 
@@ -59,6 +59,8 @@ class Account(metaclass=ABCMeta):
             - its @post_load make_object method should return a newly populated dict
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def account_id(self):  # DG:  renamed
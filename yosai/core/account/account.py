@@ -9,6 +9,8 @@ class Account(account_abcs.Account):
     with an account
     """
 
+    __slots__ = ('_account_id', '_credentials', '_attributes', '_authz_info')
+
     def __init__(self, account_id=None, credentials=None, attributes=None,
                  authz_info=None):
         self.account_id = account_id
@@ -56,6 +56,8 @@ class AuthenticationToken(metaclass=ABCMeta):
     already implements this interface).
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def identifier(self):
@@ -147,6 +149,7 @@ class CredentialsVerifier(metaclass=ABCMeta):
 
 
 class HostAuthenticationToken(AuthenticationToken):
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -187,6 +190,7 @@ class HashingPasswordService(PasswordService):
 
 
 class RememberMeAuthenticationToken(AuthenticationToken):
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -23,11 +23,15 @@ from marshmallow import Schema, fields, post_load
 from yosai.core import (
     AuthenticationException,
     AuthenticationEventException,
+    ExcessiveAttemptsException,
     InvalidTokenPasswordException,
+    LoginAttemptLimiter,
     UnknownAccountException,
     UnsupportedTokenException,
+    authc_settings,
     event_abcs,
     authc_abcs,
+    cache_abcs,
     serialize_abcs,
     FirstRealmSuccessfulStrategy,
     DefaultAuthenticationAttempt,
@@ -40,6 +44,9 @@ logger = logging.getLogger(__name__)
 class UsernamePasswordToken(authc_abcs.HostAuthenticationToken,
                             authc_abcs.RememberMeAuthenticationToken):
 
+    __slots__ = ('_host', '_password', '_is_remember_me', '_username',
+                 '_identifier', '_credentials')
+
     def __init__(self, username, password, remember_me=False,
                  host=None):
         """
@@ -121,7 +128,7 @@ class UsernamePasswordToken(authc_abcs.HostAuthenticationToken,
     def clear(self):
         self.identifier = None
         self.host = None
-        self.remember_me = False
+        self.is_remember_me = False
 
         try:
             if (self._password):
@@ -143,7 +150,8 @@ class UsernamePasswordToken(authc_abcs.HostAuthenticationToken,
 
 
 class DefaultAuthenticator(authc_abcs.Authenticator,
-                           event_abcs.EventBusAware):
+                           event_abcs.EventBusAware,
+                           cache_abcs.CacheHandlerAware):
 
     # Unlike Shiro, Yosai injects the strategy and the eventbus
     def __init__(self, strategy=FirstRealmSuccessfulStrategy()):
@@ -155,6 +163,15 @@ class DefaultAuthenticator(authc_abcs.Authenticator,
         self._realms = None
         self._event_bus = None
         self._credential_resolver = None
+        self._cache_handler = None
+
+        # new to yosai:  rejects excessive failed logins before hashing
+        self.login_attempt_limiter = None
+        if authc_settings.login_attempts_enabled:
+            self.login_attempt_limiter = LoginAttemptLimiter(
+                time_window=authc_settings.login_attempts_time_window,
+                max_identifier_attempts=authc_settings.max_identifier_login_attempts,
+                max_host_attempts=authc_settings.max_host_login_attempts)
 
     @property
     def event_bus(self):
@@ -164,6 +181,17 @@ class DefaultAuthenticator(authc_abcs.Authenticator,
     def event_bus(self, eventbus):
         self._event_bus = eventbus
 
+    @property
+    def cache_handler(self):
+        return self._cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        # just a pass-through to the login_attempt_limiter, if there is one
+        self._cache_handler = cachehandler
+        if self.login_attempt_limiter:
+            self.login_attempt_limiter.cache_handler = cachehandler
+
     @property
     def cache_invalidator(self):
         return self._cache_invalidator
@@ -211,6 +239,8 @@ class DefaultAuthenticator(authc_abcs.Authenticator,
             logger.debug(msg)
 
             try:
+                self.assert_login_attempt_allowed(authc_token)
+
                 account = self.do_authenticate_account(authc_token)
                 if (account is None):
                     msg2 = ("No account returned by any configured realms for "
@@ -221,7 +251,12 @@ class DefaultAuthenticator(authc_abcs.Authenticator,
 
             except Exception as ex:
                 ae = None
-                if isinstance(ex, AuthenticationException):
+                if isinstance(ex, ExcessiveAttemptsException):
+                    # a throttled attempt isn't counted as another failure
+                    # and is propagated so that the caller may explain it
+                    ae = ex
+                elif isinstance(ex, AuthenticationException):
+                    self.record_login_failure(authc_token)
                     ae = AuthenticationException()
                 if ae is None:
                     """
@@ -253,10 +288,29 @@ class DefaultAuthenticator(authc_abcs.Authenticator,
                     format(authc_token, account))
             logger.debug(msg5)
 
+            self.clear_login_failures(authc_token)
             self.notify_success(account)
 
             return account
 
+    def assert_login_attempt_allowed(self, authc_token):
+        """
+        Consults the login_attempt_limiter, when one is configured, before any
+        realm is asked to verify credentials.
+
+        :raises ExcessiveAttemptsException: when the attempt is throttled
+        """
+        if self.login_attempt_limiter:
+            self.login_attempt_limiter.assert_attempt_allowed(authc_token)
+
+    def record_login_failure(self, authc_token):
+        if self.login_attempt_limiter:
+            self.login_attempt_limiter.record_failure(authc_token)
+
+    def clear_login_failures(self, authc_token):
+        if self.login_attempt_limiter:
+            self.login_attempt_limiter.clear(authc_token)
+
     def do_authenticate_account(self, authc_token):
 
         if (not self.realms):
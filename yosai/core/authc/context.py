@@ -16,6 +16,7 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import threading
 
 from yosai.core import (
     AuthenticationSettingsContextException,
@@ -39,6 +40,38 @@ class AuthenticationSettings():
                                                        'bcrypt_sha256')
         self.algorithms = self.authc_config.get('hash_algorithms', None)
 
+        # an optional, bounded worker pool that isolates password hashing:
+        executor_config = self.authc_config.get('hashing_executor', None) or {}
+        self.hashing_executor_enabled = executor_config.get('enabled', False)
+        self.hashing_executor_max_workers =\
+            executor_config.get('max_workers', 4)
+        self.hashing_executor_max_queue_depth =\
+            executor_config.get('max_queue_depth', 16)
+        self.hashing_executor_use_processes =\
+            executor_config.get('use_processes', False)
+
+        # optional throttling of failed login attempts:
+        attempts_config = self.authc_config.get('login_attempts', None) or {}
+        self.login_attempts_enabled = attempts_config.get('enabled', False)
+        self.login_attempts_time_window =\
+            attempts_config.get('time_window', 300)
+        self.max_identifier_login_attempts =\
+            attempts_config.get('max_identifier_attempts', 5)
+        self.max_host_login_attempts =\
+            attempts_config.get('max_host_attempts', 50)
+
+        # optional, short-lived memory of successful password verifications:
+        verified_config =\
+            self.authc_config.get('verified_credentials_cache', None) or {}
+        self.verified_credentials_enabled =\
+            verified_config.get('enabled', False)
+        self.verified_credentials_ttl = verified_config.get('ttl', 60)
+        self.verified_credentials_max_entries =\
+            verified_config.get('max_entries', 10000)
+
+        # whether to replace outdated password hashes upon successful login:
+        self.rehash_on_login = self.authc_config.get('rehash_on_login', False)
+
     def get_config(self, algo):
         """
         obtains a dict of the underlying authc_config for an algorithm
@@ -47,6 +80,17 @@ class AuthenticationSettings():
             return self.algorithms.get(algo, {})
         return {}
 
+    @property
+    def deprecated_algorithms(self):
+        """
+        the configured algorithms other than the default one, which are
+        still verified but whose hashes are due to be replaced
+        """
+        if self.algorithms:
+            return sorted(algo for algo in self.algorithms
+                          if algo != self.default_algorithm)
+        return []
+
     def __repr__(self):
         return ("AuthenticationSettings(default_algorithm={0}, algorithms={1},"
                 "authc_config={2}".format(self.default_algorithm,
@@ -56,38 +100,53 @@ class AuthenticationSettings():
 class CryptContextFactory():
     """
     New to Yosai.  CryptContextFactory proxies passlib's CryptContext api.
+
+    Building a CryptContext is relatively costly.  get_crypt_context returns
+    a CryptContext from a process-wide registry, keyed by the context's
+    configuration, building one only when the configuration is first seen.
+    Contexts obtained this way are shared and so must not be modified.
     """
 
+    _registry = {}
+    _registry_lock = threading.Lock()
+
     def __init__(self, authc_settings):
         """
         :type authc_settings: AuthenticationSettings
         """
         self.authc_settings = authc_settings
 
-    def generate_context(self, algorithm):
-
-        authc_config = self.authc_settings.get_config(algorithm)
+    def generate_context(self, algorithm, deprecated_algorithms=None):
 
         """
         This method is new to Yosai and not a port from Shiro.  It is
         the primary configurable api for passlib hash management.
 
         :param algorithm:  the algorithm name as recognized by passlib
-        :param authc_config: the dict of a specific algorithm's settings
+        :param deprecated_algorithms: algorithms whose hashes are verified
+                                      but flagged as needing replacement
         :returns: a passlib CryptContext object
         """
         if (not algorithm):
             msg = "hashing algorithm missing"
             raise MissingHashAlgorithmException(msg)
 
-        context = dict(schemes=[algorithm])
+        deprecated = [algo for algo in (deprecated_algorithms or [])
+                      if algo != algorithm]
 
-        context.update({"{0}__{1}".format(algorithm, key): value
-                       for key, value in authc_config.items()})
+        context = dict(schemes=[algorithm] + deprecated)
+        if deprecated:
+            context.update(default=algorithm, deprecated=deprecated)
+
+        for algo in context['schemes']:
+            authc_config = self.authc_settings.get_config(algo)
+            context.update({"{0}__{1}".format(algo, key): value
+                           for key, value in authc_config.items()})
         return context
 
     def create_crypt_context(self,
-                             algorithm=None):
+                             algorithm=None,
+                             deprecated_algorithms=None):
         """
         :type request: HashRequest
         :returns: CryptContext
@@ -95,7 +154,7 @@ class CryptContextFactory():
         if not algorithm:
             algorithm = self.authc_settings.default_algorithm
 
-        context = self.generate_context(algorithm)
+        context = self.generate_context(algorithm, deprecated_algorithms)
 
         try:
             myctx = CryptContext(**context)
@@ -105,6 +164,39 @@ class CryptContextFactory():
 
         return myctx
 
+    def get_crypt_context(self, algorithm=None, deprecated_algorithms=None):
+        """
+        :returns: a shared CryptContext for the algorithm's configuration
+        """
+        if not algorithm:
+            algorithm = self.authc_settings.default_algorithm
+
+        context = self.generate_context(algorithm, deprecated_algorithms)
+
+        try:
+            key = tuple(sorted((name, tuple(value) if isinstance(value, list)
+                                else value) for name, value in context.items()))
+            hash(key)
+        except TypeError:
+            # an unhashable setting, so the context can't be registered
+            return self.create_crypt_context(algorithm, deprecated_algorithms)
+
+        registry = CryptContextFactory._registry
+        myctx = registry.get(key)
+        if myctx is None:
+            with CryptContextFactory._registry_lock:
+                myctx = registry.get(key)
+                if myctx is None:
+                    myctx = self.create_crypt_context(algorithm,
+                                                      deprecated_algorithms)
+                    registry[key] = myctx
+        return myctx
+
+    @classmethod
+    def clear_registry(cls):
+        with cls._registry_lock:
+            cls._registry.clear()
+
     def __repr__(self):
         return ("<CryptContextFactory(authc_settings={0})>".
                 format(self.authc_settings))
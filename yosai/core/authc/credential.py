@@ -17,31 +17,112 @@ specific language governing permissions and limitations
 under the License.
 """
 
+import hashlib
+import hmac
 import logging
+import os
+import threading
+import time
+
+from passlib.context import CryptContext
 
 from yosai.core import (
+    BoundedExecutor,
     CryptContextFactory,
+    ExecutorSaturatedException,
     IllegalStateException,
     MissingCredentialsException,
     PasswordMatchException,
+    PasswordServiceSaturatedException,
     PasswordVerifierInvalidAccountException,
     PasswordVerifierInvalidTokenException,
     authc_abcs,
     authc_settings,
+    event_abcs,
 )
 
 logger = logging.getLogger(__name__)
 
+# CryptContexts rebuilt within hashing worker processes, keyed by config:
+_worker_crypt_contexts = {}
+
+
+def _get_worker_crypt_context(context_config):
+    crypt_context = _worker_crypt_contexts.get(context_config)
+    if crypt_context is None:
+        crypt_context = CryptContext.from_string(context_config)
+        _worker_crypt_contexts[context_config] = crypt_context
+    return crypt_context
+
+
+def verify_password(context_config, password, saved):
+    """
+    Verifies a password from within a hashing worker process.  A CryptContext
+    can't be sent to another process, so its serialized configuration is
+    sent instead and the rebuilt context is kept for subsequent calls.
+
+    :param context_config: a CryptContext serialized by its to_string method
+    :type context_config: str
+    """
+    return _get_worker_crypt_context(context_config).verify(password, saved)
+
+
+def verify_and_update_password(context_config, password, saved):
+    """
+    The verify_and_update counterpart of verify_password.
+
+    :returns: tuple(matched, new_hash)
+    """
+    crypt_context = _get_worker_crypt_context(context_config)
+    return crypt_context.verify_and_update(password, saved)
+
+
 class DefaultPasswordService:
 
     def __init__(self):
-        # using default algorithm when generating crypt context:
-        self.crypt_context = CryptContextFactory(authc_settings).\
-            create_crypt_context()
+        # the crypt context is obtained upon first use:
+        self._crypt_context = None
+        self._crypt_context_config = None
+
+        # new to yosai:  when enabled, hashes created by a non-default
+        # algorithm, or with outdated settings, are replaced upon login
+        self.rehash_on_login = authc_settings.rehash_on_login
         # self.private_salt = bytearray(authc_settings.private_salt, 'utf-8')
 
         # in Yosai, hash formatting is taken care of by passlib
 
+        self.hashing_executor = None
+        if authc_settings.hashing_executor_enabled:
+            self.hashing_executor = BoundedExecutor(
+                max_workers=authc_settings.hashing_executor_max_workers,
+                max_queue_depth=authc_settings.hashing_executor_max_queue_depth,
+                use_processes=authc_settings.hashing_executor_use_processes)
+
+    @property
+    def crypt_context(self):
+        if self._crypt_context is None:
+            # using default algorithm, shared among all password services:
+            deprecated = None
+            if self.rehash_on_login:
+                deprecated = authc_settings.deprecated_algorithms
+            self._crypt_context = CryptContextFactory(authc_settings).\
+                get_crypt_context(deprecated_algorithms=deprecated)
+        return self._crypt_context
+
+    @crypt_context.setter
+    def crypt_context(self, crypt_context):
+        self._crypt_context = crypt_context
+        self._crypt_context_config = None
+
+    @property
+    def crypt_context_config(self):
+        """
+        the serialized crypt context, from which worker processes rebuild it
+        """
+        if self._crypt_context_config is None:
+            self._crypt_context_config = self.crypt_context.to_string()
+        return self._crypt_context_config
+
     def passwords_match(self, password, saved):
         """
         :param password: the password requiring authentication, passed by user
@@ -55,19 +136,172 @@ class DefaultPasswordService:
         Unlike Shiro:
             - Yosai expects saved to be a str and never a binary Hash
             - passlib determines the format and compatability
+
+        :raises PasswordServiceSaturatedException: when a hashing_executor is
+                                                   configured and has no
+                                                   capacity left
         """
         try:
+            if self.hashing_executor:
+                return self.verify_in_executor(password, saved)
             return self.crypt_context.verify(password, saved)
 
         except (AttributeError, TypeError):
             raise PasswordMatchException('unrecognized attribute type')
 
+    def verify_and_update(self, password, saved):
+        """
+        Verifies the password and, if it matches a hash that the crypt context
+        considers outdated, creates a replacement hash from the same password.
+
+        :returns: tuple(matched, new_hash), where new_hash is None unless the
+                  saved hash ought to be replaced
+
+        :raises PasswordServiceSaturatedException: when a hashing_executor is
+                                                   configured and has no
+                                                   capacity left
+        """
+        try:
+            if self.hashing_executor:
+                return self.verify_in_executor(password, saved, update=True)
+            return self.crypt_context.verify_and_update(password, saved)
+
+        except (AttributeError, TypeError):
+            raise PasswordMatchException('unrecognized attribute type')
+
+    def verify_in_executor(self, password, saved, update=False):
+        """
+        Hands verification to the hashing_executor, blocking until a worker
+        returns the result.  When the executor is saturated, the attempt fails
+        immediately rather than wait behind other logins.
 
-class PasswordVerifier(authc_abcs.CredentialsVerifier):
-    """ DG:  Dramatic changes made here while adapting to passlib and python"""
+        :param update: when True, verify_and_update is performed instead
+        """
+        executor = self.hashing_executor
+        try:
+            if executor.use_processes:
+                func = (verify_and_update_password if update
+                        else verify_password)
+                future = executor.submit(func, self.crypt_context_config,
+                                         password, saved)
+            else:
+                func = (self.crypt_context.verify_and_update if update
+                        else self.crypt_context.verify)
+                future = executor.submit(func, password, saved)
+        except ExecutorSaturatedException as ese:
+            msg = ("Password verification capacity exhausted -- rejecting "
+                   "authentication attempt.")
+            logger.warning(msg)
+            raise PasswordServiceSaturatedException(msg, ese)
+
+        return future.result()
+
+
+class VerifiedCredentialCache:
+    """
+    VerifiedCredentialCache is new to Yosai.  It remembers, for a short time,
+    which submitted passwords were recently verified against which stored
+    hashes so that clients that authenticate on every request (such as API
+    clients using HTTP Basic) don't pay for a full key derivation each time.
+
+    Entries are keyed by an HMAC of the identifier, submitted password and
+    stored hash, using a key that is generated per process and never leaves
+    it.  Neither passwords nor reversible derivatives of them are retained.
+    A changed stored hash naturally misses the cache.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        """
+        :param ttl: the number of seconds that a verification is remembered
+        :param max_entries: the number of verifications that may be
+                            remembered before stale entries are purged
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._key = os.urandom(32)
+        self._entries = {}  # identifier: {digest: expiration}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def digest(self, identifier, password, stored):
+        mac = hmac.new(self._key, digestmod=hashlib.sha256)
+        for part in (identifier, password, stored):
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            elif not isinstance(part, (bytes, bytearray)):
+                part = str(part).encode('utf-8')
+            mac.update(len(part).to_bytes(4, 'big'))
+            mac.update(part)
+        return mac.digest()
+
+    def contains(self, identifier, digest):
+        with self._lock:
+            expiration = self._entries.get(identifier, {}).get(digest)
+        return expiration is not None and expiration > time.time()
+
+    def add(self, identifier, digest):
+        with self._lock:
+            if self._size >= self.max_entries:
+                self._purge_expired()
+            digests = self._entries.setdefault(identifier, {})
+            if digest not in digests:
+                self._size += 1
+            digests[digest] = time.time() + self.ttl
+
+    def clear(self, identifier):
+        with self._lock:
+            self._size -= len(self._entries.pop(identifier, {}))
+
+    def _purge_expired(self):
+        now = time.time()
+        for identifier in list(self._entries):
+            digests = self._entries[identifier]
+            for digest, expiration in list(digests.items()):
+                if expiration <= now:
+                    del digests[digest]
+            if not digests:
+                del self._entries[identifier]
+
+        self._size = sum(len(digests) for digests in self._entries.values())
+        if self._size >= self.max_entries:
+            # every entry is current, so start over rather than grow
+            self._entries.clear()
+            self._size = 0
+
+    def __repr__(self):
+        return ("VerifiedCredentialCache(ttl={0}, max_entries={1})".
+                format(self.ttl, self.max_entries))
+
+
+class PasswordVerifier(authc_abcs.CredentialsVerifier,
+                       event_abcs.EventBusAware):
+    """
+    DG:  Dramatic changes made here while adapting to passlib and python
+
+    When the password service has rehash_on_login enabled, a successful
+    verification against an outdated hash publishes a CREDENTIALS.REHASH event
+    carrying the account's identifier and the replacement hash.  Persisting the
+    replacement is left to a listener, such as the account store.
+    """
 
     def __init__(self):
         self.password_service = DefaultPasswordService()
+        self._event_bus = None
+
+        # new to yosai:  opt-in, short-lived memory of successful verifications
+        self.verified_credentials = None
+        if authc_settings.verified_credentials_enabled:
+            self.verified_credentials = VerifiedCredentialCache(
+                ttl=authc_settings.verified_credentials_ttl,
+                max_entries=authc_settings.verified_credentials_max_entries)
+
+    @property
+    def event_bus(self):
+        return self._event_bus
+
+    @event_bus.setter
+    def event_bus(self, eventbus):
+        self._event_bus = eventbus
 
     def credentials_match(self, authc_token, account):
         self.ensure_password_service()
@@ -76,8 +310,43 @@ class PasswordVerifier(authc_abcs.CredentialsVerifier):
         # stored_credentials should either be bytes or unicode:
         stored_credentials = self.get_stored_password(account)
 
-        return self.password_service.passwords_match(submitted_password,
-                                                     stored_credentials)
+        verified = self.verified_credentials
+        if verified:
+            identifier = getattr(account, 'account_id', None)
+            digest = verified.digest(identifier, submitted_password,
+                                     stored_credentials)
+            if verified.contains(identifier, digest):
+                return True
+
+        if getattr(self.password_service, 'rehash_on_login', False):
+            result, new_hash = self.password_service.verify_and_update(
+                submitted_password, stored_credentials)
+            if result and new_hash:
+                self.notify_rehash(account, new_hash)
+        else:
+            result = self.password_service.passwords_match(submitted_password,
+                                                           stored_credentials)
+        if result and verified:
+            verified.add(identifier, digest)
+
+        return result
+
+    def notify_rehash(self, account, new_hash):
+        """
+        A failure to publish is logged rather than raised, as the password was
+        verified and the outdated hash remains usable.
+        """
+        try:
+            self.event_bus.publish('CREDENTIALS.REHASH',
+                                   identifier=account.account_id,
+                                   credential=new_hash)
+        except AttributeError:
+            msg = "Could not publish CREDENTIALS.REHASH event"
+            logger.warning(msg)
+
+    def clear_verified_credentials(self, identifier):
+        if self.verified_credentials:
+            self.verified_credentials.clear(identifier)
 
     def ensure_password_service(self):
         if (not self.password_service):
@@ -0,0 +1,204 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+import logging
+import threading
+import time
+
+from marshmallow import Schema, fields, post_load
+
+from yosai.core import (
+    ExcessiveAttemptsException,
+    cache_abcs,
+    serialize_abcs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LoginAttempts(serialize_abcs.Serializable):
+    """
+    The times, in epoch seconds, of the most recent failed login attempts made
+    for a single identifier or from a single host.  Only as many timestamps as
+    are needed to reach the attempt limit are kept.
+    """
+
+    def __init__(self, timestamps=None):
+        self.timestamps = timestamps or []
+
+    def count_since(self, since):
+        return sum(1 for timestamp in self.timestamps if timestamp > since)
+
+    def add(self, timestamp, since, limit):
+        """
+        records an attempt, discarding attempts that have fallen out of the
+        time window along with any beyond the most recent ``limit``
+        """
+        recent = [ts for ts in self.timestamps if ts > since]
+        recent.append(timestamp)
+        self.timestamps = recent[-limit:]
+
+    @property
+    def latest(self):
+        if self.timestamps:
+            return self.timestamps[-1]
+        return None
+
+    def __repr__(self):
+        return "LoginAttempts(timestamps={0})".format(self.timestamps)
+
+    @classmethod
+    def serialization_schema(cls):
+
+        class SerializationSchema(Schema):
+            timestamps = fields.List(fields.Float())
+
+            @post_load
+            def make_login_attempts(self, data):
+                mycls = LoginAttempts
+                instance = mycls.__new__(mycls)
+                instance.__dict__.update(data)
+                return instance
+
+        return SerializationSchema
+
+
+class LoginAttemptLimiter(cache_abcs.CacheHandlerAware):
+    """
+    LoginAttemptLimiter is new to Yosai.  It keeps a sliding window of failed
+    login attempts per identifier and per host so that the authenticator may
+    reject an attempt, by raising an ExcessiveAttemptsException, before any
+    credentials are hashed.
+
+    Attempts are recorded within cache when a CacheHandler is available,
+    sharing the window among every process that uses the cache.  Otherwise,
+    attempts are recorded in local memory.  Cache updates are not atomic, so
+    concurrent failures may occasionally be undercounted.
+    """
+
+    # the in-memory fallback purges stale entries beyond this many keys:
+    max_memory_entries = 10000
+
+    def __init__(self, time_window=300, max_identifier_attempts=5,
+                 max_host_attempts=50):
+        """
+        :param time_window: the number of seconds that a failed attempt counts
+                            towards its limits
+        :param max_identifier_attempts: failures allowed per identifier within
+                                        the window, or None for no limit
+        :param max_host_attempts: failures allowed per host within the window,
+                                  or None for no limit
+        """
+        self.time_window = time_window
+        self.max_identifier_attempts = max_identifier_attempts
+        self.max_host_attempts = max_host_attempts
+        self._cache_handler = None
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_handler(self):
+        return self._cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        self._cache_handler = cachehandler
+
+    def get_limits(self, authc_token):
+        """
+        :yields: tuple(domain, key, max_attempts) for each limit that applies
+                 to the authc_token
+        """
+        identifier = getattr(authc_token, 'identifier', None)
+        if identifier is not None and self.max_identifier_attempts:
+            yield ('login_attempts', identifier, self.max_identifier_attempts)
+
+        host = getattr(authc_token, 'host', None)
+        if host and self.max_host_attempts:
+            yield ('host_login_attempts', host, self.max_host_attempts)
+
+    def assert_attempt_allowed(self, authc_token):
+        """
+        :raises ExcessiveAttemptsException: when the identifier or host of the
+                                            authc_token has too many recent
+                                            failed attempts
+        """
+        since = time.time() - self.time_window
+        for domain, key, max_attempts in self.get_limits(authc_token):
+            attempts = self.get_attempts(domain, key)
+            if attempts and attempts.count_since(since) >= max_attempts:
+                msg = ("Too many failed login attempts for [{0}] within {1} "
+                       "seconds.".format(key, self.time_window))
+                logger.warning(msg)
+                raise ExcessiveAttemptsException(msg)
+
+    def record_failure(self, authc_token):
+        now = time.time()
+        since = now - self.time_window
+        for domain, key, max_attempts in self.get_limits(authc_token):
+            attempts = self.get_attempts(domain, key) or LoginAttempts()
+            attempts.add(now, since, max_attempts)
+            self.set_attempts(domain, key, attempts)
+
+    def clear(self, authc_token):
+        """
+        A successful login resets the window of its identifier.  The window of
+        its host remains, as other identifiers may be under attack from it.
+        """
+        identifier = getattr(authc_token, 'identifier', None)
+        if identifier is not None:
+            self.delete_attempts('login_attempts', identifier)
+
+    def get_attempts(self, domain, key):
+        if self.cache_handler:
+            return self.cache_handler.get(domain=domain, identifier=key)
+
+        with self._lock:
+            return self._attempts.get((domain, key))
+
+    def set_attempts(self, domain, key, attempts):
+        if self.cache_handler:
+            self.cache_handler.set(domain=domain, identifier=key,
+                                   value=attempts)
+            return
+
+        with self._lock:
+            self._attempts[(domain, key)] = attempts
+            if len(self._attempts) > self.max_memory_entries:
+                self._purge_stale_attempts()
+
+    def delete_attempts(self, domain, key):
+        if self.cache_handler:
+            self.cache_handler.delete(domain=domain, identifier=key)
+            return
+
+        with self._lock:
+            self._attempts.pop((domain, key), None)
+
+    def _purge_stale_attempts(self):
+        since = time.time() - self.time_window
+        stale = [key for key, attempts in self._attempts.items()
+                 if attempts.latest is None or attempts.latest <= since]
+        for key in stale:
+            del self._attempts[key]
+
+    def __repr__(self):
+        return ("LoginAttemptLimiter(time_window={0}, "
+                "max_identifier_attempts={1}, max_host_attempts={2})".
+                format(self.time_window, self.max_identifier_attempts,
+                       self.max_host_attempts))
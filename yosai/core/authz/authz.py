@@ -16,7 +16,11 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import asyncio
 import itertools
+import random
+import threading
+import time
 
 from yosai.core import (
     AuthorizationEventException,
@@ -127,6 +131,8 @@ class WildcardPermission(serialize_abcs.Serializable):
     consistency across the Yosai community.  Again, a typical permission wildcard
     syntax is:  ``'domain:action:target'``.
     """
+    __slots__ = ('case_sensitive', 'parts')
+
     WILDCARD_TOKEN = '*'
     PART_DIVIDER_TOKEN = ':'
     SUBPART_DIVIDER_TOKEN = ','
@@ -261,7 +267,7 @@ class WildcardPermission(serialize_abcs.Serializable):
             def make_wildcard_permission(self, data):
                 mycls = WildcardPermission
                 instance = mycls.__new__(mycls)
-                instance.__dict__.update(data)
+                instance.__setstate__(data)
 
                 # have to convert to set from post_load due to the
                 # WildcardPartsSchema
@@ -395,6 +401,9 @@ class DefaultPermission(WildcardPermission):
     string to separate table columns (e.g. 'domain', 'action' and 'target'
     columns) and is subsequently used in querying strategies.
     """
+
+    __slots__ = ('_domain', '_action', '_target')
+
     def __init__(self, wildcard_string=None,
                  domain=None, action=None, target=None):
         """
@@ -523,7 +532,7 @@ class DefaultPermission(WildcardPermission):
             def make_default_permission(self, data):
                 mycls = DefaultPermission
                 instance = mycls.__new__(mycls)
-                instance.__dict__.update(data)
+                instance.__setstate__(data)
 
                 # have to convert to set from post_load due to the
                 # WildcardPartsSchema
@@ -542,6 +551,112 @@ class DefaultPermission(WildcardPermission):
         return SerializationSchema
 
 
+class AuthorizationResultsSampler:
+    """
+    AuthorizationResultsSampler is new to Yosai.  It reduces the volume of the
+    authorization events that a ModularRealmAuthorizer publishes, without
+    losing sight of a single denial.
+
+    Sampling
+    --------
+    Each topic may be given a sampling rate, between 0 and 1, that is the
+    chance that an event of the topic is published.  AUTHORIZATION.DENIED
+    events, and AUTHORIZATION.RESULTS events in which anything was denied, are
+    always published.
+
+    Aggregation
+    -----------
+    When given a window, in seconds, AUTHORIZATION.RESULTS events in which
+    everything was granted aren't published at all.  Instead, the number of
+    times that each permission or role was checked, and granted, is counted
+    per subject.  Denials are counted too, while still being published
+    individually.  Once a window has passed, an AUTHORIZATION.SUMMARY event
+    is published per subject, carrying items of
+    tuple(permission or role, checked, granted).  Summaries are published by
+    the first check made after their window closes, or by a call to the
+    authorizer's flush_results.
+    """
+
+    ALWAYS_PUBLISHED = frozenset(['AUTHORIZATION.DENIED'])
+
+    def __init__(self, sample_rates=None, window=None):
+        """
+        :param sample_rates: the sampling rate of each topic, topics omitted
+                             being published in full
+        :type sample_rates: dict
+
+        :param window: the number of seconds over which granted results are
+                       aggregated, or None to publish them as sampled
+        """
+        self.sample_rates = dict(sample_rates or {})
+        self.window = window
+        self.random = random.random
+
+        self._counts = {}  # primary_identifier: (identifiers, {item: [n, m]})
+        self._window_started = time.time()
+        self._lock = threading.Lock()
+
+    def is_sampled(self, topic_name):
+        """
+        :returns: whether to publish an event of the topic
+        """
+        if topic_name in self.ALWAYS_PUBLISHED:
+            return True
+        rate = self.sample_rates.get(topic_name, 1.0)
+        return rate >= 1 or self.random() < rate
+
+    def record_results(self, identifiers, results):
+        """
+        :param results: a dict of each permission or role checked and whether
+                        it was granted
+        :returns: whether to publish the results as an AUTHORIZATION.RESULTS
+                  event
+        """
+        denied = not all(results.values())
+        if self.window is None:
+            return denied or self.is_sampled('AUTHORIZATION.RESULTS')
+
+        identifier = identifiers.primary_identifier
+        with self._lock:
+            _, counts = self._counts.get(identifier, (None, {}))
+            self._counts[identifier] = (identifiers, counts)
+            for item, granted in results.items():
+                count = counts.get(item)
+                if count is None:
+                    count = counts[item] = [0, 0]
+                count[0] += 1
+                count[1] += bool(granted)
+        return denied
+
+    def pop_summaries(self, force=False):
+        """
+        :param force: whether to end the current window before it has passed
+        :returns: a list of tuple(identifiers, items, started, ended) per
+                  subject whose results were aggregated over a window that has
+                  ended, or an empty list
+        """
+        now = time.time()
+        if self.window is None or (not force and
+                                   now - self._window_started < self.window):
+            return []
+
+        with self._lock:
+            if not force and now - self._window_started < self.window:
+                return []  # popped by another thread
+            counts, self._counts = self._counts, {}
+            started, self._window_started = self._window_started, now
+
+        return [(identifiers,
+                 [(item, checked, granted)
+                  for item, (checked, granted) in item_counts.items()],
+                 started, now)
+                for identifiers, item_counts in counts.values()]
+
+    def __repr__(self):
+        return ("AuthorizationResultsSampler(sample_rates={0}, window={1})".
+                format(self.sample_rates, self.window))
+
+
 class ModularRealmAuthorizer(authz_abcs.Authorizer,
                              event_abcs.EventBusAware):
 
@@ -557,6 +672,7 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
         """
         self._realms = None
         self._event_bus = None
+        self.results_sampler = None
         self.serialization_manager = SerializationManager(format='json')
         # yosai omits resolver setting, leaving it to securitymanager instead
         # by default, yosai.core.does not support role -> permission resolution
@@ -617,6 +733,45 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
             # the realm's is_permitted returns a generator
             yield from realm.is_permitted(identifiers, permission_s)
 
+    # new to Yosai:
+    async def _gather_realm_results(self, check_name, identifiers, items):
+        """
+        awaits the coroutine counterpart of a check, such as
+        is_permitted_async, of every realm at once, so that their cache and
+        account store round trips overlap.  A realm without one is checked
+        synchronously.
+
+        :returns: an iterable of tuple(item, Boolean), of every realm
+        """
+        async def check(realm):
+            check_async = getattr(realm, check_name + '_async', None)
+            if check_async is None:
+                return list(getattr(realm, check_name)(identifiers, items))
+            return await check_async(identifiers, items)
+
+        realm_results = await asyncio.gather(*(check(realm)
+                                               for realm in self.realms))
+        return itertools.chain.from_iterable(realm_results)
+
+    # new to Yosai:
+    def _combine_results(self, identifiers, checked, log_results):
+        """
+        :param checked: an iterable of tuple(item, Boolean), of every realm
+
+        :returns: a frozenset of tuple(item, Boolean)
+        """
+        results = collections.defaultdict(bool)  # defaults to False
+
+        for item, granted in checked:
+            # As long as one realm returns True for an item, that item is
+            # granted.  Given that (True or False == True), assign accordingly:
+            results[item] = results[item] or granted
+
+        if log_results and self.has_listeners('AUTHORIZATION.RESULTS'):
+            self.log_results(identifiers, results)  # before freezing
+
+        return frozenset(results.items())
+
     def is_permitted(self, identifiers, permission_s, log_results=True):
         """
         Yosai differs from Shiro in how it handles String-typed Permission
@@ -640,21 +795,28 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
         """
         self.assert_realms_configured()
 
-        results = collections.defaultdict(bool)  # defaults to False
-
+        # permit expected format is: (Permission, Boolean)
         is_permitted_results = self._is_permitted(identifiers, permission_s)
 
-        for permission, is_permitted in is_permitted_results:
-            # permit expected format is: (Permission, Boolean)
-            # As long as one realm returns True for a Permission, that Permission
-            # is granted.  Given that (True or False == True), assign accordingly:
-            results[permission] = results[permission] or is_permitted
+        return self._combine_results(identifiers, is_permitted_results,
+                                     log_results)
 
-        if log_results:
-            self.notify_results(identifiers, list(results.items()))  # before freezing
+    async def is_permitted_async(self, identifiers, permission_s,
+                                 log_results=True):
+        """
+        The coroutine counterpart of is_permitted, which consults the realms
+        concurrently through their is_permitted_async.
 
-        results = frozenset(results.items())
-        return results
+        :returns: a frozenset of tuple(s), containing the Permission and a Boolean
+                  indicating whether the permission is granted
+        """
+        self.assert_realms_configured()
+
+        is_permitted_results = await self._gather_realm_results(
+            'is_permitted', identifiers, permission_s)
+
+        return self._combine_results(identifiers, is_permitted_results,
+                                     log_results)
 
     # yosai.core.refactored is_permitted_all to support ANY or ALL operations
     def is_permitted_collective(self, identifiers,
@@ -681,10 +843,27 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
         results = logical_operator(is_permitted for perm, is_permitted
                                    in interim_results)
 
-        if results:
-            self.notify_success(identifiers, permission_s, logical_operator)
-        else:
-            self.notify_failure(identifiers, permission_s, logical_operator)
+        self.log_decision(identifiers, permission_s, logical_operator, results)
+
+        return results
+
+    async def is_permitted_collective_async(self, identifiers,
+                                            permission_s, logical_operator):
+        """
+        The coroutine counterpart of is_permitted_collective.
+
+        :returns: a Boolean
+        """
+        self.assert_realms_configured()
+
+        interim_results = await self.is_permitted_async(identifiers,
+                                                        permission_s,
+                                                        log_results=False)
+
+        results = logical_operator(is_permitted for perm, is_permitted
+                                   in interim_results)
+
+        self.log_decision(identifiers, permission_s, logical_operator, results)
 
         return results
 
@@ -715,6 +894,21 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
             msg = "Subject lacks permission(s) to satisfy logical operation"
             raise UnauthorizedException(msg)
 
+    async def check_permission_async(self, identifiers, permission_s,
+                                     logical_operator):
+        """
+        The coroutine counterpart of check_permission.
+
+        :raises UnauthorizedException: if any permission is unauthorized
+        """
+        self.assert_realms_configured()
+        permitted = await self.is_permitted_collective_async(identifiers,
+                                                             permission_s,
+                                                             logical_operator)
+        if not permitted:
+            msg = "Subject lacks permission(s) to satisfy logical operation"
+            raise UnauthorizedException(msg)
+
     # yosai.core.consolidates has_role functionality to one method:
     def has_role(self, identifiers, roleid_s, log_results=True):
         """
@@ -733,19 +927,27 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
         """
         self.assert_realms_configured()
 
-        results = collections.defaultdict(bool)  # defaults to False
+        # checkrole expected format is: (roleid, Boolean)
+        has_role_results = self._has_role(identifiers, roleid_s)
 
-        for roleid, has_role in self._has_role(identifiers, roleid_s):
-            # checkrole expected format is: (roleid, Boolean)
-            # As long as one realm returns True for a roleid, a subject is
-            # considered a member of that Role.
-            # Given that (True or False == True), assign accordingly:
-            results[roleid] = results[roleid] or has_role
+        return self._combine_results(identifiers, has_role_results,
+                                     log_results)
 
-        if log_results:
-            self.notify_results(identifiers, list(results.items()))  # before freezing
-        results = frozenset(results.items())
-        return results
+    async def has_role_async(self, identifiers, roleid_s, log_results=True):
+        """
+        The coroutine counterpart of has_role, which consults the realms
+        concurrently through their has_role_async.
+
+        :returns: a frozenset of tuple(s), containing the roleid and a Boolean
+                  indicating whether the user is a member of the Role
+        """
+        self.assert_realms_configured()
+
+        has_role_results = await self._gather_realm_results(
+            'has_role', identifiers, roleid_s)
+
+        return self._combine_results(identifiers, has_role_results,
+                                     log_results)
 
     def has_role_collective(self, identifiers, roleid_s, logical_operator):
         """
@@ -769,10 +971,26 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
         results = logical_operator(has_role for roleid, has_role
                                    in interim_results)
 
-        if results:
-            self.notify_success(identifiers, roleid_s, logical_operator)
-        else:
-            self.notify_failure(identifiers, roleid_s, logical_operator)
+        self.log_decision(identifiers, roleid_s, logical_operator, results)
+
+        return results
+
+    async def has_role_collective_async(self, identifiers, roleid_s,
+                                        logical_operator):
+        """
+        The coroutine counterpart of has_role_collective.
+
+        :returns: a Boolean
+        """
+        self.assert_realms_configured()
+
+        interim_results = await self.has_role_async(identifiers, roleid_s,
+                                                    log_results=False)
+
+        results = logical_operator(has_role for roleid, has_role
+                                   in interim_results)
+
+        self.log_decision(identifiers, roleid_s, logical_operator, results)
 
         return results
 
@@ -797,6 +1015,20 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
             msg = "Subject does not have role(s) assigned."
             raise UnauthorizedException(msg)
 
+    async def check_role_async(self, identifiers, roleid_s, logical_operator):
+        """
+        The coroutine counterpart of check_role.
+
+        :raises UnauthorizedException: if Subject not assigned to all roles
+        """
+        self.assert_realms_configured()
+        has_role_s = await self.has_role_collective_async(identifiers,
+                                                          roleid_s,
+                                                          logical_operator)
+        if not has_role_s:
+            msg = "Subject does not have role(s) assigned."
+            raise UnauthorizedException(msg)
+
     # --------------------------------------------------------------------------
     # Event Communication
     # --------------------------------------------------------------------------
@@ -826,6 +1058,54 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
             self.event_bus.is_registered(self.session_clears_cache, 'SESSION.EXPIRE')
             self.event_bus.register(self.authc_clears_cache, 'AUTHENTICATION.SUCCEEDED')
             self.event_bus.is_registered(self.authc_clears_cache, 'AUTHENTICATION.SUCCEEDED')
+            self.event_bus.register(self.authc_clears_cache, 'AUTHZ.CHANGED')
+            self.event_bus.is_registered(self.authc_clears_cache, 'AUTHZ.CHANGED')
+
+    def has_listeners(self, topic_name):
+        """
+        whether an event published to the topic would be heard, so that its
+        message data needn't be built otherwise
+        """
+        try:
+            return self.event_bus.has_listeners(topic_name)
+        except AttributeError:  # an event bus without has_listeners, or none
+            return True
+
+    def log_results(self, identifiers, results):
+        """
+        publishes the results of an authorization check, as sampled or
+        aggregated by the results_sampler, if any
+
+        :param results: a dict of each permission or role checked and whether
+                        it was granted
+        """
+        sampler = self.results_sampler
+        if sampler is None:
+            self.notify_results(identifiers, list(results.items()))
+            return
+
+        if sampler.record_results(identifiers, results):
+            self.notify_results(identifiers, list(results.items()))
+        self._publish_summaries(sampler.pop_summaries())
+
+    def log_decision(self, identifiers, items, logical_operator, granted):
+        sampler = self.results_sampler
+        if not granted:
+            self.notify_failure(identifiers, items, logical_operator)
+        elif sampler is None or sampler.is_sampled('AUTHORIZATION.GRANTED'):
+            self.notify_success(identifiers, items, logical_operator)
+
+    def flush_results(self):
+        """
+        publishes the results aggregated so far, without waiting for their
+        window to pass
+        """
+        if self.results_sampler is not None:
+            self._publish_summaries(self.results_sampler.pop_summaries(True))
+
+    def _publish_summaries(self, summaries):
+        for identifiers, items, started, ended in summaries:
+            self.notify_summary(identifiers, items, started, ended)
 
     # notify_results is intended for audit trail
     def notify_results(self, identifiers, items):
@@ -844,6 +1124,39 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer,
             msg = "Could not publish AUTHORIZATION.RESULTS event"
             raise AuthorizationEventException(msg)
 
+    def notify_authz_changed(self, identifiers):
+        """
+        announces that a user's roles or permissions changed, so that every
+        cache of the user's authorization info is cleared, including those of
+        sibling processes when an EventRelay relays AUTHZ.CHANGED
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+        """
+        try:
+            self.event_bus.publish('AUTHZ.CHANGED', identifiers=identifiers)
+        except AttributeError:
+            msg = "Could not publish AUTHZ.CHANGED event"
+            raise AuthorizationEventException(msg)
+
+    def notify_summary(self, identifiers, items, started, ended):
+        """
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param items:  a list of tuple(permission or role, checked, granted)
+        :param started:  the epoch time at which the window began
+        :param ended:  the epoch time at which the window ended
+        """
+        try:
+            self.event_bus.publish('AUTHORIZATION.SUMMARY',
+                                   identifiers=identifiers,
+                                   items=items,
+                                   started=started,
+                                   ended=ended)
+
+        except AttributeError:
+            msg = "Could not publish AUTHORIZATION.SUMMARY event"
+            raise AuthorizationEventException(msg)
+
     def notify_success(self, identifiers, items, logical_operator):
         """
         :type identifiers:  subject_abcs.IdentifierCollection
@@ -1093,6 +1406,8 @@ class IndexedAuthorizationInfo(authz_abcs.AuthorizationInfo,
 
 class SimpleRole(serialize_abcs.Serializable):
 
+    __slots__ = ('identifier',)
+
     def __init__(self, role_identifier):
 
         self.identifier = role_identifier
@@ -1150,7 +1465,7 @@ class SimpleRole(serialize_abcs.Serializable):
             def make_authz_info(self, data):
                 mycls = SimpleRole
                 instance = mycls.__new__(mycls)
-                instance.__dict__.update(data)
+                instance.__setstate__(data)
                 return instance
 
         return SerializationSchema
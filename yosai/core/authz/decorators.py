@@ -1,3 +1,4 @@
+import asyncio
 import functools
 from yosai.core import (
     get_current_lib,
@@ -27,8 +28,26 @@ def requires_permission(permission_s, logical_operator=all):
 
     Basic Example:
         requires_permission(['domain1:action1,action2'])
+
+    A coroutine function is decorated with a coroutine function, which checks
+    the permission when awaited, within the context of the awaiting task,
+    through the subject's check_permission_async so as not to block the event
+    loop.
     """
     def outer_wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_inner_wrap(*args, **kwargs):
+
+                yosai = get_current_lib()
+                subject = yosai.subject
+
+                await subject.check_permission_async(permission_s,
+                                                     logical_operator)
+
+                return await fn(*args, **kwargs)
+            return async_inner_wrap
+
         @functools.wraps(fn)
         def inner_wrap(*args, **kwargs):
 
@@ -71,8 +90,25 @@ def requires_dynamic_permission(permission_s, logical_operator=all):
 
     Basic Example:
         requires_permission(['{kwarg.domainid}:action1,action2'])
+
+    A coroutine function is decorated with a coroutine function, as by
+    ``requires_permission``.
     """
     def outer_wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_inner_wrap(*args, **kwargs):
+                newperms = [perm.format(**kwargs) for perm in permission_s]
+
+                yosai = get_current_lib()
+                subject = yosai.subject
+
+                await subject.check_permission_async(newperms,
+                                                     logical_operator)
+
+                return await fn(*args, **kwargs)
+            return async_inner_wrap
+
         @functools.wraps(fn)
         def inner_wrap(*args, **kwargs):
             newperms = [perm.format(**kwargs) for perm in permission_s]
@@ -109,8 +145,23 @@ def requires_role(roleid_s, logical_operator=all):
 
     Basic Example:
         requires_role('physician')
+
+    A coroutine function is decorated with a coroutine function, as by
+    ``requires_permission``.
     """
     def outer_wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_inner_wrap(*args, **kwargs):
+
+                yosai = get_current_lib()
+                subject = yosai.subject
+
+                await subject.check_role_async(roleid_s, logical_operator)
+
+                return await fn(*args, **kwargs)
+            return async_inner_wrap
+
         @functools.wraps(fn)
         def inner_wrap(*args, **kwargs):
 
@@ -48,3 +48,48 @@ class CacheHandler(metaclass=ABCMeta):
     @abstractmethod
     def delete(self, key, identifier):
         pass
+
+    def delete_many(self, domain, identifiers):
+        """
+        Deletes the entries of several identifiers of a domain.  Handlers whose
+        cache supports deleting many keys in one request should override this
+        default, which deletes one entry at a time.
+        """
+        for identifier in identifiers:
+            self.delete(domain, identifier)
+
+
+class AsyncCacheHandler(metaclass=ABCMeta):
+    """
+    AsyncCacheHandler is new to Yosai.  It is the asyncio counterpart of a
+    CacheHandler, whose methods are coroutines so that a cache round trip
+    doesn't block the event loop.  It is used by the async methods of realms
+    and session stores, through their async_cache_handler.
+
+    get_or_create awaits creator_func(creator) when creator_func is a
+    coroutine function and calls it otherwise.
+    """
+
+    @abstractmethod
+    async def get(self, domain, identifier):
+        pass
+
+    @abstractmethod
+    async def get_or_create(self, domain, identifier, creator_func, creator):
+        pass
+
+    @abstractmethod
+    async def set(self, domain, identifier, value):
+        pass
+
+    @abstractmethod
+    async def delete(self, domain, identifier):
+        pass
+
+    async def delete_many(self, domain, identifiers):
+        """
+        Deletes the entries of several identifiers of a domain, one at a time
+        unless overridden.
+        """
+        for identifier in identifiers:
+            await self.delete(domain, identifier)
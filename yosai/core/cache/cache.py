@@ -16,3 +16,74 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import asyncio
+import functools
+
+from yosai.core import (
+    cache_abcs,
+)
+
+
+class AsyncCacheHandlerAdapter(cache_abcs.AsyncCacheHandler):
+    """
+    AsyncCacheHandlerAdapter is new to Yosai.  It presents a synchronous
+    CacheHandler as an AsyncCacheHandler, so that the async methods of realms
+    and session stores may use the cache handler that their sync methods use.
+
+    Without an executor, the cache handler is called on the event loop, which
+    it blocks for as long as a synchronous call would.  Given an executor,
+    such as a concurrent.futures.ThreadPoolExecutor, each call is run within
+    it instead.
+
+    get_or_create reads the entry and, when it is missing, creates and sets
+    it, rather than delegating to the cache handler's get_or_create, so that
+    a coroutine creator may be awaited on the event loop.  Concurrent misses
+    for one entry may then each create it.
+    """
+
+    def __init__(self, cache_handler, executor=None):
+        """
+        :type cache_handler: cache_abcs.CacheHandler
+        :type executor: concurrent.futures.Executor
+        """
+        self.cache_handler = cache_handler
+        self.executor = executor
+
+    async def _call(self, fn, **kwargs):
+        if self.executor is None:
+            return fn(**kwargs)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor,
+                                          functools.partial(fn, **kwargs))
+
+    async def get(self, domain, identifier):
+        return await self._call(self.cache_handler.get, domain=domain,
+                                identifier=identifier)
+
+    async def get_or_create(self, domain, identifier, creator_func, creator):
+        value = await self.get(domain, identifier)
+        if value is not None:
+            return value
+
+        value = creator_func(creator)
+        if asyncio.iscoroutine(value):
+            value = await value
+        if value is not None:
+            await self.set(domain, identifier, value)
+        return value
+
+    async def set(self, domain, identifier, value):
+        await self._call(self.cache_handler.set, domain=domain,
+                         identifier=identifier, value=value)
+
+    async def delete(self, domain, identifier):
+        await self._call(self.cache_handler.delete, domain=domain,
+                         identifier=identifier)
+
+    async def delete_many(self, domain, identifiers):
+        await self._call(self.cache_handler.delete_many, domain=domain,
+                         identifiers=identifiers)
+
+    def __repr__(self):
+        return "AsyncCacheHandlerAdapter(cache_handler={0})".format(
+            self.cache_handler)
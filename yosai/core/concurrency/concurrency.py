@@ -17,9 +17,20 @@ specific language governing permissions and limitations
 under the License.
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import atexit
+import collections
+import logging
 import threading
 import time
 
+from yosai.core import (
+    ExecutorSaturatedException,
+    InvalidArgumentException,
+)
+
+logger = logging.getLogger(__name__)
+
 
 class StoppableScheduledExecutor(threading.Thread):
     def __init__(self, my_func, interval):
@@ -40,3 +51,368 @@ class StoppableScheduledExecutor(threading.Thread):
 
 # yosai.core.omits ThreadContext because it is replaced by the standard library
 # threading.local() object
+
+
+class BoundedExecutor:
+    """
+    BoundedExecutor caps the amount of work that may be running or waiting
+    within an underlying concurrent.futures executor.  At most max_workers
+    tasks run at once and at most max_queue_depth further tasks wait for a
+    worker.  A submission that exceeds those limits fails immediately with an
+    ExecutorSaturatedException rather than queueing without bound.
+    """
+    def __init__(self, max_workers, max_queue_depth=0, use_processes=False):
+        """
+        :param use_processes: whether to use a process pool rather than a
+                              thread pool, in which case submitted callables
+                              and their arguments must be picklable
+        :type use_processes: bool
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.use_processes = use_processes
+
+        executor_class = (ProcessPoolExecutor if use_processes else
+                          ThreadPoolExecutor)
+        self.executor = executor_class(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_depth)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        :returns: a concurrent.futures.Future
+        :raises ExecutorSaturatedException: when every slot is taken
+        """
+        if not self._slots.acquire(blocking=False):
+            msg = ("BoundedExecutor saturated: {0} tasks running and {1} "
+                   "waiting".format(self.max_workers, self.max_queue_depth))
+            raise ExecutorSaturatedException(msg)
+
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        self._slots.release()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def __repr__(self):
+        return ("BoundedExecutor(max_workers={0}, max_queue_depth={1}, "
+                "use_processes={2})".format(self.max_workers,
+                                            self.max_queue_depth,
+                                            self.use_processes))
+
+
+class WriteBehindQueue:
+    """
+    WriteBehindQueue defers writes to a background thread, which performs them
+    in batches.  Each write is keyed, and a write submitted while an earlier
+    one for the same key is still pending replaces it, so that only the latest
+    write per key is performed, unless the submitter provides a merge function
+    to combine the two.
+
+    At most max_pending keys may be pending.  Once full, submitting a write
+    for another key blocks until the worker makes room.  Should no room be
+    made within put_timeout seconds, the write is performed on the submitting
+    thread instead, unless a write for the same key is being performed by the
+    worker, in which case the submitter keeps waiting so as to preserve order.
+
+    Pending writes are performed when stop is called, which happens at
+    interpreter exit for queues that weren't stopped.  Writes submitted after
+    stop are performed immediately.
+    """
+
+    def __init__(self, max_pending=10000, batch_size=100, flush_interval=0.5,
+                 put_timeout=1.0, after_batch=None):
+        """
+        :param batch_size: the number of writes performed per batch
+        :param flush_interval: the number of seconds that the worker waits
+                               for a batch to fill before performing a
+                               partial one
+        :param after_batch: an optional callable, called after each batch
+        """
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.after_batch = after_batch
+
+        self._pending = collections.OrderedDict()  # key: (fn, args)
+        self._in_flight = {}
+        self._stopped = False
+        self._condition = threading.Condition()
+
+        self._worker = threading.Thread(target=self._run, daemon=True,
+                                        name='WriteBehindQueue')
+        self._worker.start()
+        atexit.register(self.stop)
+
+    def submit(self, key, fn, *args, merge=None):
+        """
+        schedules fn(*args) to be called, replacing a pending call for key
+
+        :param merge: an optional callable that is given the pending and the
+                      submitted tuple(fn, args) for key and returns the one
+                      to replace them with
+        """
+        with self._condition:
+            if not self._stopped:
+                pending = self._pending
+                if key in pending:
+                    write = (fn, args)
+                    if merge is not None:
+                        write = merge(pending[key], write)
+                    pending[key] = write  # keeps its place in line
+                    return
+
+                deadline = time.time() + self.put_timeout
+                while len(pending) >= self.max_pending and not self._stopped:
+                    self._condition.notify_all()
+                    remaining = deadline - time.time()
+                    if remaining <= 0 and key not in self._in_flight:
+                        break
+                    self._condition.wait(max(remaining, 0.01))
+
+                if len(pending) < self.max_pending and not self._stopped:
+                    pending[key] = (fn, args)
+                    if len(pending) >= self.batch_size:
+                        self._condition.notify_all()
+                    return
+
+                if not self._stopped:
+                    msg = ("WriteBehindQueue full.  Writing [{0}] "
+                           "synchronously.".format(key))
+                    logger.warning(msg)
+
+        fn(*args)
+
+    def get_pending(self, key):
+        """
+        :returns: tuple(fn, args) of the write pending or being performed for
+                  key, or None
+        """
+        with self._condition:
+            return self._pending.get(key) or self._in_flight.get(key)
+
+    def flush(self):
+        """
+        blocks until every write submitted so far has been performed
+        """
+        with self._condition:
+            while self._pending or self._in_flight:
+                self._condition.notify_all()
+                self._condition.wait(0.1)
+
+    def stop(self):
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify_all()
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if len(self._pending) < self.batch_size and not self._stopped:
+                    self._condition.wait(self.flush_interval)
+                if not self._pending:
+                    if self._stopped:
+                        return
+                    continue
+
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popitem(last=False))
+                self._in_flight = dict(batch)
+                self._condition.notify_all()  # room for blocked submitters
+
+            for key, (fn, args) in batch:
+                try:
+                    fn(*args)
+                except Exception:
+                    logger.exception("Write-behind of [{0}] failed.".
+                                     format(key))
+            if self.after_batch:
+                try:
+                    self.after_batch()
+                except Exception:
+                    logger.exception("Write-behind after_batch failed.")
+
+            with self._condition:
+                self._in_flight = {}
+                self._condition.notify_all()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __repr__(self):
+        return ("WriteBehindQueue(max_pending={0}, batch_size={1}, "
+                "flush_interval={2})".format(self.max_pending, self.batch_size,
+                                             self.flush_interval))
+
+
+class BatchingQueue:
+    """
+    BatchingQueue hands the items put into it to a background thread, which
+    passes them to a handler in batches, in the order they were put.  Items
+    are held in a ring buffer of at most max_items.  Putting an item into a
+    full buffer follows the queue's overflow policy:
+
+        - drop_newest:  the item put is discarded
+        - drop_oldest:  the oldest item held is discarded to make room
+        - block:  the putter waits for the worker to make room, for up to
+                  put_timeout seconds (or indefinitely, when None), after
+                  which the item put is discarded
+
+    Every overflow is counted, as is every item discarded, so that loss is
+    observable through the counters property.
+
+    Items held are handed to the handler when stop is called, which happens at
+    interpreter exit for queues that weren't stopped.  Items put after stop
+    are discarded.
+    """
+
+    POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+    def __init__(self, handler, max_items=10000, batch_size=100,
+                 flush_interval=0.5, policy='drop_newest', put_timeout=None,
+                 name='BatchingQueue'):
+        """
+        :param handler: a callable that is given each batch, as a list
+        :param flush_interval: the number of seconds that the worker waits
+                               for a batch to fill before handling a partial
+                               one
+        """
+        if policy not in self.POLICIES:
+            msg = "policy must be one of {0}".format(self.POLICIES)
+            raise InvalidArgumentException(msg)
+
+        self.handler = handler
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.put_timeout = put_timeout
+
+        self._items = collections.deque()
+        self._handling = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+
+        self.put_count = 0
+        self.handled_count = 0
+        self.overflow_count = 0
+        self.dropped_count = 0
+
+        self._worker = threading.Thread(target=self._run, daemon=True,
+                                        name=name)
+        self._worker.start()
+        atexit.register(self.stop)
+
+    def put(self, item):
+        """
+        :returns: True if the item is held for the handler, False if it was
+                  discarded
+        """
+        with self._condition:
+            if self._stopped:
+                self.dropped_count += 1
+                return False
+
+            items = self._items
+            if len(items) >= self.max_items:
+                self.overflow_count += 1
+                if self.policy == 'drop_oldest':
+                    items.popleft()
+                    self.dropped_count += 1
+                elif self.policy == 'block':
+                    self._condition.notify_all()
+                    self._condition.wait_for(
+                        lambda: len(items) < self.max_items or self._stopped,
+                        self.put_timeout)
+                if len(items) >= self.max_items or self._stopped:
+                    self.dropped_count += 1
+                    return False
+
+            items.append(item)
+            self.put_count += 1
+            if len(items) == self.batch_size:
+                self._condition.notify_all()
+            return True
+
+    @property
+    def counters(self):
+        """
+        :returns: a dict of the number of items put, handled and dropped, the
+                  number of overflows, and the number of items held
+        """
+        with self._condition:
+            return {'put': self.put_count,
+                    'handled': self.handled_count,
+                    'dropped': self.dropped_count,
+                    'overflows': self.overflow_count,
+                    'pending': len(self._items)}
+
+    def flush(self):
+        """
+        blocks until every item put so far has been handled
+        """
+        with self._condition:
+            while self._items or self._handling:
+                self._condition.notify_all()
+                self._condition.wait(0.1)
+
+    def stop(self):
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify_all()
+        self._worker.join()
+
+    def _run(self):
+        items = self._items
+        while True:
+            with self._condition:
+                while not items and not self._stopped:
+                    self._condition.wait()
+                if len(items) < self.batch_size and not self._stopped:
+                    self._condition.wait(self.flush_interval)
+                if not items:
+                    if self._stopped:
+                        return
+                    continue
+
+                batch = [items.popleft()
+                         for _ in range(min(len(items), self.batch_size))]
+                self._handling = len(batch)
+                self._condition.notify_all()  # room for blocked putters
+
+            try:
+                self.handler(batch)
+            except Exception:
+                logger.exception("{0} failed to handle a batch of {1} items.".
+                                 format(self._worker.name, len(batch)))
+
+            with self._condition:
+                self.handled_count += self._handling
+                self._handling = 0
+                self._condition.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return ("BatchingQueue(max_items={0}, batch_size={1}, "
+                "flush_interval={2}, policy={3})".format(
+                    self.max_items, self.batch_size, self.flush_interval,
+                    self.policy))
@@ -84,3 +84,32 @@ class EventBusAware(metaclass=ABCMeta):
     @abstractmethod
     def event_bus(self, eventbus):
         pass
+
+
+class EventTransport(metaclass=ABCMeta):
+    """
+    An event transport carries batches of events, encoded as bytes, between
+    the processes of a deployment, such as the workers of a web server, so
+    that an EventRelay can republish them in every process.  A transport
+    delivers a batch to every sibling process but the sender.
+    """
+
+    @abstractmethod
+    def start(self, receive):
+        """
+        begins delivering the batches sent by sibling processes
+
+        :param receive: a callable that is given each batch received, as bytes
+        """
+        pass
+
+    @abstractmethod
+    def send(self, data):
+        """
+        :type data: bytes
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
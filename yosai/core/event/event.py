@@ -25,7 +25,13 @@ without impacting my core application modules.  The core application modules
 know WHAT needs to be communicated with the bus but now HOW (EventBus
 knows HOW).
 """
+from datetime import datetime
 import logging
+import threading
+import time
+import weakref
+
+import pytz
 
 from pubsub import pub
 
@@ -38,6 +44,7 @@ from pubsub.core import (
 )
 
 from yosai.core import (
+    BatchingQueue,
     EventBusTopicException,
     EventBusMessageDataException,
     EventBusSubscriptionException,
@@ -150,10 +157,185 @@ class DefaultEventBus(event_abcs.EventBus):
         unsubscribed_listeners = self._event_bus.unsubAll()
         return unsubscribed_listeners
 
+    def has_listeners(self, topic_name):
+        topic = self._event_bus.getDefaultTopicMgr().getTopic(topic_name,
+                                                              okIfNone=True)
+        return topic is not None and topic.hasListeners()
+
+
+class _StrongRef:
+    """
+    references a listener strongly, with the call signature of a weakref
+    """
+
+    __slots__ = ('listener',)
+
+    def __init__(self, listener):
+        self.listener = listener
+
+    def __call__(self):
+        return self.listener
+
+
+class DirectEventBus(event_abcs.EventBus):
+    """
+    DirectEventBus is new to Yosai.  It implements the EventBus api natively,
+    calling each listener of a topic directly, in the order in which they
+    registered, rather than through pypubsub's topic tree and message data
+    validation.
+
+    The listeners of each topic are kept as a tuple that is replaced, rather
+    than modified, when a listener registers or unregisters, so publishing
+    needs no lock.  Publishing to a topic without listeners returns at once.
+    Publishers whose message data is costly to build may consult
+    has_listeners first.
+
+    Bound methods are referenced weakly, as pypubsub references them, so that
+    registering doesn't keep their instances alive.  A listener whose instance
+    has been collected is dropped from its topic.  Other callables are
+    referenced strongly.
+
+    Unlike pypubsub, topics aren't hierarchical:  a listener receives the
+    messages of the topic that it registered for alone.  Message data isn't
+    validated, so a listener that doesn't accept the message data raises a
+    TypeError, as any exception raised by a listener propagates to the
+    publisher.
+    """
+
+    def __init__(self):
+        self._listeners = {}  # topic_name: tuple of references
+        self._lock = threading.Lock()
+
+    def _find(self, listener, topic_name):
+        for ref in self._listeners.get(topic_name, ()):
+            if ref() == listener:
+                return ref
+        return None
+
+    def is_registered(self, listener, topic_name):
+        return self._find(listener, topic_name) is not None
+
+    def has_listeners(self, topic_name):
+        return bool(self._listeners.get(topic_name))
+
+    def publish(self, topic_name, **kwargs):
+        """
+        Sends a message to the listeners of a topic
+
+        :param topic_name: name of message topic
+        :type topic_name: dotted-string
+        :param kwargs: message data, passed to each listener as keyword
+                       arguments
+        """
+        listeners = self._listeners.get(topic_name)
+        if not listeners:
+            return True
+
+        for ref in listeners:
+            listener = ref()
+            if listener is not None:
+                listener(**kwargs)
+        return True
+
+    def register(self, _callable, topic_name):
+        """
+        Subscribe listener to named topic.
+
+        :returns: tuple(listener, success), success being False if the
+                  listener was already subscribed
+        """
+        if not callable(_callable):
+            msg = ("Invalid Listener -- {0} is not callable, so can't listen "
+                   "to topic: {1}".format(_callable, topic_name))
+            raise EventBusSubscriptionException(msg)
+
+        with self._lock:
+            if self._find(_callable, topic_name) is not None:
+                return _callable, False
+
+            if hasattr(_callable, '__self__') and hasattr(_callable, '__func__'):
+                ref = weakref.WeakMethod(_callable,
+                                         self._make_cleanup(topic_name))
+            else:
+                ref = _StrongRef(_callable)
+
+            self._listeners[topic_name] =\
+                self._listeners.get(topic_name, ()) + (ref,)
+        return _callable, True
+
+    def _make_cleanup(self, topic_name):
+        bus = weakref.ref(self)
+
+        def cleanup(ref):
+            event_bus = bus()
+            if event_bus is not None:
+                event_bus._remove(ref, topic_name)
+
+        return cleanup
+
+    def _remove(self, ref, topic_name):
+        with self._lock:
+            listeners = tuple(listener for listener in
+                              self._listeners.get(topic_name, ())
+                              if listener is not ref)
+            if listeners:
+                self._listeners[topic_name] = listeners
+            else:
+                self._listeners.pop(topic_name, None)
+
+    def unregister(self, listener, topic_name):
+        """
+        :returns: the listener, or None if it wasn't subscribed to the topic
+        """
+        ref = self._find(listener, topic_name)
+        if ref is None:
+            return None
+        self._remove(ref, topic_name)
+        return listener
+
+    def unregister_all(self):
+        """
+        Returns the list of all listeners that were unsubscribed
+        """
+        with self._lock:
+            listeners, self._listeners = self._listeners, {}
+
+        return [listener for refs in listeners.values() for listener in
+                (ref() for ref in refs) if listener is not None]
+
+    def __repr__(self):
+        return "DirectEventBus(topics={0})".format(sorted(self._listeners))
+
+
+class RelayState(threading.local):
+    """
+    whether the current thread is publishing events relayed from a sibling
+    process
+    """
+    delivering = False
+
+
+relay_state = RelayState()
+
 
 class EventLogger(event_abcs.EventBusAware):
+    """
+    EventLogger logs the events published to the EventBus.
+
+    Authorization events are the most frequent by far, and serializing their
+    identifiers and permissions can cost more than the authorization itself.
+    Once enable_async_audit is called, authorization events are instead put,
+    as raw tuples, into a BatchingQueue whose worker serializes and logs them
+    in batches, off of the publishing thread.  Each record logged keeps the
+    time at which its event was published.
+
+    Events relayed from sibling processes by an EventRelay aren't logged, as
+    the process that published them logs them.
+    """
+
     def __init__(self, event_bus):
         self.event_bus = event_bus
+        self.audit_queue = None
 
         self.event_bus.register(self.log_session_start, 'SESSION.START')
         self.event_bus.register(self.log_session_stop, 'SESSION.STOP')
@@ -163,6 +345,7 @@ class EventLogger(event_abcs.EventBusAware):
         self.event_bus.register(self.log_authz_granted, 'AUTHORIZATION.GRANTED')
         self.event_bus.register(self.log_authz_denied, 'AUTHORIZATION.DENIED')
         self.event_bus.register(self.log_authz_results, 'AUTHORIZATION.RESULTS')
+        self.event_bus.register(self.log_authz_summary, 'AUTHORIZATION.SUMMARY')
 
     @property
     def event_bus(self):
@@ -172,7 +355,64 @@ class EventLogger(event_abcs.EventBusAware):
     def event_bus(self, eventbus):
         self._event_bus = eventbus
 
+    def enable_async_audit(self, max_events=10000, batch_size=100,
+                           flush_interval=0.5, policy='drop_newest',
+                           put_timeout=None):
+        """
+        logs authorization events from a background thread
+
+        :param policy: what to do with an event published while max_events
+                       are waiting to be logged, one of the
+                       BatchingQueue.POLICIES
+        """
+        if self.audit_queue is None:
+            self.audit_queue = BatchingQueue(self._log_audit_batch,
+                                             max_items=max_events,
+                                             batch_size=batch_size,
+                                             flush_interval=flush_interval,
+                                             policy=policy,
+                                             put_timeout=put_timeout,
+                                             name='EventLogger')
+
+    def disable_async_audit(self):
+        """
+        logs the events waiting to be logged and then resumes logging them
+        as they are published
+        """
+        queue = self.audit_queue
+        if queue is not None:
+            queue.stop()
+            self.audit_queue = None
+
+    @property
+    def audit_counters(self):
+        """
+        :returns: the counters of the audit queue, or None when authorization
+                  events are logged as they are published
+        """
+        queue = self.audit_queue
+        return queue.counters if queue is not None else None
+
+    def _audit(self, topic, format_extra, *args):
+        queue = self.audit_queue
+        if queue is None:
+            logger.info(topic, extra=format_extra(*args))
+        else:
+            queue.put((time.time(), topic, format_extra, args))
+
+    def _log_audit_batch(self, batch):
+        for published, topic, format_extra, args in batch:
+            try:
+                extra = format_extra(*args)
+                extra['time'] = datetime.fromtimestamp(published, pytz.utc)
+                logger.info(topic, extra=extra)
+            except Exception:
+                logger.exception("Could not log a queued {0} event.".
+                                 format(topic))
+
     def log_authc_succeeded(self, identifiers=None):
+        if relay_state.delivering:
+            return
         topic = 'AUTHENTICATION.SUCCEEDED'
         serialized = identifiers.serialize()
         logger.info(topic, extra={'identifiers': serialized})
@@ -186,6 +426,8 @@ class EventLogger(event_abcs.EventBusAware):
         logger.info(topic, extra={'sessionid': session_id})
 
     def log_session_stop(self, items=None):
+        if relay_state.delivering:
+            return
         topic = 'SESSION.STOP'
         try:
             # a session of a user who hasn't authenticated won't have idents
@@ -197,6 +439,8 @@ class EventLogger(event_abcs.EventBusAware):
                                   'session_id': session_id})
 
     def log_session_expire(self, items=None):
+        if relay_state.delivering:
+            return
         topic = 'SESSION.EXPIRE'
         try:
             # a session of a user who hasn't authenticated won't have idents
@@ -208,23 +452,23 @@ class EventLogger(event_abcs.EventBusAware):
                                   'session_id': session_id})
 
     def log_authz_granted(self, identifiers=None, items=None, logical_operator=None):
-        topic = 'AUTHORIZATION.GRANTED'
+        self._audit('AUTHORIZATION.GRANTED', self._format_authz_decision,
+                    identifiers, items, logical_operator)
 
-        try:
-            # Permission objects are serializable
-            new_items = [item.serialize() for item in items]
-        except:
-            # presumably a set of roleid strings
-            new_items = list(items)
+    def log_authz_denied(self, identifiers=None, items=None, logical_operator=None):
+        self._audit('AUTHORIZATION.DENIED', self._format_authz_decision,
+                    identifiers, items, logical_operator)
 
-        identifiers = identifiers.serialize()
-        logger.info(topic, extra={'identifiers': identifiers,
-                                  'items': new_items,
-                                  'logical_operator': logical_operator.__name__})
+    def log_authz_results(self, identifiers=None, items=None):
+        self._audit('AUTHORIZATION.RESULTS', self._format_authz_results,
+                    identifiers, items)
 
-    def log_authz_denied(self, identifiers=None, items=None, logical_operator=None):
-        topic = 'AUTHORIZATION.DENIED'
+    def log_authz_summary(self, identifiers=None, items=None, started=None,
+                          ended=None):
+        self._audit('AUTHORIZATION.SUMMARY', self._format_authz_summary,
+                    identifiers, items, started, ended)
 
+    def _format_authz_decision(self, identifiers, items, logical_operator):
         try:
             # Permission objects are serializable
             new_items = [item.serialize() for item in items]
@@ -232,13 +476,11 @@ class EventLogger(event_abcs.EventBusAware):
             # presumably a set of roleid strings
             new_items = list(items)
 
-        identifiers = identifiers.serialize()
-        logger.info(topic, extra={'identifiers': identifiers,
-                                  'items': new_items,
-                                  'logical_operator': logical_operator.__name__})
+        return {'identifiers': identifiers.serialize(),
+                'items': new_items,
+                'logical_operator': logical_operator.__name__}
 
-    def log_authz_results(self, identifiers=None, items=None):
-        topic = 'AUTHORIZATION.RESULTS'
+    def _format_authz_results(self, identifiers, items):
         try:
             # Permission objects are serializable
             new_items = [(item.serialize(), check) for (item, check) in items]
@@ -246,9 +488,22 @@ class EventLogger(event_abcs.EventBusAware):
             # presumably roleid strings
             new_items = items
 
-        identifiers = identifiers.serialize()
-        logger.info(topic, extra={'identifiers': identifiers,
-                                  'items': new_items})
+        return {'identifiers': identifiers.serialize(),
+                'items': new_items}
+
+    def _format_authz_summary(self, identifiers, items, started, ended):
+        try:
+            # Permission objects are serializable
+            new_items = [(item.serialize(), checked, granted)
+                         for (item, checked, granted) in items]
+        except AttributeError:
+            # presumably roleid strings
+            new_items = items
+
+        return {'identifiers': identifiers.serialize(),
+                'items': new_items,
+                'started': datetime.fromtimestamp(started, pytz.utc),
+                'ended': datetime.fromtimestamp(ended, pytz.utc)}
 
 
 
@@ -258,6 +513,6 @@ class EventLogger(event_abcs.EventBusAware):
 # pub.subscribe(log_event, pub.ALL_TOPICS)
 
 
-event_bus = DefaultEventBus()  # pseudo-singleton
+event_bus = DirectEventBus()  # pseudo-singleton
 
 event_logger = EventLogger(event_bus)
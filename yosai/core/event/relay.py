@@ -0,0 +1,286 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+import functools
+import logging
+import os
+import socket
+import threading
+
+from yosai.core import (
+    DefaultSessionKey,
+    SerializationManager,
+    SimpleIdentifierCollection,
+    WriteBehindQueue,
+    event_abcs,
+)
+from yosai.core.event.event import relay_state
+from yosai.core.session.session import evicted_session_tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EventRelay(event_abcs.EventBusAware):
+    """
+    EventRelay is new to Yosai.  It relays the events of selected topics,
+    published to a process's EventBus, to the sibling processes of a
+    deployment, such as the workers of a web server, through an
+    EventTransport.  Each sibling's EventRelay republishes them to its own
+    EventBus, so that listeners invalidating in-process caches hear of every
+    session that stops or expires, of every authentication and of every
+    change to a user's authorization info, wherever it happened.
+
+    An event is relayed by the identifiers and session id that it concerns,
+    which is all that cache invalidation requires:  events are republished
+    with a SimpleIdentifierCollection and, for session events, a
+    tuple(identifiers, session_key) as their payloads.
+
+    Events are sent in batches, every batch_interval seconds at most.  An
+    event published again before its batch is sent is sent only once.  Events
+    republished by a relay aren't relayed again, nor logged by the
+    EventLogger.
+    """
+
+    # the topics relayed by default, and the payload that each is published
+    # with:
+    TOPICS = {'SESSION.STOP': 'items',
+              'SESSION.EXPIRE': 'items',
+              'AUTHENTICATION.SUCCEEDED': 'identifiers',
+              'AUTHZ.CHANGED': 'identifiers'}
+
+    def __init__(self, event_bus, transport, topics=None, batch_interval=0.05,
+                 max_pending=10000, batch_size=100):
+        """
+        :type transport: event_abcs.EventTransport
+        :param topics: the topics to relay, among EventRelay.TOPICS
+        """
+        self.event_bus = event_bus
+        self.transport = transport
+        self.topics = tuple(topics or self.TOPICS)
+        self.serialization_manager = SerializationManager()
+
+        self._batch = []
+        self._batch_lock = threading.Lock()
+        self._queue = WriteBehindQueue(max_pending=max_pending,
+                                       batch_size=batch_size,
+                                       flush_interval=batch_interval,
+                                       after_batch=self._send_batch)
+        self._listeners = {topic: functools.partial(self._relay, topic)
+                           for topic in self.topics}
+
+        self.transport.start(self._receive)
+        for topic, listener in self._listeners.items():
+            self.event_bus.register(listener, topic)
+
+    @property
+    def event_bus(self):
+        return self._event_bus
+
+    @event_bus.setter
+    def event_bus(self, eventbus):
+        self._event_bus = eventbus
+
+    def _relay(self, topic, items=None, identifiers=None):
+        if relay_state.delivering:
+            return  # relayed from a sibling
+
+        session_id = None
+        if items is not None:
+            identifiers = items.identifiers
+            session_id = items.session_key.session_id
+
+        try:
+            source_identifiers = tuple(identifiers.source_identifiers.items())
+        except AttributeError:
+            return  # a session of a user who hasn't authenticated
+
+        key = (topic, source_identifiers, session_id)
+        self._queue.submit(key, self._append, key)
+
+    def _append(self, key):
+        # the batch is looked up when the write is performed, as it is
+        # replaced once sent:
+        with self._batch_lock:
+            self._batch.append(key)
+
+    def _send_batch(self):
+        with self._batch_lock:
+            batch, self._batch = self._batch, []
+        if batch:
+            data = self.serialization_manager.serializer.serialize(batch)
+            self.transport.send(data)
+
+    def flush(self):
+        """
+        blocks until every event relayed so far has been sent
+        """
+        self._queue.flush()
+
+    def _receive(self, data):
+        batch = self.serialization_manager.serializer.deserialize(data)
+        if not batch:
+            logger.warning("EventRelay received an unreadable batch.")
+            return
+
+        relay_state.delivering = True
+        try:
+            for topic, source_identifiers, session_id in batch:
+                try:
+                    self._deliver(topic, source_identifiers, session_id)
+                except Exception:
+                    logger.exception("EventRelay could not deliver a relayed "
+                                     "{0} event.".format(topic))
+        finally:
+            relay_state.delivering = False
+
+    def _deliver(self, topic, source_identifiers, session_id):
+        payload = self.TOPICS.get(topic)
+        if payload is None:
+            return
+
+        identifiers = SimpleIdentifierCollection()
+        for source_name, identifier in source_identifiers:
+            identifiers.add(source_name, identifier)
+
+        if payload == 'items':
+            self.event_bus.publish(topic, items=evicted_session_tuple(
+                identifiers, DefaultSessionKey(session_id)))
+        else:
+            self.event_bus.publish(topic, identifiers=identifiers)
+
+    def close(self):
+        """
+        stops relaying, once every event relayed so far has been sent
+        """
+        for topic, listener in self._listeners.items():
+            self.event_bus.unregister(listener, topic)
+        self._queue.stop()
+        self.transport.close()
+
+    def __repr__(self):
+        return "EventRelay(topics={0}, transport={1})".format(self.topics,
+                                                             self.transport)
+
+
+class UnixSocketTransport(event_abcs.EventTransport):
+    """
+    UnixSocketTransport is new to Yosai.  It carries batches of events between
+    the processes of a single host through Unix domain datagram sockets.  Each
+    process binds a socket, named after its pid by default, within a
+    directory shared by the deployment, and sends each batch to every other
+    socket there.  The
+    socket of a process that exited without closing its transport is removed
+    by the first sibling that fails to reach it.
+
+    A batch that a sibling's socket can't take within send_timeout seconds,
+    because the sibling isn't receiving, is dropped for that sibling, and
+    counted in dropped_count.
+    """
+
+    SUFFIX = '.sock'
+
+    def __init__(self, directory, name=None, send_timeout=1.0,
+                 max_datagram=65536):
+        """
+        :param directory: the directory shared by the sibling processes
+        :param name: the name of this process's socket, defaulting to its pid
+        """
+        self.directory = directory
+        self.name = name
+        self.send_timeout = send_timeout
+        self.max_datagram = max_datagram
+        self.dropped_count = 0
+        self.path = None
+
+        self._socket = None
+        self._sender = None
+        self._receiver = None
+
+    def start(self, receive):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, '{0}{1}'.format(
+            self.name or os.getpid(), self.SUFFIX))
+        try:
+            os.unlink(self.path)  # left by an earlier process of the same name
+        except FileNotFoundError:
+            pass
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.settimeout(self.send_timeout)
+
+        self._receiver = threading.Thread(target=self._run, args=(receive,),
+                                          daemon=True,
+                                          name='UnixSocketTransport')
+        self._receiver.start()
+
+    def _run(self, receive):
+        while True:
+            try:
+                data = self._socket.recv(self.max_datagram)
+            except OSError:
+                return  # closed
+            if not data:
+                return
+            try:
+                receive(data)
+            except Exception:
+                logger.exception("UnixSocketTransport failed to handle a "
+                                 "batch.")
+
+    def sibling_paths(self):
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        return [entry.path for entry in entries
+                if entry.name.endswith(self.SUFFIX) and entry.path != self.path]
+
+    def send(self, data):
+        for path in self.sibling_paths():
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(path)  # its process is gone
+                except OSError:
+                    pass
+            except OSError as exc:  # timed out, or too large
+                self.dropped_count += 1
+                logger.warning("UnixSocketTransport dropped a batch for "
+                               "[{0}]: {1}".format(path, exc))
+
+    def close(self):
+        if self._socket is None:
+            return
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self._sender.close()
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._receiver.join(self.send_timeout)
+        self._socket = None
+
+    def __repr__(self):
+        return "UnixSocketTransport(directory={0})".format(self.directory)
@@ -167,6 +167,10 @@ class PasswordMatchException(AuthenticationException):
     pass
 
 
+class PasswordServiceSaturatedException(AuthenticationException):
+    pass
+
+
 class PasswordVerifierInvalidTokenException(AuthenticationException):
     pass
 
@@ -228,6 +232,15 @@ class CacheException(YosaiException):
     pass
 
 
+# ---------------------------------------------------------------------------
+# ----  Concurrency Exceptions
+# ---------------------------------------------------------------------------
+
+
+class ExecutorSaturatedException(YosaiException):
+    pass
+
+
 # ---------------------------------------------------------------------------
 # ----  EventBus Exceptions
 # ---------------------------------------------------------------------------
@@ -362,6 +375,10 @@ class SessionDeleteException(SessionException):
     pass
 
 
+class SealedSessionTooLargeException(SessionException):
+    pass
+
+
 class UncacheSessionException(SessionException):
     pass
 
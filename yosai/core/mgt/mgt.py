@@ -16,10 +16,20 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import base64
+import collections
 import logging
 import copy
-
-from cryptography.fernet import Fernet
+import os
+import threading
+import time
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from abc import abstractmethod
 
 from yosai.core import(
@@ -44,6 +54,7 @@ from yosai.core import(
     PermissionResolver,
     RoleResolver,
     SaveSubjectException,
+    SimpleIdentifierCollection,
     SimpleSession,
     SerializationManager,
     SimpleRole,
@@ -59,6 +70,57 @@ from yosai.core import(
 logger = logging.getLogger(__name__)
 
 
+class RememberedIdentityCache:
+    """
+    RememberedIdentityCache is new to Yosai.  It remembers, for a short time,
+    the identifiers decrypted from each remembered identity, keyed by the
+    encrypted identity, so that the requests of a remembered user who hasn't
+    logged in don't each pay for decrypting and deserializing it.
+
+    At most max_entries identities are held, the least recently used being
+    evicted first.  Each entry expires ttl seconds after it was decrypted.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()  # key: (expiration, idents)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, identifiers):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, identifiers)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return ("RememberedIdentityCache(ttl={0}, max_entries={1})".
+                format(self.ttl, self.max_entries))
+
+
 class AbstractRememberMeManager(mgt_abcs.RememberMeManager):
     """
     Abstract implementation of the ``RememberMeManager`` interface that handles
@@ -105,15 +167,46 @@ class AbstractRememberMeManager(mgt_abcs.RememberMeManager):
         bytestring notation, into its respective place in /conf/yosai.core.settings.json
         following this format:
             DEFAULT_CIPHER_KEY = "cghiiLzTI6CUFCO5Hhh-5RVKzHTQFZM2QSZxxgaC6Wo="
+
+    Key rotation
+    ------------
+    set_cipher_key accepts a list of decryption keys, the current key first,
+    so that identities remembered under a previous key remain readable while
+    a new key is rolled out.  Identities are always encrypted with the
+    encryption key.
+
+    Ciphers
+    -------
+    Ciphers are built once per key, upon first use after the keys are set,
+    rather than upon every encryption and decryption.  Identities are
+    encrypted with Fernet by default.  Setting the cipher to 'aesgcm' instead
+    encrypts them with AES-256-GCM, using a key derived from the Fernet key,
+    which is cheaper to decrypt.  AES-GCM tokens begin with a version byte so
+    that either kind of token is decrypted, whatever the cipher, allowing a
+    switch from one to the other without forgetting remembered identities.
+
+    Remembered identities
+    ---------------------
+    The identifiers decrypted from a remembered identity are held by a
+    RememberedIdentityCache, keyed by the encrypted identity, and are
+    discarded when the identity is forgotten or the keys change.  Set
+    identity_cache to None to decrypt every remembered identity anew.
     """
 
+    CIPHERS = ('fernet', 'aesgcm')
+    AESGCM_VERSION = b'\x01'  # Fernet tokens begin with b'g', base64 of 0x80
+    AESGCM_NONCE_SIZE = 12
+
     def __init__(self):
 
         # new to yosai.core.
         self.serialization_manager = SerializationManager()
 
-        self.encryption_cipher_key = None
-        self.decryption_cipher_key = None
+        self.cipher = 'fernet'
+        self._encryption_cipher_key = None
+        self._decryption_cipher_keys = ()
+        self._ciphers = {}
+        self.identity_cache = RememberedIdentityCache()
 
         # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!i!!!!!!!!
         # !!!
@@ -128,13 +221,101 @@ class AbstractRememberMeManager(mgt_abcs.RememberMeManager):
 
         self.set_cipher_key(encrypt_key=default_key, decrypt_key=default_key)
 
-    def set_cipher_key(self, encrypt_key, decrypt_key):
+    def set_cipher_key(self, encrypt_key, decrypt_key, cipher=None):
         """
-        :param cipher_key: the private key used to encrypt and decrypt
-        :type cipher_key: a string
+        :param encrypt_key: the private key used to encrypt
+        :type encrypt_key: a string
+
+        :param decrypt_key: the private key used to decrypt, or a list of keys
+                            tried in turn, the current key first
+        :type decrypt_key: a string or a list of strings
+
+        :param cipher: one of AbstractRememberMeManager.CIPHERS, or None to
+                       keep the current cipher
         """
+        if cipher is not None:
+            if cipher not in self.CIPHERS:
+                msg = "cipher must be one of {0}".format(self.CIPHERS)
+                raise InvalidArgumentException(msg)
+            self.cipher = cipher
+
+        if isinstance(decrypt_key, str):
+            decrypt_key = [decrypt_key]
+
         self.encryption_cipher_key = bytes(encrypt_key, 'utf-8')
-        self.decryption_cipher_key = bytes(decrypt_key, 'utf-8')
+        self.decryption_cipher_keys = [bytes(key, 'utf-8')
+                                       for key in decrypt_key]
+
+    @property
+    def encryption_cipher_key(self):
+        return self._encryption_cipher_key
+
+    @encryption_cipher_key.setter
+    def encryption_cipher_key(self, key):
+        self._encryption_cipher_key = key
+        self._ciphers = {}
+        if getattr(self, 'identity_cache', None) is not None:
+            self.identity_cache.clear()
+
+    @property
+    def decryption_cipher_key(self):
+        """
+        the current decryption key
+        """
+        keys = self._decryption_cipher_keys
+        return keys[0] if keys else None
+
+    @decryption_cipher_key.setter
+    def decryption_cipher_key(self, key):
+        self.decryption_cipher_keys = [key]
+
+    @property
+    def decryption_cipher_keys(self):
+        return self._decryption_cipher_keys
+
+    @decryption_cipher_keys.setter
+    def decryption_cipher_keys(self, keys):
+        self._decryption_cipher_keys = tuple(keys)
+        self._ciphers = {}
+        if getattr(self, 'identity_cache', None) is not None:
+            self.identity_cache.clear()
+
+    def _get_cipher(self, name):
+        """
+        :returns: the cipher of the given name, built upon first use of the
+                  keys currently set
+        """
+        cipher = self._ciphers.get(name)
+        if cipher is None:
+            cipher = self._ciphers[name] = self._build_cipher(name)
+        return cipher
+
+    def _build_cipher(self, name):
+        if name == 'fernet_encryptor':
+            return Fernet(self.encryption_cipher_key)
+        if name == 'fernet_decryptor':
+            keys = self.decryption_cipher_keys
+            if len(keys) == 1:
+                return Fernet(keys[0])
+            return MultiFernet([Fernet(key) for key in keys])
+        if name == 'aesgcm_encryptor':
+            return self._derive_aesgcm(self.encryption_cipher_key)
+        if name == 'aesgcm_decryptors':
+            return [self._derive_aesgcm(key)
+                    for key in self.decryption_cipher_keys]
+        raise InvalidArgumentException("unknown cipher: {0}".format(name))
+
+    @staticmethod
+    def _derive_aesgcm(key):
+        """
+        derives an AES-256-GCM key from a Fernet key, rather than reusing the
+        Fernet key's material for a second cipher
+        """
+        Fernet(key)  # validates the key
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None,
+                    info=b'yosai remember me aesgcm',
+                    backend=default_backend())
+        return AESGCM(hkdf.derive(base64.urlsafe_b64decode(key)))
 
     @abstractmethod
     def forget_identity(self, subject):
@@ -236,8 +417,9 @@ class AbstractRememberMeManager(mgt_abcs.RememberMeManager):
         :returns: a bytestring
         """
 
-        # serializes to bytes by default:
-        return self.serialization_manager.serialize(identifiers)
+        # serializes to bytes by default, and encrypts as in Shiro, so that
+        # the identity may be decrypted by convert_bytes_to_identifiers:
+        return self.encrypt(self.serialization_manager.serialize(identifiers))
 
     @abstractmethod
     def remember_serialized_identity(subject, serialized):
@@ -256,14 +438,47 @@ class AbstractRememberMeManager(mgt_abcs.RememberMeManager):
         try:
             serialized = self.get_remembered_serialized_identity(subject_context)
             if serialized:
-                identifiers = self.convert_bytes_to_identifier(identifiers,
-                                                               subject_context)
+                identifiers = self.get_cached_identifiers(serialized)
+                if identifiers is None:
+                    identifiers = self.convert_bytes_to_identifiers(
+                        serialized, subject_context)
+                    self.cache_identifiers(serialized, identifiers)
         except Exception as ex:
             identifiers = \
                 self.on_remembered_identifiers_failure(ex, subject_context)
 
         return identifiers
 
+    def get_cached_identifiers(self, serialized):
+        """
+        :returns: a copy of the identifiers cached for the serialized
+                  identity, or None
+        """
+        cache = self.identity_cache
+        if cache is None:
+            return None
+        identifiers = cache.get(serialized)
+        if isinstance(identifiers, SimpleIdentifierCollection):
+            # a copy, as a subject may add to its identifiers:
+            return SimpleIdentifierCollection(identifier_collection=identifiers)
+        return identifiers
+
+    def cache_identifiers(self, serialized, identifiers):
+        if self.identity_cache is not None and identifiers is not None:
+            self.identity_cache.put(serialized, identifiers)
+
+    def forget_cached_identifiers(self, serialized=None):
+        """
+        :param serialized: the serialized identity to forget, or None to forget
+                           every cached identity
+        """
+        cache = self.identity_cache
+        if cache is not None:
+            if serialized is None:
+                cache.clear()
+            else:
+                cache.discard(serialized)
+
     @abstractmethod
     def get_remembered_serialized_identity(subject_context):
         """
@@ -336,25 +551,41 @@ class AbstractRememberMeManager(mgt_abcs.RememberMeManager):
 
     def encrypt(self, serialized):
         """
-        Encrypts the serialized message using Fernet
+        Encrypts the serialized message using Fernet, or AES-GCM
 
         :param serialized: the serialized object to encrypt
         :type serialized: bytes
-        :returns: an encrypted bytes returned by Fernet
+        :returns: an encrypted bytes returned by Fernet, or a version byte,
+                  nonce and AES-GCM ciphertext
         """
+        if self.cipher == 'aesgcm':
+            nonce = os.urandom(self.AESGCM_NONCE_SIZE)
+            aesgcm = self._get_cipher('aesgcm_encryptor')
+            return (self.AESGCM_VERSION + nonce +
+                    aesgcm.encrypt(nonce, serialized, None))
 
-        fernet = Fernet(self.encryption_cipher_key)
-        return fernet.encrypt(serialized)
+        return self._get_cipher('fernet_encryptor').encrypt(serialized)
 
     def decrypt(self, encrypted):
         """
-        decrypts the encrypted message using Fernet
+        decrypts the encrypted message using Fernet, or AES-GCM when it begins
+        with the AES-GCM version byte, trying each decryption key in turn
 
         :param encrypted: the encrypted message
         :returns: the decrypted, serialized identifier collection
+        :raises InvalidToken: if no decryption key decrypts the message
         """
-        fernet = Fernet(self.decryption_cipher_key)
-        return fernet.decrypt(encrypted)
+        if encrypted[:1] == self.AESGCM_VERSION:
+            start = 1 + self.AESGCM_NONCE_SIZE
+            nonce, ciphertext = encrypted[1:start], encrypted[start:]
+            for aesgcm in self._get_cipher('aesgcm_decryptors'):
+                try:
+                    return aesgcm.decrypt(nonce, ciphertext, None)
+                except InvalidTag:
+                    continue
+            raise InvalidToken
+
+        return self._get_cipher('fernet_decryptor').decrypt(encrypted)
 
     def on_failed_login(self, subject, authc_token, ae):
         """
@@ -438,6 +669,7 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
         if authenticator:
             self._authenticator = authenticator
             self.apply_event_bus(self._authenticator)
+            self.apply_cache_handler(self._authenticator)
             self._authenticator.realms = self.realms
 
         else:
@@ -472,6 +704,7 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
             self.authorizer.realms = self.realms
 
             self.apply_cache_handler(self.session_manager)
+            self.apply_cache_handler(self.authenticator)
 
         else:
             msg = ('Incorrect argument.  If you want to disable caching, '
@@ -490,6 +723,7 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
             self.apply_event_bus(self._authenticator)
             self.apply_event_bus(self._authorizer)
             self.apply_event_bus(self._session_manager)
+            self.apply_event_bus(self._realms)
 
         else:
             msg = 'eventbus argument must have a value'
@@ -508,6 +742,7 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
         if realm_s:
             self._realms = realm_s
             self.apply_cache_handler(self._realms)
+            self.apply_event_bus(self._realms)
 
             # new to yosai.core (shiro v2 alpha is missing it):
             self.apply_credential_resolver(self._realms)
@@ -670,6 +905,15 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
                                                 permission_s,
                                                 logical_operator)
 
+    async def check_permission_async(self, identifiers, permission_s,
+                                     logical_operator):
+        """
+        the coroutine counterpart of check_permission
+        """
+        await self.authorizer.check_permission_async(identifiers,
+                                                     permission_s,
+                                                     logical_operator)
+
     def has_role(self, identifiers, roleid_s):
         """
         :type identifiers: SimpleIdentifierCollection
@@ -714,6 +958,13 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
         return self.authorizer.check_role(identifiers,
                                           roleid_s, logical_operator)
 
+    async def check_role_async(self, identifiers, roleid_s, logical_operator):
+        """
+        the coroutine counterpart of check_role
+        """
+        await self.authorizer.check_role_async(identifiers,
+                                               roleid_s, logical_operator)
+
     """
     * ===================================================================== *
     * SessionManager Methods                                                *
@@ -757,6 +1008,12 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
           accessible for future requests/invocations if necessary
         - Returns the constructed Subject instance
 
+        Yosai notes:  when the context brings nothing new about the subject,
+                      as when a request is made within an existing session,
+                      the session and the subject state stored in it are
+                      resolved from a single session lookup, and the subject
+                      is saved only if its state differs from that stored
+
         :type authc_token:  subject_abcs.AuthenticationToken
 
         :param account:  the Account of a newly authenticated user
@@ -793,7 +1050,11 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
         # subject_factory.  The subject_factory should not need to know how
         # to acquire sessions as the process is often environment specific -
         # better to shield the SF from these details:
-        context = self.resolve_session(context)
+        stored_state = None
+        if self.is_resumable(context):
+            stored_state = self.resume_session(context)
+        else:
+            context = self.resolve_session(context)
 
         # Similarly, the subject_factory should not require any concept of
         # remember_me -- translate that here first if possible before handing
@@ -807,7 +1068,10 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
         # (this is needed here in case remember_me identifiers were resolved
         # and they need to be stored in the session, so we don't constantly
         # re-hydrate the remember_me identifier_collection on every operation).
-        self.save(subject)
+        if (stored_state is None or
+                context.identifiers != stored_state.identifiers or
+                bool(context.authenticated) != stored_state.authenticated):
+            self.save(subject)
         return subject
 
     def remember_me_successful_login(self, authc_token, account, subject):
@@ -1015,6 +1279,53 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
 
         return subject_context
 
+    # new to yosai:
+    def is_resumable(self, subject_context):
+        """
+        Determines whether the context brings nothing about the subject but
+        the session it is made within, such that the subject's state may be
+        resumed from that session alone.
+        """
+        return (subject_context.session is None and
+                subject_context.subject is None and
+                subject_context.account is None and
+                subject_context.authentication_token is None and
+                not subject_context.identifiers and
+                not subject_context.authenticated)
+
+    # new to yosai:
+    def resume_session(self, subject_context):
+        """
+        Resolves the context's session, as does resolve_session, together with
+        the identifiers, authentication state and host stored within it, from
+        a single session lookup, and places them in the context.
+
+        :returns: the session_state_tuple of the session, or None when no valid
+                  session is resolved
+        """
+        session_key = self.get_session_key(subject_context)
+        if (session_key is None):
+            return None
+
+        try:
+            state = self.session_manager.get_session_state(session_key)
+        except InvalidSessionException:
+            msg = ("Resolved subject_context context session is invalid.  "
+                   "Ignoring and creating an anonymous (session-less) "
+                   "Subject instance.")
+            logger.debug(msg, exc_info=True)
+            return None
+
+        if (state is not None):
+            subject_context.session_state = state
+            subject_context.session = state.session
+            subject_context.identifiers = state.identifiers
+            subject_context.authenticated = state.authenticated
+            if (subject_context.host is None):
+                subject_context.host = state.host
+
+        return state
+
     def resolve_context_session(self, subject_context):
         session_key = self.get_session_key(subject_context)
 
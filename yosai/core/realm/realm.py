@@ -20,6 +20,7 @@ import logging
 
 from yosai.core import (
     Account,
+    AsyncCacheHandlerAdapter,
     AuthzInfoNotFoundException,
     CredentialsNotFoundException,
     InvalidArgumentException,
@@ -32,6 +33,7 @@ from yosai.core import (
     authc_abcs,
     authz_abcs,
     cache_abcs,
+    event_abcs,
     realm_abcs,
 )
 
@@ -42,6 +44,7 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
                         realm_abcs.AuthorizingRealm,
                         authz_abcs.AuthzInfoResolverAware,
                         cache_abcs.CacheHandlerAware,
+                        event_abcs.EventBusAware,
                         authc_abcs.CredentialResolverAware,
                         authz_abcs.PermissionResolverAware,
                         authz_abcs.RoleResolverAware):
@@ -62,6 +65,8 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
         self.name = name
         self._account_store = account_store 
         self._cache_handler = None
+        self._async_cache_handler = None
+        self._event_bus = None
 
         # resolvers are setter-injected after init
         self._permission_resolver = None
@@ -96,6 +101,8 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
         :type credentialsmatcher: authc_abcs.CredentialsVerifier
         """
         self._credentials_verifier = credentialsmatcher
+        if isinstance(credentialsmatcher, event_abcs.EventBusAware):
+            credentialsmatcher.event_bus = self._event_bus
 
     @property
     def cache_handler(self):
@@ -108,6 +115,37 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
         """
         self._cache_handler = cachehandler
 
+    @property
+    def async_cache_handler(self):
+        """
+        the AsyncCacheHandler used by the async methods, defaulting to an
+        AsyncCacheHandlerAdapter of the cache_handler
+        """
+        if self._async_cache_handler is None and self._cache_handler:
+            return AsyncCacheHandlerAdapter(self._cache_handler)
+        return self._async_cache_handler
+
+    @async_cache_handler.setter
+    def async_cache_handler(self, cachehandler):
+        """
+        :type cachehandler: cache_abcs.AsyncCacheHandler
+        """
+        self._async_cache_handler = cachehandler
+
+    @property
+    def event_bus(self):
+        return self._event_bus
+
+    @event_bus.setter
+    def event_bus(self, eventbus):
+        """
+        the event_bus is passed on to the credentials_verifier, which
+        publishes CREDENTIALS.REHASH events
+        """
+        self._event_bus = eventbus
+        if isinstance(self._credentials_verifier, event_abcs.EventBusAware):
+            self._credentials_verifier.event_bus = eventbus
+
     @property
     def authz_info_resolver(self):
         return self._authz_info_resolver
@@ -207,6 +245,11 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
 
         self.cache_handler.delete('credentials', identifier)
 
+        try:
+            self.credentials_verifier.clear_verified_credentials(identifier)
+        except AttributeError:
+            pass  # the verifier doesn't remember verified credentials
+
     def clear_cached_authorization_info(self, identifier):
         """
         This process prevents stale authorization data from being used.
@@ -290,6 +333,56 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
 
         return account
 
+    async def get_credentials_async(self, identifier):
+        """
+        The coroutine counterpart of get_credentials, which reads cached
+        credentials through the async_cache_handler and queries the account
+        store through _query_account_store.
+
+        :returns: an Account object
+        """
+        async def get_stored_credentials(self):
+            msg = ("Could not obtain cached credentials for [{0}].  "
+                   "Will try to acquire credentials from account store."
+                   .format(identifier))
+            logger.debug(msg)
+
+            account = await self._query_account_store('get_credentials',
+                                                      identifier)
+            if account is None:
+                msg = "Could not get stored credentials for {0}".format(identifier)
+                raise CredentialsNotFoundException(msg)
+            return account.credentials
+
+        ch = self.async_cache_handler
+        try:
+            if ch is None:
+                credentials = await get_stored_credentials(self)
+            else:
+                credentials = await ch.get_or_create(
+                    domain='credentials',
+                    identifier=identifier,
+                    creator_func=get_stored_credentials,
+                    creator=self)
+        except CredentialsNotFoundException:
+            msg3 = ("No account credentials found for identifiers [{0}].  "
+                    "Returning None.".format(identifier))
+            logger.warning(msg3)
+            return None
+
+        return Account(account_id=identifier, credentials=credentials)
+
+    async def _query_account_store(self, query_name, identifier):
+        """
+        Awaits the account store's coroutine counterpart of a query, named
+        after it with an _async suffix (such as get_authz_info_async), when
+        the account store has one, and calls the query itself otherwise.
+        """
+        query = getattr(self.account_store, query_name + '_async', None)
+        if query is not None:
+            return await query(identifier)
+        return getattr(self.account_store, query_name)(identifier)
+
     # yosai.core.refactors:
     def authenticate_account(self, authc_token):
         """
@@ -389,6 +482,49 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
 
         return account
 
+    async def get_authorization_info_async(self, identifiers):
+        """
+        The coroutine counterpart of get_authorization_info, which reads cached
+        authz_info through the async_cache_handler and queries the account
+        store through _query_account_store.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :returns: Account
+        """
+        identifier = identifiers.primary_identifier  # TBD
+
+        async def get_stored_authz_info(self):
+            msg = ("Could not obtain cached authz_info for [{0}].  "
+                   "Will try to acquire authz_info from account store."
+                   .format(identifier))
+            logger.debug(msg)
+
+            account = await self._query_account_store('get_authz_info',
+                                                      identifier)
+            if account is None:
+                msg = "Could not get authz_info for {0}".format(identifier)
+                raise AuthzInfoNotFoundException(msg)
+            return account.authz_info
+
+        ch = self.async_cache_handler
+        try:
+            if ch is None:
+                authz_info = await get_stored_authz_info(self)
+            else:
+                authz_info = await ch.get_or_create(
+                    domain='authz_info',
+                    identifier=identifier,
+                    creator_func=get_stored_authz_info,
+                    creator=self)
+        except AuthzInfoNotFoundException:
+            msg3 = ("No account authz_info found for identifier [{0}].  "
+                    "Returning None.".format(identifier))
+            logger.warning(msg3)
+            return None
+
+        return Account(account_id=identifier, authz_info=authz_info)
+
     def is_permitted(self, identifiers, permission_s):
         """
         If the authorization info cannot be obtained from the accountstore,
@@ -405,7 +541,19 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
         """
 
         account = self.get_authorization_info(identifiers)
+        yield from self._permission_results(account, identifiers, permission_s)
+
+    async def is_permitted_async(self, identifiers, permission_s):
+        """
+        The coroutine counterpart of is_permitted.
+
+        :returns: a list of tuple(Permission, Boolean)
+        """
+        account = await self.get_authorization_info_async(identifiers)
+        return list(self._permission_results(account, identifiers,
+                                             permission_s))
 
+    def _permission_results(self, account, identifiers, permission_s):
         if account is None:
             msg = 'is_permitted:  authz_info returned None for [{0}]'.\
                 format(identifiers)
@@ -432,7 +580,18 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
         :yields: tuple(roleid, Boolean)
         """
         account = self.get_authorization_info(identifiers)
+        yield from self._role_results(account, identifiers, roleid_s)
+
+    async def has_role_async(self, identifiers, roleid_s):
+        """
+        The coroutine counterpart of has_role.
+
+        :returns: a list of tuple(roleid, Boolean)
+        """
+        account = await self.get_authorization_info_async(identifiers)
+        return list(self._role_results(account, identifiers, roleid_s))
 
+    def _role_results(self, account, identifiers, roleid_s):
         if account is None:
             msg = 'has_role:  authz_info returned None for [{0}]'.\
                 format(identifiers)
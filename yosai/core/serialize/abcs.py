@@ -16,12 +16,37 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
-
+import functools
 from abc import ABCMeta, abstractmethod
 from marshmallow import fields
 
 
+@functools.lru_cache(maxsize=None)
+def get_slot_names(cls):
+    """
+    :returns: a frozenset of the names of the instance attributes that cls
+              and its ancestors declare in __slots__
+    """
+    names = set()
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.update(slots)
+    names.difference_update(('__dict__', '__weakref__'))
+    return frozenset(names)
+
+
 class Serializable(metaclass=ABCMeta):
+    """
+    Subclasses that are instantiated in large numbers may declare __slots__
+    rather than keep a __dict__ per instance.  __getstate__ and __setstate__
+    treat slots and __dict__ alike, so a schema's post_load restores an
+    instance with ``instance.__setstate__(data)`` either way, and copying,
+    pickling and comparison keep working.
+    """
+
+    __slots__ = ()
 
     @classmethod
     @abstractmethod
@@ -49,12 +74,32 @@ class Serializable(metaclass=ABCMeta):
         schema = cls.serialization_schema()()
         return schema.load(data=data).data
 
+    def __getstate__(self):
+        """
+        :returns: a dict of the instance's attributes, from __dict__ and slots
+        """
+        state = dict(getattr(self, '__dict__', {}))
+        for name in get_slot_names(self.__class__):
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:  # an unassigned slot
+                pass
+        return state
+
+    def __setstate__(self, state):
+        slot_names = get_slot_names(self.__class__)
+        for name, value in state.items():
+            if name in slot_names:
+                setattr(self, name, value)
+            else:
+                self.__dict__[name] = value
+
     def __eq__(self, other):
         if self is other:
             return True
 
         return (isinstance(other, self.__class__) and
-                self.__dict__ == other.__dict__)
+                self.__getstate__() == other.__getstate__())
 
 
 class Serializer(metaclass=ABCMeta):
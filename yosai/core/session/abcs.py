@@ -33,6 +33,8 @@ class Session(metaclass=ABCMeta):
     frameworks.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def session_id(self):
@@ -257,6 +259,7 @@ class SessionStorageEvaluator(metaclass=ABCMeta):
 
 
 class ValidatingSession(Session):
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -640,6 +643,7 @@ class SessionContext(metaclass=ABCMeta):
 
 
 class SessionKey(metaclass=ABCMeta):
+    __slots__ = ()
 
     @property
     @abstractmethod
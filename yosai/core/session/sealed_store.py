@@ -0,0 +1,358 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import threading
+import time
+import zlib
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from yosai.core import (
+    AbstractSessionStore,
+    ContextLocal,
+    DefaultSessionKey,
+    InvalidArgumentException,
+    SealedSessionTooLargeException,
+    SerializationManager,
+    SimpleSession,
+    cache_abcs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSealer:
+    """
+    SessionSealer is new to Yosai.  It seals bytes into a url-safe token that
+    the client can't forge, and unseals them again, in one of two modes:
+
+        - fernet:  the bytes are encrypted and authenticated using Fernet, as
+                   are remembered identities, so the client can't read them
+        - hmac:  the bytes are signed with an HMAC-SHA256 of the key, which is
+                 cheaper but leaves them readable by the client
+
+    Tokens are stripped of base64 padding, as '=' is a separator in cookies.
+    """
+
+    MODES = ('fernet', 'hmac')
+
+    def __init__(self, key, mode='fernet'):
+        """
+        :param key: a Fernet key in fernet mode, or any secret in hmac mode
+        :type key: bytes or str
+        """
+        if mode not in self.MODES:
+            msg = "mode must be one of {0}".format(self.MODES)
+            raise InvalidArgumentException(msg)
+
+        if isinstance(key, str):
+            key = bytes(key, 'utf-8')
+        self.mode = mode
+        self._fernet = Fernet(key) if mode == 'fernet' else None
+        self._key = key
+
+    @staticmethod
+    def _encode(data):
+        return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+    @staticmethod
+    def _decode(text):
+        text = bytes(text, 'ascii')
+        return base64.urlsafe_b64decode(text + b'=' * (-len(text) % 4))
+
+    def _sign(self, data):
+        return hmac.new(self._key, data, hashlib.sha256).digest()
+
+    def seal(self, data):
+        """
+        :type data: bytes
+        :returns: a url-safe token str
+        """
+        if self._fernet is not None:
+            return self._encode(self._fernet.encrypt(data))
+        return self._encode(data) + '.' + self._encode(self._sign(data))
+
+    def unseal(self, token):
+        """
+        :returns: the bytes sealed in the token, or None when the token is
+                  malformed or was not sealed with this key
+        """
+        try:
+            if self._fernet is not None:
+                return self._fernet.decrypt(self._decode(token))
+
+            payload, signature = token.split('.')
+            data = self._decode(payload)
+            if hmac.compare_digest(self._sign(data), self._decode(signature)):
+                return data
+        except (InvalidToken, ValueError, TypeError, AttributeError,
+                binascii.Error):
+            pass
+        return None
+
+    def __repr__(self):
+        return "SessionSealer(mode={0})".format(self.mode)
+
+
+class SessionDenyList(cache_abcs.CacheHandlerAware):
+    """
+    SessionDenyList is new to Yosai.  It records the ids of sessions that were
+    stopped while the client still holds a copy of them, so that a sealed
+    session can't be used again once revoked.  An id is held until the revoked
+    session would have expired anyway.
+
+    Revocations are always recorded in local memory.  When a CacheHandler is
+    available, they are also recorded within cache, in the
+    'session_deny_list' domain, so that every process sharing the cache
+    honors them, at the cost of a small cache read when a session isn't
+    revoked locally.  Cache entries expire by the TTL configured for the
+    domain.
+    """
+
+    # entries are held for this many seconds when a deadline isn't given:
+    default_ttl = 1800
+
+    def __init__(self):
+        self._cache_handler = None
+        self._revoked = {}  # session_id: epoch time to hold the entry until
+        self._lock = threading.Lock()
+
+    @property
+    def cache_handler(self):
+        return self._cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        self._cache_handler = cachehandler
+
+    def revoke(self, session_id, until=None):
+        """
+        :param until: the epoch time at which the session would have expired
+        """
+        now = time.time()
+        with self._lock:
+            self._revoked[session_id] = until or (now + self.default_ttl)
+            self._purge_expired(now)
+
+        if self.cache_handler:
+            self.cache_handler.set(domain='session_deny_list',
+                                   identifier=session_id,
+                                   value=DefaultSessionKey(session_id))
+
+    def is_revoked(self, session_id):
+        until = self._revoked.get(session_id)
+        if until is not None:
+            return until > time.time()
+
+        if self.cache_handler:
+            return self.cache_handler.get(domain='session_deny_list',
+                                          identifier=session_id) is not None
+        return False
+
+    def _purge_expired(self, now):
+        expired = [session_id for session_id, until in self._revoked.items()
+                   if until <= now]
+        for session_id in expired:
+            del self._revoked[session_id]
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def __repr__(self):
+        return "SessionDenyList(revoked={0})".format(len(self._revoked))
+
+
+class SealedSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
+    """
+    SealedSessionStore is new to Yosai.  Rather than keeping sessions on the
+    server, it seals each session, serialized and compressed, into a token
+    that the client holds and presents with every request, such as a cookie.
+    Reading a session unseals the token presented, so no server-side session
+    I/O is performed but to consult the deny list.
+
+    Subclasses carry the token to and from the client by implementing
+    get_token, set_token and delete_token.  A session is read from the token
+    presented or, failing that, from the session id given when it is itself a
+    token.  The session last sealed or unsealed within an execution context is
+    remembered so that repeated reads of it within a request unseal it only
+    once.
+
+    Revocation
+    ----------
+    A client may present a token after the session in it was stopped, so
+    deleting a session revokes its id through a SessionDenyList.  Revoked
+    sessions are never read again.  Tokens are not otherwise invalidated, so
+    a client may present an older copy of a session that is still valid.
+
+    Sealed sessions should be kept small: sealing a token longer than
+    max_token_size raises a SealedSessionTooLargeException.
+    """
+
+    # browsers limit a cookie, including its name and attributes, to 4096:
+    max_token_size = 4000
+
+    def __init__(self, key, mode='fernet', serialization_manager=None,
+                 deny_list=None):
+        """
+        :param key: the secret used to seal sessions
+        :param mode: 'fernet' to encrypt sessions, or 'hmac' to only sign them
+        :param serialization_manager: serializes sessions, defaulting to a
+                                      msgpack SerializationManager
+        :type deny_list: SessionDenyList
+        """
+        super().__init__()
+        self.sealer = SessionSealer(key, mode)
+        self.serialization_manager = (serialization_manager or
+                                      SerializationManager())
+        self.deny_list = deny_list if deny_list is not None else SessionDenyList()
+        self._local = ContextLocal(last=None)
+
+    @property
+    def cache_handler(self):
+        return self.deny_list.cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        self.deny_list.cache_handler = cachehandler
+
+    def get_token(self):
+        """
+        :returns: the token presented by the client, if any
+        """
+        return None
+
+    def set_token(self, token):
+        """
+        hands the token to the client, replacing the one it presented
+        """
+        pass
+
+    def delete_token(self):
+        pass
+
+    def seal(self, session):
+        """
+        :returns: a token str holding the session's serialized state
+        """
+        data = self.serialization_manager.serializer.serialize(
+            session.serialize())
+        compressed = zlib.compress(data)
+        if len(compressed) < len(data):
+            payload = b'\x01' + compressed
+        else:
+            payload = b'\x00' + data
+
+        token = self.sealer.seal(payload)
+        if len(token) > self.max_token_size:
+            msg = ("Sealed session [{0}] is {1} bytes, exceeding the limit "
+                   "of {2}".format(session.session_id, len(token),
+                                   self.max_token_size))
+            raise SealedSessionTooLargeException(msg)
+        return token
+
+    def unseal(self, token):
+        """
+        :returns: the SimpleSession sealed in the token, or None when the token
+                  isn't valid
+        """
+        payload = self.sealer.unseal(token)
+        if not payload:
+            return None
+
+        try:
+            data = payload[1:]
+            if payload[:1] == b'\x01':
+                data = zlib.decompress(data)
+        except zlib.error:
+            return None
+
+        serialized = self.serialization_manager.serializer.deserialize(data)
+        if not serialized:
+            return None
+        return SimpleSession.deserialize(serialized)
+
+    def create(self, session):
+        session_id = super().create(session)
+        self._write(session)
+        return session_id
+
+    def _do_create(self, session):
+        session_id = self.generate_session_id(session)
+        self.assign_session_id(session, session_id)
+        return session_id
+
+    def _do_read(self, session_id):
+        last = self._local.last
+        if last is not None and session_id in (last[0], last[1].session_id):
+            token, session = last
+        else:
+            session = None
+            for token in (self.get_token(), session_id):
+                if token is None:
+                    continue
+                session = self.unseal(token)
+                if session is not None and session_id in (token,
+                                                          session.session_id):
+                    break
+                session = None
+
+            if session is None:
+                return None
+            self._local.last = (token, session)
+
+        if self.deny_list.is_revoked(session.session_id):
+            self._local.last = None
+            return None
+        return session
+
+    def update(self, session):
+        if not session.is_valid:
+            self.delete(session)
+            return
+
+        changed = getattr(session, 'changed_fields', True)
+        last = self._local.last
+        if not changed and last is not None and last[1] is session:
+            return  # the token presented already holds the session
+
+        self._write(session)
+
+    def delete(self, session):
+        session_id = session.session_id
+        self.deny_list.revoke(session_id,
+                              getattr(session, 'expiration_time', None))
+        self._local.last = None
+        self.delete_token()
+
+    def _write(self, session):
+        token = self.seal(session)
+        try:
+            session.clear_changes()
+        except AttributeError:  # not a SimpleSession
+            pass
+        self.set_token(token)
+        self._local.last = (token, session)
+
+    def __repr__(self):
+        return "{0}(sealer={1}, deny_list={2})".format(
+            self.__class__.__name__, self.sealer, self.deny_list)
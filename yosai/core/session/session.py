@@ -17,26 +17,31 @@ specific language governing permissions and limitations
 under the License.
 """
 import collections
+import heapq
 import logging
 import pytz
 import datetime
+import threading
+import time
 from abc import abstractmethod
 
 from marshmallow import Schema, fields, post_load
 
 from yosai.core import (
+    AsyncCacheHandlerAdapter,
     MapContext,
     ExpiredSessionException,
     InvalidArgumentException,
     IllegalStateException,
     InvalidSessionException,
-    memoized_property,
     RandomSessionIDGenerator,
     SimpleIdentifierCollection,
     SessionCacheException,
     SessionCreationException,
     SessionEventException,
+    StoppableScheduledExecutor,
     StoppedSessionException,
+    WriteBehindQueue,
     UnknownSessionException,
     session_settings,
     cache_abcs,
@@ -47,6 +52,16 @@ from yosai.core import (
 
 logger = logging.getLogger(__name__)
 
+# the payload of session events published by session stores, built once as
+# creating a namedtuple class is costly:
+evicted_session_tuple = collections.namedtuple(
+    'session_tuple', ['identifiers', 'session_key'])
+
+# the subject state held by a session, as returned by
+# DefaultNativeSessionManager.get_session_state:
+session_state_tuple = collections.namedtuple(
+    'session_state', ['session', 'identifiers', 'authenticated', 'host'])
+
 
 class AbstractSessionStore(session_abcs.SessionStore):
     """
@@ -111,6 +126,20 @@ class AbstractSessionStore(session_abcs.SessionStore):
             raise UnknownSessionException(msg)
         return session
 
+    async def read_async(self, session_id):
+        """
+        the coroutine counterpart of read, which stores whose reads perform
+        I/O override so as not to block the event loop
+        """
+        return self.read(session_id)
+
+    async def update_async(self, session):
+        """
+        the coroutine counterpart of update, which stores whose writes perform
+        I/O override so as not to block the event loop
+        """
+        self.update(session)
+
     @abstractmethod
     def _do_read(self, session_id):
         pass
@@ -120,14 +149,79 @@ class AbstractSessionStore(session_abcs.SessionStore):
         pass
 
 
-class MemorySessionStore(AbstractSessionStore):
+class SessionExpirationIndex:
+    """
+    SessionExpirationIndex is new to Yosai.  It orders session ids by the time
+    at which each session is due to expire so that expired sessions are found
+    without scanning every session.
+
+    Deadlines are recorded when a session is tracked and are not revised each
+    time the session is touched.  Consequently, a session popped as due may
+    have been used since and must be checked against its current deadline by
+    the caller, who re-tracks it when it remains valid.  A deadline is only
+    ever postponed by use, so a session is never popped later than it is due.
+    """
+
+    def __init__(self):
+        self._heap = []  # (deadline, session_id)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_deadline(session):
+        """
+        :returns: the epoch time at which the session expires, or None when
+                  the session has no timeouts
+        """
+        try:
+            return session.expiration_time
+        except AttributeError:  # not a SimpleSession
+            return None
+
+    def track(self, session):
+        deadline = self.get_deadline(session)
+        if deadline is not None:
+            with self._lock:
+                heapq.heappush(self._heap, (deadline, session.session_id))
+
+    def pop_due(self, now=None, limit=None):
+        """
+        :returns: a list of the ids of sessions whose recorded deadlines have
+                  passed, soonest first and no more than limit of them
+        """
+        if now is None:
+            now = time.time()
+
+        due = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                if limit is not None and len(due) >= limit:
+                    break
+                due.append(heapq.heappop(heap)[1])
+        return due
+
+    def retain(self, is_tracked):
+        """
+        discards the entries of sessions for which is_tracked returns False,
+        such as those deleted or evicted before their deadline
+        """
+        with self._lock:
+            self._heap = [entry for entry in self._heap if is_tracked(entry[1])]
+            heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __repr__(self):
+        return "SessionExpirationIndex(size={0})".format(len(self))
+
+
+class MemorySessionStore(AbstractSessionStore, event_abcs.EventBusAware):
     """
     Simple memory-based implementation of the SessionStore that stores all of its
-    sessions in an in-memory dict.  This implementation does not page
+    sessions in in-memory dicts.  This implementation does not page
     to disk and is therefore unsuitable for applications that could experience
-    a large amount of sessions and would therefore result in MemoryError
-    exceptions as the interpreter runs out of memory.  This class is *not*
-    recommended for production use in most environments.
+    a large amount of sessions beyond the memory available to a single process.
 
     Memory Restrictions
     -------------------
@@ -139,10 +233,57 @@ class MemorySessionStore(AbstractSessionStore):
     Instead, use a custom CachingSessionStore implementation that communicates
     with a higher-capacity data store of your choice (Redis, Memcached,
     file system, rdbms, etc).
+
+    New to Yosai, a max_sessions capacity may be set.  Once it is reached,
+    storing another session evicts the least recently used one, which is
+    expired and announced with a SESSION.EXPIRE event.
+
+    Concurrency
+    -----------
+    Sessions are partitioned among shard_count shards by session id, each
+    guarded by its own lock, so that threads working with different sessions
+    rarely contend.  Each shard orders its sessions by last use and is
+    allotted an equal share of max_sessions, so eviction is least recently
+    used per shard rather than across the whole store.
+
+    Expired sessions are removed when read or when a session validation
+    scheduler, which obtains them from get_expired_sessions, sweeps the store.
     """
 
-    def __init__(self):
-        self.sessions = {}
+    def __init__(self, max_sessions=None, shard_count=16):
+        """
+        :param max_sessions: the number of sessions that may be stored before
+                             the least recently used are evicted, or None
+                             for no limit
+        :param shard_count: the number of independently locked partitions
+        """
+        super().__init__()  # obtains a session id generator
+        self.max_sessions = max_sessions
+        self.shard_count = shard_count
+        self._shards = [collections.OrderedDict() for _ in range(shard_count)]
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+        self._shard_capacity = None
+        if max_sessions:
+            # rounded up, so that the store never holds fewer than max_sessions
+            self._shard_capacity = -(-max_sessions // shard_count)
+
+        self.expiration_index = SessionExpirationIndex()
+        self._event_bus = None
+
+    @property
+    def event_bus(self):
+        return self._event_bus
+
+    @event_bus.setter
+    def event_bus(self, eventbus):
+        self._event_bus = eventbus
+
+    def _get_shard(self, session_id):
+        """
+        :returns: tuple(shard, lock)
+        """
+        index = hash(session_id) % self.shard_count
+        return self._shards[index], self._locks[index]
 
     def update(self, session):
         return self.store_session(session.session_id, session)
@@ -150,7 +291,9 @@ class MemorySessionStore(AbstractSessionStore):
     def delete(self, session):
         try:
             sessionid = session.session_id
-            self.sessions.pop(sessionid)
+            shard, lock = self._get_shard(sessionid)
+            with lock:
+                shard.pop(sessionid)
         except AttributeError:
             msg = 'MemorySessionStore.delete None param passed'
             raise InvalidArgumentException(msg)
@@ -166,16 +309,104 @@ class MemorySessionStore(AbstractSessionStore):
             msg = 'MemorySessionStore.store_session invalid param passed'
             raise InvalidArgumentException(msg)
 
-        return self.sessions.setdefault(session_id, session)
+        evicted = None
+        shard, lock = self._get_shard(session_id)
+        with lock:
+            stored = shard.setdefault(session_id, session)
+            shard.move_to_end(session_id)
+            if self._shard_capacity and len(shard) > self._shard_capacity:
+                evicted = shard.popitem(last=False)
+
+        if evicted is not None:
+            self.on_eviction(*evicted)
+
+        return stored
+
+    def on_eviction(self, session_id, session):
+        msg = ("Evicted least recently used session [{0}] from a full "
+               "MemorySessionStore".format(session_id))
+        logger.debug(msg)
+
+        try:
+            session.expire()
+            identifiers = session.get_internal_attribute('identifiers_session_key')
+        except AttributeError:  # not a SimpleSession
+            identifiers = None
+
+        mysession = evicted_session_tuple(identifiers,
+                                          DefaultSessionKey(session_id))
+        try:
+            self.event_bus.publish('SESSION.EXPIRE', items=mysession)
+        except AttributeError:
+            msg = "Could not publish SESSION.EXPIRE event"
+            logger.warning(msg)
+
+    def get_expired_sessions(self, limit=None):
+        """
+        Obtains the sessions that are due to expire, consulting only those
+        whose recorded deadlines have passed.  Sessions that have been used
+        since their deadline was recorded are tracked anew.
+
+        :param limit: the maximum number of sessions to return
+        :returns: a list of SimpleSession
+        """
+        index = self.expiration_index
+        now = time.time()
+        expired = []
+        while limit is None or len(expired) < limit:
+            remaining = None if limit is None else limit - len(expired)
+            due = index.pop_due(now, remaining)
+            if not due:
+                break
+
+            for session_id in due:
+                # read without refreshing the session's place in its shard:
+                shard, lock = self._get_shard(session_id)
+                with lock:
+                    session = shard.get(session_id)
+                if session is None:
+                    continue  # already deleted
+                deadline = index.get_deadline(session)
+                if deadline is None:
+                    continue  # no longer times out
+                if deadline <= now or session.is_expired:
+                    expired.append(session)
+                else:
+                    index.track(session)
+
+        return expired
 
     def _do_create(self, session):
         sessionid = self.generate_session_id(session)
         self.assign_session_id(session, sessionid)
         self.store_session(sessionid, session)
+
+        index = self.expiration_index
+        index.track(session)
+        # entries of deleted sessions otherwise linger until their deadline:
+        if len(index) > 2 * len(self) + self.shard_count:
+            index.retain(self._contains)
         return sessionid
 
+    def _contains(self, session_id):
+        shard, lock = self._get_shard(session_id)
+        with lock:
+            return session_id in shard
+
     def _do_read(self, sessionid):
-        return self.sessions.get(sessionid)
+        shard, lock = self._get_shard(sessionid)
+        with lock:
+            session = shard.get(sessionid)
+            if session is not None:
+                shard.move_to_end(sessionid)
+        return session
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def __repr__(self):
+        return ("MemorySessionStore(max_sessions={0}, shard_count={1})".
+                format(self.max_sessions, self.shard_count))
 
 
 class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
@@ -195,7 +426,8 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
     Unlike Shiro:
     - Yosai implements the CRUD operations within CachingSessionStore
     rather than defer implementation further to subclasses
-    - Yosai comments out support for a write-through caching strategy
+    - Yosai's write-through hooks do nothing unless a subclass implements
+      them, such as the SQLiteSessionStore
     - Yosai uses an IdentifierCollection with session caching as part of its
       caching strategy
 
@@ -220,11 +452,35 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
 
     Ref: https://en.wikipedia.org/wiki/Cache_%28computing%29#Writing_policies
 
+    Write-Behind Caching
+    --------------------
+    New to Yosai, enable_write_behind defers the do_update and do_delete
+    write-through operations to a WriteBehindQueue so that requests don't wait
+    on the backing store.  Successive writes of a session are coalesced, so
+    only its latest state is written.  Reads consult the queue before the
+    backing store.  Session creation remains synchronous, as a backing store
+    may assign the session id.
+
+    Partial Updates
+    ---------------
+    New to Yosai, a backing store that sets partial_updates receives a
+    session's serialized changes through do_update_changes in place of the
+    whole session through do_update, and nothing at all when a session is
+    updated without having changed.  Should partial updates of a session be
+    coalesced by the write-behind queue, their changes are combined.  The
+    cache handler api has no field-level writes, so cache entries are always
+    rewritten in full.
     """
 
+    # whether the backing store persists a session's changed fields alone,
+    # through _do_update_changes, rather than rewriting it through _do_update:
+    partial_updates = False
+
     def __init__(self):
         super().__init__()  # obtains a session id generator
         self._cache_handler = None
+        self._async_cache_handler = None
+        self.write_behind_queue = None
 
     # cache_handler property is required for CacheHandlerAware interface
     @property
@@ -236,6 +492,23 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
     def cache_handler(self, cachehandler):
         self._cache_handler = cachehandler
 
+    @property
+    def async_cache_handler(self):
+        """
+        the AsyncCacheHandler used by read_async and update_async, defaulting
+        to an AsyncCacheHandlerAdapter of the cache_handler
+        """
+        if self._async_cache_handler is None and self._cache_handler:
+            return AsyncCacheHandlerAdapter(self._cache_handler)
+        return self._async_cache_handler
+
+    @async_cache_handler.setter
+    def async_cache_handler(self, cachehandler):
+        """
+        :type cachehandler: cache_abcs.AsyncCacheHandler
+        """
+        self._async_cache_handler = cachehandler
+
     def create(self, session):
         """
         caches the session and caches an entry to associate the cached session
@@ -250,15 +523,53 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
         session = self._get_cached_session(sessionid)
 
         # for write-through caching:
-        # if (session is None):
-        #    session = super().read(sessionid)
+        if (session is None):
+            session = self._read_through(sessionid)
+            if session is not None and self.cache_handler:
+                self._cache(session, sessionid)
+
+        return session
+
+    async def read_async(self, sessionid):
+        """
+        The coroutine counterpart of read, which consults the cache through
+        the async_cache_handler and the backing store through _do_read_async.
+        """
+        ch = self.async_cache_handler
+        session = None
+        if ch is not None:
+            session = await ch.get(domain='session', identifier=sessionid)
+
+        # for write-through caching:
+        if (session is None):
+            session = await self._read_through_async(sessionid)
+            if session is not None and ch is not None:
+                await ch.set(domain='session', identifier=sessionid,
+                             value=session)
 
         return session
 
+    def _read_through(self, sessionid):
+        queue = self.write_behind_queue
+        if queue is not None:
+            pending = queue.get_pending(sessionid)
+            if pending:
+                fn, args = pending
+                if fn == self._do_delete:
+                    return None
+                return args[0]  # the session, as last updated
+        return self._do_read(sessionid)
+
+    async def _read_through_async(self, sessionid):
+        queue = self.write_behind_queue
+        if queue is not None and queue.get_pending(sessionid):
+            return self._read_through(sessionid)  # no I/O is needed
+        return await self._do_read_async(sessionid)
+
     def update(self, session):
 
         # for write-through caching:
-        # self._do_update(session)
+        self._write_update(session)
 
         if (session.is_valid):
             self._cache(session, session.session_id)
@@ -266,10 +577,103 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
         else:
             self._uncache(session)
 
+    async def update_async(self, session):
+        """
+        The coroutine counterpart of update, which caches the session through
+        the async_cache_handler.  The session is written to the backing store
+        as by update, which a write-behind queue keeps off the event loop.
+        """
+        ch = self.async_cache_handler
+        if ch is None:
+            msg = "Cannot cache without a cache_handler."
+            raise SessionCacheException(msg)
+
+        # for write-through caching:
+        self._write_update(session)
+
+        session_id = session.session_id
+        if (session.is_valid):
+            await ch.set(domain='session', identifier=session_id,
+                         value=session)
+            await self._cache_identifiers_to_key_map_async(ch, session,
+                                                           session_id)
+        else:
+            await self._uncache_async(ch, session)
+
+    def _write_update(self, session):
+        write = self._get_update_write(session)
+        if write is None:
+            pass  # nothing changed
+        elif self.write_behind_queue is not None:
+            fn, args = write
+            self.write_behind_queue.submit(session.session_id, fn, *args,
+                                           merge=self._merge_writes)
+        else:
+            fn, args = write
+            fn(*args)
+
     def delete(self, session):
         self._uncache(session)
         # for write-through caching:
-        # self._do_delete(session)
+        if self.write_behind_queue is not None:
+            self.write_behind_queue.submit(session.session_id,
+                                           self._do_delete, session)
+        else:
+            self._do_delete(session)
+
+    def _get_update_write(self, session):
+        """
+        :returns: tuple(fn, args) of the write-through call that persists the
+                  session, or None when a partial update has nothing to write
+        """
+        if self.partial_updates:
+            try:
+                changes = session.serialize_changes()
+            except AttributeError:  # not a SimpleSession
+                pass
+            else:
+                session.clear_changes()
+                if not changes:
+                    return None
+                return (self._do_update_changes, (session, changes))
+        return (self._do_update, (session,))
+
+    def _merge_writes(self, pending, latest):
+        """
+        coalesces a write-behind with the one pending for the same session,
+        combining the changes of successive partial updates so that none is
+        lost, and otherwise writing the latest state of the session in full
+        """
+        (pending_fn, pending_args), (fn, args) = pending, latest
+        if fn != self._do_update_changes:
+            return latest
+        if pending_fn == self._do_update_changes:
+            return (fn, (args[0], SimpleSession.merge_changes(pending_args[1],
+                                                              args[1])))
+        return (self._do_update, (args[0],))
+
+    def enable_write_behind(self, max_pending=10000, batch_size=100,
+                            flush_interval=0.5, put_timeout=1.0):
+        """
+        defers the write-through operations to a WriteBehindQueue, which calls
+        the store's flush method, if any, after each batch
+        """
+        if self.write_behind_queue is None:
+            self.write_behind_queue = WriteBehindQueue(
+                max_pending=max_pending,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                put_timeout=put_timeout,
+                after_batch=getattr(self, 'flush', None))
+
+    def disable_write_behind(self):
+        """
+        performs every pending write and then resumes writing through
+        """
+        queue = self.write_behind_queue
+        if queue is not None:
+            queue.stop()
+            self.write_behind_queue = None
 
     # java overloaded methods combined:
     def _get_cached_session(self, sessionid):
@@ -285,24 +689,126 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
 
     def _cache_identifiers_to_key_map(self, session, session_id):
         """
-        creates a cache entry within a user's cache space that is used to
-        identify the active session associated with the user
+        adds the session id to the SessionIdSet, within a user's cache space,
+        that identifies the active sessions associated with the user
 
         when a session is associated with a user, it will have an identifiers
         attribute
 
-        including a primary identifier is new to yosai
+        including a primary identifier is new to yosai, as is indexing every
+        session of a user rather than the latest alone
         """
         isk = 'identifiers_session_key'
         identifiers = session.get_internal_attribute(isk)
         try:
-            self.cache_handler.set(domain='session',
-                                   identifier=identifiers.primary_identifier,
-                                   value=DefaultSessionKey(session_id))
+            identifier = identifiers.primary_identifier
+            session_ids = self._get_session_id_set(identifier)
+            if session_id not in session_ids:
+                session_ids.add(session_id)
+                self.cache_handler.set(domain='session',
+                                       identifier=identifier,
+                                       value=session_ids)
         except AttributeError:
             msg = "Could not cache identifiers_session_key."
             logger.warning(msg)
 
+    async def _cache_identifiers_to_key_map_async(self, ch, session,
+                                                  session_id):
+        """
+        the coroutine counterpart of _cache_identifiers_to_key_map
+
+        :type ch: cache_abcs.AsyncCacheHandler
+        """
+        isk = 'identifiers_session_key'
+        identifiers = session.get_internal_attribute(isk)
+        try:
+            identifier = identifiers.primary_identifier
+        except AttributeError:
+            msg = "Could not cache identifiers_session_key."
+            logger.warning(msg)
+            return
+
+        session_ids = await self._get_session_id_set_async(ch, identifier)
+        if session_id not in session_ids:
+            session_ids.add(session_id)
+            await ch.set(domain='session', identifier=identifier,
+                         value=session_ids)
+
+    def _get_session_id_set(self, identifier):
+        session_ids = self.cache_handler.get(domain='session',
+                                             identifier=identifier)
+        if not isinstance(session_ids, SessionIdSet):
+            return SessionIdSet()
+        return session_ids
+
+    async def _get_session_id_set_async(self, ch, identifier):
+        session_ids = await ch.get(domain='session', identifier=identifier)
+        if not isinstance(session_ids, SessionIdSet):
+            return SessionIdSet()
+        return session_ids
+
+    def get_session_ids_for(self, identifier):
+        """
+        :param identifier: a user's primary identifier
+        :returns: a set of the ids of the user's indexed sessions
+        """
+        try:
+            return set(self._get_session_id_set(identifier))
+        except AttributeError:
+            msg = "Cannot obtain session ids without a cache_handler."
+            raise SessionCacheException(msg)
+
+    def get_sessions_for(self, identifier):
+        """
+        :param identifier: a user's primary identifier
+        :returns: a list of the user's sessions, omitting those that can no
+                  longer be read, which are dropped from the user's index
+        """
+        session_ids = self.get_session_ids_for(identifier)
+        sessions = []
+        for session_id in session_ids:
+            session = self.read(session_id)
+            if session is not None:
+                sessions.append(session)
+
+        if len(sessions) < len(session_ids):
+            self._set_session_id_set(identifier, SessionIdSet(
+                session.session_id for session in sessions))
+        return sessions
+
+    def delete_sessions_for(self, identifier, sessions):
+        """
+        Deletes the sessions of a user, along with the user's index, removing
+        them from cache through a single delete_many call to the cache handler.
+
+        :param identifier: a user's primary identifier
+        :param sessions: the user's sessions, as obtained by get_sessions_for
+        """
+        session_ids = [session.session_id for session in sessions]
+        try:
+            self.cache_handler.delete_many(domain='session',
+                                           identifiers=session_ids + [identifier])
+        except AttributeError:
+            msg = "Cannot uncache without a cache_handler."
+            raise SessionCacheException(msg)
+
+        for session in sessions:
+            # for write-through caching:
+            if self.write_behind_queue is not None:
+                self.write_behind_queue.submit(session.session_id,
+                                               self._do_delete, session)
+            else:
+                self._do_delete(session)
+
+    def _set_session_id_set(self, identifier, session_ids):
+        if session_ids:
+            self.cache_handler.set(domain='session',
+                                   identifier=identifier,
+                                   value=session_ids)
+        else:
+            self.cache_handler.delete(domain='session',
+                                      identifier=identifier)
+
     def _cache(self, session, session_id):
 
         try:
@@ -325,9 +831,10 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
             try:
                 identifiers = session.get_internal_attribute('identifiers_session_key')
                 primary_id = identifiers.primary_identifier
-                # delete the mapping between a user and session id:
-                self.cache_handler.delete(domain='session',
-                                          identifier=primary_id)
+                # remove the session from the user's index of sessions:
+                session_ids = self._get_session_id_set(primary_id)
+                session_ids.discard(sessionid)
+                self._set_session_id_set(primary_id, session_ids)
             except AttributeError:
                 msg = '_uncache: Could not obtain identifiers from session'
                 logger.warning(msg)
@@ -336,6 +843,31 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
             msg = "Cannot uncache without a cache_handler."
             raise SessionCacheException(msg)
 
+    async def _uncache_async(self, ch, session):
+        """
+        the coroutine counterpart of _uncache
+
+        :type ch: cache_abcs.AsyncCacheHandler
+        """
+        sessionid = session.session_id
+        await ch.delete(domain='session', identifier=sessionid)
+
+        try:
+            identifiers = session.get_internal_attribute('identifiers_session_key')
+            primary_id = identifiers.primary_identifier
+        except AttributeError:
+            msg = '_uncache: Could not obtain identifiers from session'
+            logger.warning(msg)
+            return
+
+        session_ids = await self._get_session_id_set_async(ch, primary_id)
+        session_ids.discard(sessionid)
+        if session_ids:
+            await ch.set(domain='session', identifier=primary_id,
+                         value=session_ids)
+        else:
+            await ch.delete(domain='session', identifier=primary_id)
+
     def _do_create(self, session):
         sessionid = self.generate_session_id(session)
         self.assign_session_id(session, sessionid)
@@ -345,6 +877,10 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
     def _do_read(self, session_id):
         pass
 
+    # intended for write-through caching, by stores whose reads perform I/O:
+    async def _do_read_async(self, session_id):
+        return self._do_read(session_id)
+
     # intended for write-through caching:
     def _do_delete(self, session):
         pass
@@ -353,6 +889,13 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
     def _do_update(self, session):
         pass
 
+    # intended for write-through caching, by stores with partial_updates:
+    def _do_update_changes(self, session, changes):
+        """
+        :param changes: the result of session.serialize_changes()
+        """
+        self._do_update(session)
+
 
 # Yosai omits the SessionListenerAdapter class
 
@@ -443,10 +986,170 @@ class ProxiedSession(session_abcs.Session):
         return "ProxiedSession(session_id={0}, attributes={1})".format(
             self.session_id, self.attribute_keys)
 
+class LazySession(ProxiedSession):
+    """
+    LazySession is new to Yosai.  It stands in for a session that hasn't yet
+    been started, so that a subject that never stores anything in its session
+    costs no session id, session store write or SESSION.START event.  Reading
+    from a LazySession that hasn't started finds it empty.  The session is
+    started, by calling start_session, upon the first write to it, to which
+    every later call is then delegated.
+    """
+
+    def __init__(self, start_session, host=None):
+        """
+        :param start_session: a callable that starts and returns the session
+        """
+        super().__init__(None)
+        self._start_session = start_session
+        self._host = host
+
+    @property
+    def is_started(self):
+        return self._delegate is not None
+
+    def _start(self):
+        if self._delegate is None:
+            self._delegate = self._start_session()
+        return self._delegate
+
+    @property
+    def session_id(self):
+        if self._delegate is None:
+            return None
+        return self._delegate.session_id
+
+    @property
+    def start_timestamp(self):
+        if self._delegate is None:
+            return None
+        return self._delegate.start_timestamp
+
+    @property
+    def last_access_time(self):
+        if self._delegate is None:
+            return None
+        return self._delegate.last_access_time
+
+    @property
+    def idle_timeout(self):
+        if self._delegate is None:
+            return session_settings.idle_timeout
+        return self._delegate.idle_timeout
+
+    @idle_timeout.setter
+    def idle_timeout(self, max_idle_time):
+        self._start().idle_timeout = max_idle_time
+
+    @property
+    def absolute_timeout(self):
+        if self._delegate is None:
+            return session_settings.absolute_timeout
+        return self._delegate.absolute_timeout
+
+    @absolute_timeout.setter
+    def absolute_timeout(self, abs_time):
+        self._start().absolute_timeout = abs_time
+
+    @property
+    def host(self):
+        if self._delegate is None:
+            return self._host
+        return self._delegate.host
+
+    def touch(self):
+        if self._delegate is not None:
+            self._delegate.touch()
+
+    def stop(self, identifiers):
+        if self._delegate is not None:
+            self._delegate.stop(identifiers)
+
+    @property
+    def attribute_keys(self):
+        if self._delegate is None:
+            return set()
+        return self._delegate.attribute_keys
+
+    @property
+    def internal_attribute_keys(self):
+        if self._delegate is None:
+            return set()
+        return self._delegate.internal_attribute_keys
+
+    def get_internal_attribute(self, key):
+        if self._delegate is None:
+            return None
+        return self._delegate.get_internal_attribute(key)
+
+    def set_internal_attribute(self, key, value):
+        self._start().set_internal_attribute(key, value)
+
+    def remove_internal_attribute(self, key):
+        if self._delegate is not None:
+            self._delegate.remove_internal_attribute(key)
+
+    def get_attribute(self, key):
+        if self._delegate is None:
+            return None
+        return self._delegate.get_attribute(key)
+
+    def set_attribute(self, key, value):
+        self._start().set_attribute(key, value)
+
+    def remove_attribute(self, key):
+        if self._delegate is not None:
+            self._delegate.remove_attribute(key)
+
+    def __repr__(self):
+        return "LazySession(session_id={0}, is_started={1})".format(
+            self.session_id, self.is_started)
+
 # removed ImmutableProxiedSession because it can't be sent over the eventbus
 
+def to_epoch(timestamp):
+    """
+    :type timestamp: datetime, or epoch seconds, or None
+    :returns: the timestamp in epoch seconds, or None
+    """
+    if isinstance(timestamp, datetime.datetime):
+        if timestamp.tzinfo is None:  # naive datetimes are utc in yosai
+            timestamp = timestamp.replace(tzinfo=pytz.utc)
+        return timestamp.timestamp()
+    return timestamp
+
+
+def to_datetime(timestamp):
+    """
+    :type timestamp: epoch seconds, or None
+    :returns: the timestamp as a utc datetime, or None
+    """
+    if timestamp is None or isinstance(timestamp, datetime.datetime):
+        return timestamp
+    return datetime.datetime.fromtimestamp(timestamp, pytz.utc)
+
+
 class SimpleSession(session_abcs.ValidatingSession,
                     serialize_abcs.Serializable):
+    """
+    A session's start, stop and last access times are kept as epoch seconds,
+    obtained from time.time(), because a session is touched and validated on
+    every request.  The properties of the same names present them as utc
+    datetimes, and their setters accept either representation.
+
+    Sessions are held in memory by the hundreds of thousands, so their state
+    is kept in __slots__ rather than in a __dict__ per instance.
+
+    A session records which of its fields, and which of its attributes, have
+    changed since it was created or loaded.  serialize_changes serializes just
+    those, so that a session store supporting partial updates rewrites only
+    what a request changed rather than every attribute of the session.
+    """
+
+    __slots__ = ('_attributes', '_internal_attributes', '_is_expired',
+                 '_session_id', '_stop_timestamp', '_start_timestamp',
+                 '_last_access_time', '_absolute_timeout', '_idle_timeout',
+                 '_host', '_changes')
 
     # Yosai omits:
     #    - the manually-managed class version control process (too policy-reliant)
@@ -459,7 +1162,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         self._session_id = None
 
         self._stop_timestamp = None
-        self._start_timestamp = datetime.datetime.now(pytz.utc)
+        self._start_timestamp = time.time()
 
         self._last_access_time = self._start_timestamp
 
@@ -469,6 +1172,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         self._idle_timeout = session_settings.idle_timeout  # timedelta
 
         self._host = host
+        self._changes = set()
 
     # the properties are required to enforce the Session abc-interface..
     @property
@@ -481,8 +1185,9 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type abs_timeout: timedelta
         """
         self._absolute_timeout = abs_timeout
+        self._mark_changed('_absolute_timeout')
 
-    @memoized_property
+    @property
     def attributes(self):
         if not hasattr(self, '_attributes'):
             self._attributes = {}
@@ -494,7 +1199,7 @@ class SimpleSession(session_abcs.ValidatingSession,
             return None
         return set(self.attributes)  # a set of keys
 
-    @memoized_property
+    @property
     def internal_attributes(self):
         if not hasattr(self, '_internal_attributes'):
             self._internal_attributes = {}
@@ -516,6 +1221,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type host:  string
         """
         self._host = host
+        self._mark_changed('_host')
 
     @property
     def idle_timeout(self):
@@ -527,6 +1233,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type idle_timeout: timedelta
         """
         self._idle_timeout = idle_timeout
+        self._mark_changed('_idle_timeout')
 
     @property
     def is_expired(self):
@@ -535,22 +1242,24 @@ class SimpleSession(session_abcs.ValidatingSession,
     @is_expired.setter
     def is_expired(self, expired):
         self._is_expired = expired
+        self._mark_changed('_is_expired')
 
     @property
     def is_stopped(self):
-        return bool(self.stop_timestamp)
+        return bool(getattr(self, '_stop_timestamp', None))
 
     @property
     def last_access_time(self):
-        return self._last_access_time
+        return to_datetime(self._last_access_time)
 
     @last_access_time.setter
     def last_access_time(self, last_access_time):
         """
         :param  last_access_time: time that the Session was last used, in utc
-        :type last_access_time: datetime
+        :type last_access_time: datetime or epoch seconds
         """
-        self._last_access_time = last_access_time
+        self._last_access_time = to_epoch(last_access_time)
+        self._mark_changed('_last_access_time')
 
     # DG:  renamed id to session_id because of reserved word conflict
     @property
@@ -563,48 +1272,73 @@ class SimpleSession(session_abcs.ValidatingSession,
 
     @property
     def start_timestamp(self):
-        return self._start_timestamp
+        return to_datetime(self._start_timestamp)
 
     @start_timestamp.setter
     def start_timestamp(self, start_ts):
         """
         :param  start_ts: the time that the Session is started, in utc
-        :type start_ts: datetime
+        :type start_ts: datetime or epoch seconds
         """
-        self._start_timestamp = start_ts
+        self._start_timestamp = to_epoch(start_ts)
+        self._mark_changed('_start_timestamp')
 
     @property
     def stop_timestamp(self):
         if not hasattr(self, '_stop_timestamp'):
             self._stop_timestamp = None
-        return self._stop_timestamp
+        return to_datetime(self._stop_timestamp)
 
     @stop_timestamp.setter
     def stop_timestamp(self, stop_ts):
         """
         :param  stop_ts: the time that the Session is stopped, in utc
-        :type stop_ts: datetime
+        :type stop_ts: datetime or epoch seconds
         """
-        self._stop_timestamp = stop_ts
+        self._stop_timestamp = to_epoch(stop_ts)
+        self._mark_changed('_stop_timestamp')
+
+    def _get_absolute_deadline(self):
+        if self._absolute_timeout:
+            return (self._start_timestamp +
+                    self._absolute_timeout.total_seconds())
+        return None
+
+    def _get_idle_deadline(self):
+        if self._idle_timeout:
+            return (self._last_access_time +
+                    self._idle_timeout.total_seconds())
+        return None
 
     @property
     def absolute_expiration(self):
-        if self.absolute_timeout:
-            return self.start_timestamp + self.absolute_timeout
-        return None
+        return to_datetime(self._get_absolute_deadline())
 
     @property
     def idle_expiration(self):
-        if self.idle_timeout:
-            return self.last_access_time + self.idle_timeout
+        return to_datetime(self._get_idle_deadline())
+
+    @property
+    def expiration_time(self):
+        """
+        :returns: the epoch time at which the session times out, or None when
+                  the session has no timeouts
+        """
+        deadlines = [deadline for deadline in (self._get_absolute_deadline(),
+                                               self._get_idle_deadline())
+                     if deadline is not None]
+        if deadlines:
+            return min(deadlines)
         return None
 
     def touch(self):
-        self.last_access_time = datetime.datetime.now(pytz.utc)
+        self._last_access_time = time.time()
+        self._mark_changed('_last_access_time')
 
     def stop(self):
-        if (not self.stop_timestamp):
-            self.stop_timestamp = datetime.datetime.now(pytz.utc)
+        if (not self.is_stopped):
+            self._stop_timestamp = time.time()
+            self._mark_changed('_stop_timestamp')
 
     def expire(self):
         self.stop()
@@ -622,8 +1356,8 @@ class SimpleSession(session_abcs.ValidatingSession,
         if (self.is_expired):
             return True
 
-        if (self.absolute_timeout or self.idle_timeout):
-            if (not self.last_access_time):
+        if (self._absolute_timeout or self._idle_timeout):
+            if (not self._last_access_time):
                 msg = ("session.last_access_time for session with id [" +
                        str(self.session_id) + "] is null. This value must be"
                        "set at least once, preferably at least upon "
@@ -640,16 +1374,16 @@ class SimpleSession(session_abcs.ValidatingSession,
              be inactive before expiring.  If the session was last accessed
              before this time, it is expired.
             """
-            current_time = datetime.datetime.now(pytz.utc)
+            current_time = time.time()
 
             # Check 1:  Absolute Timeout
-            if self.absolute_expiration:
-                if (current_time > self.absolute_expiration):
+            if self._absolute_timeout:
+                if (current_time > self._get_absolute_deadline()):
                     return True
 
             # Check 2:  Inactivity Timeout
-            if self.idle_expiration:
-                if (current_time > self.idle_expiration):
+            if self._idle_timeout:
+                if (current_time > self._get_idle_deadline()):
                     return True
 
         else:
@@ -711,11 +1445,13 @@ class SimpleSession(session_abcs.ValidatingSession,
             self.remove_internal_attribute(key)
         else:
             self.internal_attributes[key] = value
+            self._mark_changed(('_internal_attributes', key))
 
     def remove_internal_attribute(self, key):
         if (not self.internal_attributes):
             return None
         else:
+            self._mark_changed(('_internal_attributes', key))
             return self.internal_attributes.pop(key, None)
 
     def get_attribute(self, key):
@@ -729,13 +1465,86 @@ class SimpleSession(session_abcs.ValidatingSession,
             self.remove_attribute(key)
         else:
             self.attributes[key] = value
+            self._mark_changed(('_attributes', key))
 
     def remove_attribute(self, key):
         if (not self.attributes):
             return None
         else:
+            self._mark_changed(('_attributes', key))
             return self.attributes.pop(key, None)
 
+    # -------------------------------------------------------------------------
+    # Change Tracking
+    # -------------------------------------------------------------------------
+
+    def _mark_changed(self, field):
+        try:
+            self._changes.add(field)
+        except AttributeError:  # deserialized, and unchanged until now
+            self._changes = {field}
+
+    @property
+    def changed_fields(self):
+        """
+        the names of the fields changed since the session was created or
+        loaded, where a changed attribute is named by a tuple of
+        '_attributes' or '_internal_attributes' and its key
+        """
+        return frozenset(getattr(self, '_changes', ()))
+
+    def clear_changes(self):
+        self._changes = set()
+
+    def serialize_changes(self):
+        """
+        :returns: a dict of the serialized values of the changed fields, in
+                  which changed attributes are nested under '_attributes' and
+                  '_internal_attributes' and a removed attribute's value is
+                  None.  Attributes that the serialization schema omits are
+                  omitted here too.
+        """
+        changes = getattr(self, '_changes', None)
+        if not changes:
+            return {}
+
+        schema = SimpleSession._changes_schema
+        if schema is None:
+            schema = self.serialization_schema()()
+            SimpleSession._changes_schema = schema
+
+        serialized = {}
+        changed_attributes = collections.defaultdict(set)
+        for field in changes:
+            if isinstance(field, tuple):
+                changed_attributes[field[0]].add(field[1])
+            else:
+                serialized[field] = schema.fields[field].serialize(field, self)
+
+        for field, keys in changed_attributes.items():
+            nested = schema.fields[field].schema
+            keys = [key for key in keys if key in nested.fields]
+            attributes = getattr(self, field)
+            values = nested.dump({key: attributes[key] for key in keys
+                                  if key in attributes}).data
+            serialized[field] = {key: values.get(key) for key in keys}
+        return serialized
+
+    @staticmethod
+    def merge_changes(older, newer):
+        """
+        combines two successive results of serialize_changes
+        """
+        merged = dict(older)
+        for field, value in newer.items():
+            if field in ('_attributes', '_internal_attributes'):
+                attributes = dict(merged.get(field, {}))
+                attributes.update(value)
+                merged[field] = attributes
+            else:
+                merged[field] = value
+        return merged
+
 
     # deleted on_equals as it is unecessary in python
     # deleted hashcode method as python's __hash__ may be fine -- TBD!
@@ -768,9 +1577,12 @@ class SimpleSession(session_abcs.ValidatingSession,
     class AttributesSchema(Schema):
         pass
 
+    _changes_schema = None  # a cached instance of the serialization schema
+
     @classmethod
     def set_attributes_schema(cls, schema):
         cls.AttributesSchema = schema
+        SimpleSession._changes_schema = None
 
     @classmethod
     def serialization_schema(cls):
@@ -809,9 +1621,9 @@ class SimpleSession(session_abcs.ValidatingSession,
 
         class SerializationSchema(Schema):
             _session_id = fields.Str(allow_none=True)
-            _start_timestamp = fields.DateTime(allow_none=True)  # iso is default
-            _stop_timestamp = fields.DateTime(allow_none=True)  # iso is default
-            _last_access_time = fields.DateTime(allow_none=True)  # iso is default
+            _start_timestamp = fields.Float(allow_none=True)  # epoch seconds
+            _stop_timestamp = fields.Float(allow_none=True)  # epoch seconds
+            _last_access_time = fields.Float(allow_none=True)  # epoch seconds
             _idle_timeout = fields.TimeDelta(allow_none=True)
             _absolute_timeout = fields.TimeDelta(allow_none=True)
             _is_expired = fields.Boolean(allow_none=True)
@@ -830,7 +1642,7 @@ class SimpleSession(session_abcs.ValidatingSession,
             def make_simple_session(self, data):
                 mycls = SimpleSession
                 instance = mycls.__new__(mycls)
-                instance.__dict__.update(data)
+                instance.__setstate__(data)
 
                 return instance
 
@@ -868,6 +1680,7 @@ class DelegatingSession(session_abcs.Session):
         self.session_manager = session_manager
         self._start_timestamp = None
         self._host = None
+        self._host_resolved = False  # a session may have no host
 
     @property
     def session_id(self):
@@ -902,8 +1715,9 @@ class DelegatingSession(session_abcs.Session):
 
     @property
     def host(self):
-        if (not self._host):
+        if (not self._host and not self._host_resolved):
             self._host = self.session_manager.get_host(self.session_key)
+            self._host_resolved = True
 
         return self._host
 
@@ -960,6 +1774,8 @@ class DelegatingSession(session_abcs.Session):
 class DefaultSessionKey(session_abcs.SessionKey,
                         serialize_abcs.Serializable):
 
+    __slots__ = ('_session_id',)
+
     def __init__(self, session_id):
         self._session_id = session_id
 
@@ -989,7 +1805,54 @@ class DefaultSessionKey(session_abcs.SessionKey,
             def make_default_session_key(self, data):
                 mycls = DefaultSessionKey
                 instance = mycls.__new__(mycls)
-                instance.__dict__.update(data)
+                instance.__setstate__(data)
+                return instance
+
+        return SerializationSchema
+
+
+class SessionIdSet(serialize_abcs.Serializable):
+    """
+    SessionIdSet is new to Yosai.  It is the set of the ids of a user's
+    sessions, which a CachingSessionStore keeps in cache under the user's
+    primary identifier so that every session of a user may be found without
+    scanning.
+    """
+
+    __slots__ = ('session_ids',)
+
+    def __init__(self, session_ids=()):
+        self.session_ids = set(session_ids)
+
+    def add(self, session_id):
+        self.session_ids.add(session_id)
+
+    def discard(self, session_id):
+        self.session_ids.discard(session_id)
+
+    def __contains__(self, session_id):
+        return session_id in self.session_ids
+
+    def __iter__(self):
+        return iter(self.session_ids)
+
+    def __len__(self):
+        return len(self.session_ids)
+
+    def __repr__(self):
+        return "SessionIdSet(session_ids={0})".format(self.session_ids)
+
+    @classmethod
+    def serialization_schema(cls):
+        class SerializationSchema(Schema):
+            session_ids = fields.List(fields.Str())
+
+            @post_load
+            def make_session_id_set(self, data):
+                mycls = SessionIdSet
+                instance = mycls.__new__(mycls)
+                instance.__setstate__(
+                    {'session_ids': set(data.get('session_ids', ()))})
                 return instance
 
         return SerializationSchema
@@ -1061,6 +1924,7 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
         self._session_store = sessionstore
         if self.cache_handler:
             self.apply_cache_handler_to_session_store()
+        self.apply_event_bus_to_session_store()
 
     @property
     def cache_handler(self):
@@ -1090,6 +1954,11 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
     def event_bus(self, eventbus):
         # pass-through
         self.session_event_handler.event_bus = eventbus
+        self.apply_event_bus_to_session_store()
+
+    def apply_event_bus_to_session_store(self):
+        if isinstance(self.session_store, event_abcs.EventBusAware):
+            self.session_store.event_bus = self.event_bus
 
     # -------------------------------------------------------------------------
     # Session Creation Methods
@@ -1139,6 +2008,26 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
 
         return session
 
+    async def _retrieve_session_async(self, session_key):
+        """
+        the coroutine counterpart of _retrieve_session
+        """
+        session_id = self.get_session_id(session_key)
+        if (session_id is None):
+            msg = ("Unable to resolve session ID from SessionKey [{0}]."
+                   "Returning null to indicate a session could not be "
+                   "found.".format(session_key))
+            logger.debug(msg)
+            return None
+
+        session = await self.session_store.read_async(session_id)
+
+        if (session is None):
+            msg2 = "Could not find session with ID [{0}]".format(session_id)
+            raise UnknownSessionException(msg2)
+
+        return session
+
     def do_get_session(self, session_key):
         """
         :type session_key: DefaultSessionKey
@@ -1162,6 +2051,25 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
 
         return session
 
+    async def do_get_session_async(self, session_key):
+        """
+        The coroutine counterpart of do_get_session, which reads and updates
+        the session through the session store's read_async and update_async.
+        Invalid sessions are handled as by do_get_session.
+
+        :returns: SimpleSession
+        """
+        session = await self._retrieve_session_async(session_key)
+
+        if (session is not None):
+            self.validate(session, session_key)
+
+            if self.auto_touch:  # new to yosai
+                session.touch()
+                await self.on_change_async(session)
+
+        return session
+
     # -------------------------------------------------------------------------
     # Validation Methods
     # -------------------------------------------------------------------------
@@ -1281,6 +2189,77 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
             session.touch()
         self.session_store.update(session)
 
+    async def on_change_async(self, session):
+        if self.auto_touch and not session.is_stopped:  # new to yosai
+            session.touch()
+        await self.session_store.update_async(session)
+
+
+class ExecutorServiceSessionValidationScheduler(
+        session_abcs.SessionValidationScheduler):
+    """
+    Periodically asks a session manager to validate its sessions, using a
+    StoppableScheduledExecutor.
+
+    Note:  Many data stores support TTL (time to live) as a feature.  It
+           is unecessary to run a session-validation/Executor service if
+           you can use the TTL timeout feature.
+
+           Unlike the other threads in Yosai, the executor runs as a daemon
+           thread so that a scheduler that is never disabled doesn't prevent
+           the interpreter from exiting.  An abruptly terminated sweep leaves
+           its remaining sessions to be swept lazily or by the next process.
+    """
+
+    def __init__(self, session_manager, interval):
+        """
+        :param session_manager: an object with a validate_sessions method
+        :param interval:  a time interval, in seconds
+        """
+        self.session_manager = session_manager
+        self.interval = interval  # in seconds
+        self._enabled = False
+        self.service = None
+
+    @property
+    def is_enabled(self):
+        return self._enabled
+
+    # StoppableScheduledExecutor validates sessions at fixed intervals
+    def enable_session_validation(self):
+        if self.interval and not self._enabled:
+            self.service = StoppableScheduledExecutor(self.run,
+                                                      interval=self.interval)
+            self.service.daemon = True
+            self.service.start()
+            self._enabled = True
+
+    def run(self):
+        logger.debug("Executing session validation...")
+
+        start_time = time.time()
+        try:
+            count = self.session_manager.validate_sessions()
+        except Exception:
+            # keeps the executor alive for the next interval
+            logger.exception("Session validation failed.")
+            return
+
+        msg = ("Session validation completed successfully in {0:.1f} "
+               "milliseconds, expiring {1} sessions.".
+               format((time.time() - start_time) * 1000, count))
+        logger.debug(msg)
+
+    def disable_session_validation(self):
+        if self.service:
+            self.service.stop()
+            self.service = None
+        self._enabled = False
+
+    def __repr__(self):
+        return ("ExecutorServiceSessionValidationScheduler(interval={0}, "
+                "enabled={1})".format(self.interval, self._enabled))
+
 
 class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
                                   session_abcs.NativeSessionManager,
@@ -1309,8 +2288,19 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
      yet clear why Shiro doesn't.  Until the reason why is revealed, Yosai
      includes a new auto_touch feature to enable/disable auto-touching.
 
+    Session Validation
+    ------------------
+    When session_settings enable the validation scheduler, a session
+    validation scheduler is started with the first session.  At each interval
+    it expires, in batches, the sessions that a session store reports as
+    expired, publishing a SESSION.EXPIRE event for each.  Only session stores
+    with a get_expired_sessions method, such as the MemorySessionStore, are
+    swept.  Cached sessions expire by their cache entry's TTL instead.
     """
 
+    # the number of sessions that are expired per call to the session store:
+    validation_batch_size = 1000
+
     def __init__(self):
         self.session_factory = SimpleSessionFactory()
         self._session_event_handler = SessionEventHandler()
@@ -1319,6 +2309,15 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
                                         auto_touch=True)
         self._event_bus = None
 
+        self.session_validation_scheduler = None  # created upon first use
+        self.session_validation_scheduler_enabled =\
+            session_settings.validation_scheduler_enable
+        self.session_validation_interval =\
+            session_settings.validation_time_interval.total_seconds()
+
+        # whether subjects defer starting a session until it is first written:
+        self.lazy_session_creation = session_settings.lazy_creation
+
     @property
     def session_event_handler(self):
         return self._session_event_handler
@@ -1357,6 +2356,8 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         start method of the SessionManager but rather defers timeout settings
         responsibilities to the SimpleSession, which uses session_settings
         """
+        self.enable_session_validation_if_necessary()
+
         # is a SimpleSesson:
         session = self._create_session(session_context)
 
@@ -1395,6 +2396,124 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
             # DG: this results in a redundant delete operation (from shiro).
             self.session_handler.after_stopped(session)
 
+    def get_sessions_for(self, identifier):
+        """
+        New to Yosai.  Finds a user's sessions through the session store's
+        index of them, which only a CachingSessionStore keeps.
+
+        :param identifier: a user's primary identifier
+        :returns: a list of DelegatingSessions
+        """
+        sessions = self.session_handler.session_store.get_sessions_for(identifier)
+        return [self.create_exposed_session(session,
+                                            key=DefaultSessionKey(session.session_id))
+                for session in sessions]
+
+    def stop_all_sessions(self, identifier):
+        """
+        New to Yosai.  Stops every session of a user, such as once the user's
+        password changes, deleting them from cache all at once and publishing
+        a SESSION.STOP event for each.
+
+        :param identifier: a user's primary identifier
+        :returns: the number of sessions stopped
+        """
+        session_store = self.session_handler.session_store
+        sessions = session_store.get_sessions_for(identifier)
+        for session in sessions:
+            session.stop()
+        session_store.delete_sessions_for(identifier, sessions)
+
+        session_tuple = collections.namedtuple(
+            'session_tuple', ['identifiers', 'session_key'])
+        for session in sessions:
+            idents = session.get_internal_attribute('identifiers_session_key')
+            mysession = session_tuple(idents,
+                                      DefaultSessionKey(session.session_id))
+            self.session_event_handler.notify_stop(mysession)
+
+        msg = "Stopped {0} sessions of [{1}]".format(len(sessions), identifier)
+        logger.debug(msg)
+        return len(sessions)
+
+    # -------------------------------------------------------------------------
+    # Session Validation Methods
+    # -------------------------------------------------------------------------
+
+    def create_session_validation_scheduler(self):
+        scheduler = ExecutorServiceSessionValidationScheduler(
+            session_manager=self, interval=self.session_validation_interval)
+
+        msg = ("Created default SessionValidationScheduler instance of "
+               "type [{0}].".format(scheduler.__class__.__name__))
+        logger.debug(msg)
+        return scheduler
+
+    def enable_session_validation_if_necessary(self):
+        scheduler = self.session_validation_scheduler
+        if (self.session_validation_scheduler_enabled and
+           (scheduler is None or (not scheduler.is_enabled))):
+            self.enable_session_validation()
+
+    def enable_session_validation(self):
+        if self.session_validation_scheduler is None:
+            self.session_validation_scheduler =\
+                self.create_session_validation_scheduler()
+
+        logger.debug("Enabling session validation scheduler...")
+        self.session_validation_scheduler.enable_session_validation()
+
+    def disable_session_validation(self):
+        scheduler = self.session_validation_scheduler
+        if scheduler is not None:
+            scheduler.disable_session_validation()
+            logger.debug("Disabled session validation scheduler.")
+            self.session_validation_scheduler = None
+
+    def validate_sessions(self):
+        """
+        Expires the sessions that the session store reports as expired, in
+        batches of validation_batch_size.
+
+        :returns: the number of sessions expired
+        """
+        try:
+            get_expired_sessions =\
+                self.session_handler.session_store.get_expired_sessions
+        except AttributeError:
+            msg = ("The session store doesn't support get_expired_sessions. "
+                   "Skipping session validation.")
+            logger.debug(msg)
+            return 0
+
+        invalid_count = 0
+        validated = set()
+        while True:
+            sessions = get_expired_sessions(limit=self.validation_batch_size)
+            # a store may report a session again if it wasn't deleted:
+            sessions = [session for session in sessions
+                        if session.session_id not in validated]
+            if not sessions:
+                break
+
+            for session in sessions:
+                validated.add(session.session_id)
+                session_key = DefaultSessionKey(session.session_id)
+                try:
+                    self.session_handler.validate(session, session_key)
+                except InvalidSessionException:
+                    invalid_count += 1
+                except SessionEventException:
+                    # the session was expired and deleted regardless
+                    logger.warning("Could not publish SESSION.EXPIRE event")
+                    invalid_count += 1
+
+        if invalid_count:
+            msg = "Expired {0} sessions.".format(invalid_count)
+            logger.debug(msg)
+
+        return invalid_count
+
     # -------------------------------------------------------------------------
     # Session Creation Methods
     # -------------------------------------------------------------------------
@@ -1441,6 +2560,43 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         else:
             return None
 
+    async def get_session_async(self, key):
+        """
+        the coroutine counterpart of get_session
+
+        :returns: DelegatingSession
+        """
+        session = await self.session_handler.do_get_session_async(key)
+        if (session):
+            return self.create_exposed_session(session, key)
+        else:
+            return None
+
+    def get_session_state(self, key):
+        """
+        Looks up a session as get_session does, also reading the identifiers,
+        authentication state and host of its subject from the same lookup, so
+        that a Subject may be created for the session without further session
+        reads.
+
+        :returns: a session_state_tuple, whose session is a DelegatingSession,
+                  or None when no session is found
+        """
+        session = self.session_handler.do_get_session(key)
+        if (not session):
+            return None
+
+        exposed = self.create_exposed_session(session, key)
+        # spares the exposed session a lookup of its host:
+        exposed._host = session.host
+        exposed._host_resolved = True
+
+        get = session.get_internal_attribute
+        return session_state_tuple(exposed,
+                                   get('identifiers_session_key'),
+                                   bool(get('authenticated_session_key')),
+                                   session.host)
+
     # called internally:
     def _lookup_required_session(self, key):
         """
@@ -1453,6 +2609,17 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
             raise UnknownSessionException(msg)
         return session
 
+    async def _lookup_required_session_async(self, key):
+        """
+        :returns: SimpleSession
+        """
+        session = await self.session_handler.do_get_session_async(key)
+        if (not session):
+            msg = ("Unable to locate required Session instance based "
+                   "on session_key [" + str(key) + "].")
+            raise UnknownSessionException(msg)
+        return session
+
     # -------------------------------------------------------------------------
     # Session Attribute Methods
     # -------------------------------------------------------------------------
@@ -1498,6 +2665,11 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         session.touch()
         self.session_handler.on_change(session)
 
+    async def touch_async(self, session_key):
+        session = await self._lookup_required_session_async(session_key)
+        session.touch()
+        await self.session_handler.on_change_async(session)
+
     def get_host(self, session_key):
         return self._lookup_required_session(session_key).host
 
@@ -1539,6 +2711,10 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         return self._lookup_required_session(session_key).\
             get_attribute(attribute_key)
 
+    async def get_attribute_async(self, session_key, attribute_key):
+        session = await self._lookup_required_session_async(session_key)
+        return session.get_attribute(attribute_key)
+
     def set_attribute(self, session_key, attribute_key, value=None):
         if (value is None):
             self.remove_attribute(session_key, attribute_key)
@@ -1547,6 +2723,15 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
             session.set_attribute(attribute_key, value)
             self.session_handler.on_change(session)
 
+    async def set_attribute_async(self, session_key, attribute_key,
+                                  value=None):
+        if (value is None):
+            await self.remove_attribute_async(session_key, attribute_key)
+        else:
+            session = await self._lookup_required_session_async(session_key)
+            session.set_attribute(attribute_key, value)
+            await self.session_handler.on_change_async(session)
+
     def remove_attribute(self, session_key, attribute_key):
         session = self._lookup_required_session(session_key)
         removed = session.remove_attribute(attribute_key)
@@ -1554,6 +2739,13 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
             self.session_handler.on_change(session)
         return removed
 
+    async def remove_attribute_async(self, session_key, attribute_key):
+        session = await self._lookup_required_session_async(session_key)
+        removed = session.remove_attribute(attribute_key)
+        if (removed is not None):
+            await self.session_handler.on_change_async(session)
+        return removed
+
 
 class DefaultSessionContext(MapContext, session_abcs.SessionContext):
     """
@@ -31,15 +31,18 @@ class DefaultSessionSettings:
         interval = validation_config.get('time_interval', 3600)  # def:1hr
         self.validation_time_interval = datetime.timedelta(seconds=interval)
 
+        self.lazy_creation = session_config.get('lazy_creation', False)
+
     def __repr__(self):
         return ("SessionSettings(absolute_timeout={0}, idle_timeout={1}, "
                 "validation_scheduler_enable={2}, "
-                "validation_time_interval={3})".
+                "validation_time_interval={3}, lazy_creation={4})".
                 format(
                     self.absolute_timeout,
                     self.idle_timeout,
                     self.validation_scheduler_enable,
-                    self.validation_time_interval))
+                    self.validation_time_interval,
+                    self.lazy_creation))
 
 # initalize module-level settings:
 session_settings = DefaultSessionSettings()
@@ -1,55 +1,4 @@
-class ExecutorServiceSessionValidationScheduler(session_abcs.SessionValidationScheduler):
-    """
-    Note:  Many data stores support TTL (time to live) as a feature.  It
-           is unecessary to run a session-validation/Executor service if
-           you can use the TTL timeout feature.
-
-           yosai.core.vs shiro:
-           Shiro uses a daemon thread for scheduled validation, signaling
-           it when to shutdown.  Python terminates daemon threads much more
-           abruptly than Java, so Yosai will not use them.  Instead, Yosai uses
-           regular threads and an event notification process to gracefully terminate.
-           See:  https://docs.python.org/3/library/threading.html#thread-objects
-
-    """
-    def __init__(self, session_manager, interval):
-        """
-        :param sessionmanager: a ValidatingSessionManager
-        :param interval:  a time interval, in seconds
-        """
-        self.session_manager = session_manager
-        self.interval = interval  # in seconds
-        self._enabled = False
-        self.service = StoppableScheduledExecutor(self.run,
-                                                  interval=self.interval)
-
-    @property
-    def is_enabled(self):
-        return self._enabled
-
-    # StoppableScheduledExecutor validates sessions at fixed intervals
-    def enable_session_validation(self):
-        if (self.interval):
-            self.service.start()
-            self._enabled = True
-
-    def run(self):
-        msg = "Executing session validation..."
-        print(msg)
-        # log here
-
-        start_time = int(round(time.time() * 1000, 2))
-        self.session_manager.validate_sessions()
-        stop_time = int(round(time.time() * 1000, 2))
-
-        msg2 = ("Session validation completed successfully in " +
-                str(stop_time - start_time) + " milliseconds.")
-        print(msg2)
-        # log here
-
-    def disable_session_validation(self):
-        self.service.stop()
-        self.enabled = False
+# ExecutorServiceSessionValidationScheduler now lives in session.py
 
 
 # yosai.core.refactor:
@@ -0,0 +1,293 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+from yosai.core import (
+    CachingSessionStore,
+    SerializationManager,
+    SessionExpirationIndex,
+    SimpleSession,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteSessionStore(CachingSessionStore):
+    """
+    SQLiteSessionStore is new to Yosai.  It persists sessions to a local
+    SQLite database, through the write-through hooks of the CachingSessionStore,
+    so that sessions outlive their cache entries and may number beyond what
+    fits in memory.  A session missing from cache is read from the database and
+    cached anew.
+
+    The database uses write-ahead logging, so readers in other processes aren't
+    blocked by writes.  Each of a session's fields is stored in a column of its
+    own, alongside the epoch time at which the session expires, which is
+    indexed so that expired sessions are found, and purged in bulk, without a
+    full table scan.  Each attribute of a session is stored, serialized, in a
+    row of its own.
+
+    Partial Updates
+    ---------------
+    Updating a session writes only the fields and attributes that changed since
+    it was loaded, so touching a session that holds large attributes updates
+    its last access time and expiration alone.
+
+    Batched Commits
+    ---------------
+    Writes are grouped into transactions of up to commit_batch_size writes.  A
+    transaction is committed once it is full, or upon the first write made
+    commit_interval seconds after it began, or when flush or close is called.
+    Uncommitted writes are visible to this store but not to other processes,
+    and are lost should the process crash.  Set commit_batch_size to 1 to
+    commit every write.
+
+    SQL statements are constants, but for the few variants of partial updates,
+    so that sqlite3 prepares each only once per connection and reuses it from
+    its statement cache.
+    """
+
+    partial_updates = True
+
+    # the session's serialized fields that are stored in columns:
+    FIELDS = ('_start_timestamp', '_stop_timestamp', '_last_access_time',
+              '_idle_timeout', '_absolute_timeout', '_is_expired', '_host')
+    COLUMNS = tuple(field.lstrip('_') for field in FIELDS)
+
+    # the flag in the internal column of an attribute's row, by dict name:
+    ATTRIBUTES = {'_attributes': 0, '_internal_attributes': 1}
+
+    CREATE_TABLE = ("CREATE TABLE IF NOT EXISTS yosai_session ("
+                    "session_id TEXT PRIMARY KEY, "
+                    "expiration REAL, "
+                    "start_timestamp REAL, "
+                    "stop_timestamp REAL, "
+                    "last_access_time REAL, "
+                    "idle_timeout INTEGER, "
+                    "absolute_timeout INTEGER, "
+                    "is_expired INTEGER, "
+                    "host TEXT)")
+    CREATE_INDEX = ("CREATE INDEX IF NOT EXISTS yosai_session_expiration "
+                    "ON yosai_session (expiration)")
+    CREATE_ATTRIBUTE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS yosai_session_attribute ("
+        "session_id TEXT, "
+        "internal INTEGER, "
+        "name TEXT, "
+        "value BLOB NOT NULL, "
+        "PRIMARY KEY (session_id, internal, name)) WITHOUT ROWID")
+    UPSERT = ("INSERT OR REPLACE INTO yosai_session "
+              "(session_id, expiration, " + ", ".join(COLUMNS) + ") "
+              "VALUES (?, ?, " + ", ".join('?' for _ in COLUMNS) + ")")
+    UPDATE = "UPDATE yosai_session SET expiration = ?{0} WHERE session_id = ?"
+    SELECT = ("SELECT session_id, " + ", ".join(COLUMNS) + " "
+              "FROM yosai_session WHERE session_id = ?")
+    SELECT_EXPIRED = ("SELECT session_id, " + ", ".join(COLUMNS) + " "
+                      "FROM yosai_session WHERE expiration <= ? "
+                      "ORDER BY expiration LIMIT ?")
+    DELETE = "DELETE FROM yosai_session WHERE session_id = ?"
+    DELETE_EXPIRED = "DELETE FROM yosai_session WHERE expiration <= ?"
+    UPSERT_ATTRIBUTE = ("INSERT OR REPLACE INTO yosai_session_attribute "
+                        "(session_id, internal, name, value) "
+                        "VALUES (?, ?, ?, ?)")
+    SELECT_ATTRIBUTES = ("SELECT internal, name, value "
+                         "FROM yosai_session_attribute WHERE session_id = ?")
+    DELETE_ATTRIBUTE = ("DELETE FROM yosai_session_attribute "
+                        "WHERE session_id = ? AND internal = ? AND name = ?")
+    DELETE_ATTRIBUTES = ("DELETE FROM yosai_session_attribute "
+                         "WHERE session_id = ?")
+    DELETE_ORPHANED_ATTRIBUTES = (
+        "DELETE FROM yosai_session_attribute WHERE session_id NOT IN "
+        "(SELECT session_id FROM yosai_session)")
+
+    def __init__(self, path, serialization_manager=None, commit_batch_size=100,
+                 commit_interval=1.0):
+        """
+        :param path: the database file, or ':memory:'
+        :param serialization_manager: serializes attributes, defaulting to a
+                                      msgpack SerializationManager
+        :param commit_batch_size: the number of writes committed together
+        :param commit_interval: the number of seconds after which a partial
+                                batch is committed upon the next write
+        """
+        super().__init__()
+        self.path = path
+        self.serialization_manager = (serialization_manager or
+                                      SerializationManager())
+        self.commit_batch_size = commit_batch_size
+        self.commit_interval = commit_interval
+
+        self._pending_writes = 0
+        self._batch_started = None
+        self._lock = threading.RLock()
+
+        # transactions are managed explicitly, hence isolation_level=None:
+        self._connection = sqlite3.connect(path, isolation_level=None,
+                                           check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(self.CREATE_TABLE)
+            self._connection.execute(self.CREATE_INDEX)
+            self._connection.execute(self.CREATE_ATTRIBUTE_TABLE)
+
+    def _write(self, *statements):
+        """
+        executes, within a single batch, each of the statements given as
+        tuple(statement, parameters)
+
+        :returns: the number of rows modified by the first statement
+        """
+        with self._lock:
+            if self._batch_started is None:
+                self._connection.execute("BEGIN")
+                self._batch_started = time.time()
+
+            execute = self._connection.execute
+            rowcounts = [execute(statement, parameters).rowcount
+                         for statement, parameters in statements]
+            self._pending_writes += 1
+
+            if (self._pending_writes >= self.commit_batch_size or
+                    time.time() - self._batch_started >= self.commit_interval):
+                self.flush()
+        return rowcounts[0]
+
+    def flush(self):
+        """
+        commits any pending writes
+        """
+        with self._lock:
+            if self._batch_started is not None:
+                self._connection.execute("COMMIT")
+                self._batch_started = None
+                self._pending_writes = 0
+
+    def close(self):
+        self.disable_write_behind()
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+    def _write_attribute(self, session_id, attributes, name, value):
+        internal = self.ATTRIBUTES[attributes]
+        if value is None:
+            return (self.DELETE_ATTRIBUTE, (session_id, internal, name))
+        return (self.UPSERT_ATTRIBUTE,
+                (session_id, internal, name,
+                 self.serialization_manager.serializer.serialize(value)))
+
+    def _store(self, session):
+        data = session.serialize()
+        session_id = session.session_id
+        statements = [
+            (self.UPSERT,
+             (session_id, SessionExpirationIndex.get_deadline(session)) +
+             tuple(data.get(field) for field in self.FIELDS)),
+            (self.DELETE_ATTRIBUTES, (session_id,))]
+        for attributes in self.ATTRIBUTES:
+            for name, value in (data.get(attributes) or {}).items():
+                if value is not None:
+                    statements.append(self._write_attribute(
+                        session_id, attributes, name, value))
+        self._write(*statements)
+
+    def _load(self, row):
+        deserialize = self.serialization_manager.serializer.deserialize
+        data = dict(zip(self.FIELDS, row[1:]), _session_id=row[0])
+        data.update((attributes, {}) for attributes in self.ATTRIBUTES)
+        names = {flag: name for name, flag in self.ATTRIBUTES.items()}
+        with self._lock:
+            rows = self._connection.execute(self.SELECT_ATTRIBUTES,
+                                            (row[0],)).fetchall()
+        for internal, name, value in rows:
+            data[names[internal]][name] = deserialize(value)
+        return SimpleSession.deserialize(data)
+
+    def _do_create(self, session):
+        sessionid = super()._do_create(session)
+        self._store(session)
+        return sessionid
+
+    def _do_read(self, session_id):
+        with self._lock:
+            row = self._connection.execute(self.SELECT,
+                                           (session_id,)).fetchone()
+        if row is None:
+            return None
+        return self._load(row)
+
+    def _do_update(self, session):
+        self._store(session)
+
+    def _do_update_changes(self, session, changes):
+        session_id = session.session_id
+        fields = [field for field in self.FIELDS if field in changes]
+        statements = [
+            (self.UPDATE.format(''.join(', {0} = ?'.format(field.lstrip('_'))
+                                        for field in fields)),
+             [SessionExpirationIndex.get_deadline(session)] +
+             [changes[field] for field in fields] + [session_id])]
+        for attributes in self.ATTRIBUTES:
+            for name, value in changes.get(attributes, {}).items():
+                statements.append(self._write_attribute(
+                    session_id, attributes, name, value))
+        if not self._write(*statements):
+            self._store(session)  # not in the database, so written in full
+
+    def _do_delete(self, session):
+        self._write((self.DELETE, (session.session_id,)),
+                    (self.DELETE_ATTRIBUTES, (session.session_id,)))
+
+    def get_expired_sessions(self, limit=None):
+        """
+        :param limit: the maximum number of sessions to return
+        :returns: a list of the sessions whose deadlines have passed, soonest
+                  first, for a session validation scheduler to expire
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                self.SELECT_EXPIRED,
+                (time.time(), -1 if limit is None else limit)).fetchall()
+        return [self._load(row) for row in rows]
+
+    def purge_expired(self):
+        """
+        Deletes every expired session, and its attributes, without publishing
+        events for them.
+
+        :returns: the number of sessions deleted
+        """
+        with self._lock:
+            self.flush()
+            self._connection.execute("BEGIN")
+            cursor = self._connection.execute(self.DELETE_EXPIRED,
+                                              (time.time(),))
+            self._connection.execute(self.DELETE_ORPHANED_ATTRIBUTES)
+            self._connection.execute("COMMIT")
+        return cursor.rowcount
+
+    def __repr__(self):
+        return ("SQLiteSessionStore(path={0}, commit_batch_size={1}, "
+                "commit_interval={2})".format(self.path,
+                                              self.commit_batch_size,
+                                              self.commit_interval))
@@ -34,6 +34,8 @@ class IdentifierCollection(metaclass=ABCMeta):
     source_names property.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def primary_identifier(self):
@@ -118,6 +120,7 @@ class IdentifierCollection(metaclass=ABCMeta):
 
 
 class MutableIdentifierCollection(IdentifierCollection):
+    __slots__ = ()
 
     @abstractmethod
     def add(self, source_name, identifier):
@@ -50,6 +50,8 @@ class SimpleIdentifierCollection(subject_abcs.MutableIdentifierCollection,
     to a scalar value.
     """
 
+    __slots__ = ('source_identifiers', '_primary_identifier')
+
     # yosai.core.re-ordered the argument list:
     def __init__(self, source_name=None, identifier=None,
                  identifier_collection=None):
@@ -170,7 +172,7 @@ class SimpleIdentifierCollection(subject_abcs.MutableIdentifierCollection,
                 instance = mycls.__new__(mycls)
                 new_si = data['source_identifiers']
                 data['source_identifiers'] = collections.OrderedDict(new_si)
-                instance.__dict__.update(data)
+                instance.__setstate__(data)
                 return instance
 
         return SerializationSchema
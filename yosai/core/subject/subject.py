@@ -17,6 +17,7 @@ specific language governing permissions and limitations
 under the License.
 """
 import collections
+import functools
 import logging
 
 # Concurrency is TBD:  Shiro uses multithreading whereas Yosai...
@@ -33,12 +34,14 @@ from yosai.core import (
     InvalidArgumentException,
     IllegalStateException,
     InvalidArgumentException,
+    LazySession,
     ProxiedSession,
     SecurityManagerNotSetException,
     SessionException,
     UnauthenticatedException,
     UnavailableSecurityManagerException,
     # UnsupportedOperationException,
+    ContextLocal,
     global_security_manager,
     mgt_abcs,
     session_abcs,
@@ -173,10 +176,14 @@ class DefaultSubjectContext(MapContext, subject_abcs.SubjectContext):
 
         # otherwise, use the session key as the identifier:
         if not identifiers:
+            state = self.session_state
+            if state is not None:  # read along with the session
+                return state.identifiers
+
             session = self.resolve_session()
             try:
                 identifiers = session.get_internal_attribute(
-                    self.get_key('identifiers_session_key'))
+                    'identifiers_session_key')
             except AttributeError:
                 identifiers = None
         return identifiers
@@ -192,6 +199,19 @@ class DefaultSubjectContext(MapContext, subject_abcs.SubjectContext):
         """
         self.none_safe_put(self.get_key('SESSION'), session)
 
+    # new to yosai:
+    @property
+    def session_state(self):
+        return self.get(self.get_key('SESSION_STATE'))
+
+    @session_state.setter
+    def session_state(self, state):
+        """
+        :param state: the subject state read along with the session
+        :type state:  session_state_tuple
+        """
+        self.none_safe_put(self.get_key('SESSION_STATE'), state)
+
     def resolve_session(self):
         session = self.session
         if session is None:
@@ -245,7 +265,7 @@ class DefaultSubjectContext(MapContext, subject_abcs.SubjectContext):
             session = self.resolve_session()
             if (session is not None):
                 authc = session.get_internal_attribute(
-                    self.get_key('authenticated_session_key'))
+                    'authenticated_session_key')
 
         return bool(authc)
 
@@ -516,6 +536,20 @@ class DelegatingSubject(subject_abcs.Subject):
             msg = 'Cannot check permission when identifiers aren\'t set!'
             raise IdentifiersNotSetException(msg)
 
+    async def check_permission_async(self, permission_s, logical_operator=all):
+        """
+        the coroutine counterpart of check_permission
+
+        :raises UnauthorizedException: if any permission is unauthorized
+        """
+        self.assert_authz_check_possible()
+        if self.has_identifiers:
+            await self.security_manager.check_permission_async(
+                self.identifiers, permission_s, logical_operator)
+        else:
+            msg = 'Cannot check permission when identifiers aren\'t set!'
+            raise IdentifiersNotSetException(msg)
+
     def has_role(self, roleid_s):
         """
         :param roleid_s: 1..N role identifiers (strings)
@@ -571,6 +605,20 @@ class DelegatingSubject(subject_abcs.Subject):
             msg = 'Cannot check roles when identifiers aren\'t set!'
             raise IdentifiersNotSetException(msg)
 
+    async def check_role_async(self, role_ids, logical_operator=all):
+        """
+        the coroutine counterpart of check_role
+
+        :raises UnauthorizedException: if Subject not assigned to all roles
+        """
+        if self.has_identifiers:
+            await self.security_manager.check_role_async(self.identifiers,
+                                                         role_ids,
+                                                         logical_operator)
+        else:
+            msg = 'Cannot check roles when identifiers aren\'t set!'
+            raise IdentifiersNotSetException(msg)
+
     def login(self, authc_token):
         """
         :type authc_token: authc_abcs.AuthenticationToken
@@ -611,9 +659,9 @@ class DelegatingSubject(subject_abcs.Subject):
 
         session = subject.get_session(False)
         if session:
-            self._session = self.decorate(session)
+            self.session = self.decorate(session)
         else:
-            self._session = None
+            self.session = None
 
     @property
     def authenticated(self):
@@ -645,6 +693,9 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         if (isinstance(session, session_abcs.Session) or session is None):
             self._session = session
+            # the run-as stack is loaded anew from the new session, if needed:
+            self._run_as_identifiers_stack = None
+            self._run_as_stack_loaded = False
         else:
             raise InvalidArgumentException('must use Session object')
 
@@ -669,15 +720,32 @@ class DelegatingSubject(subject_abcs.Subject):
                        "Sessions to be created for the current Subject.")
                 raise DisabledSessionException(msg)
 
-            msg = ("Starting session for host ", str(self.host))
-            logger.debug(msg)
-
             session_context = self.create_session_context()
-            session = self.security_manager.start(session_context)
+            if self.lazy_session_creation:
+                msg = ("Deferring session for host ", str(self.host))
+                logger.debug(msg)
+
+                start = functools.partial(self.security_manager.start,
+                                          session_context)
+                session = LazySession(start, host=self.host)
+            else:
+                msg = ("Starting session for host ", str(self.host))
+                logger.debug(msg)
+
+                session = self.security_manager.start(session_context)
             self.session = self.decorate(session)
 
         return self.session
 
+    @property
+    def lazy_session_creation(self):
+        """
+        whether the session manager defers starting a session until it is
+        first written, which is new to Yosai
+        """
+        session_manager = getattr(self.security_manager, 'session_manager', None)
+        return getattr(session_manager, 'lazy_session_creation', False) is True
+
     def create_session_context(self):
         session_context = DefaultSessionContext()
         if (self.host):
@@ -698,7 +766,7 @@ class DelegatingSubject(subject_abcs.Subject):
             self.clear_run_as_identities_internal()
             self.security_manager.logout(self)
         finally:
-            self._session = None
+            self.session = None
             self._identifiers = None
             self._authenticated = False
 
@@ -708,7 +776,7 @@ class DelegatingSubject(subject_abcs.Subject):
             # log in again or acquire a new session.
 
     def session_stopped(self):
-        self._session = None
+        self.session = None
 
     # --------------------------------------------------------------------------
     # Concurrency is TBD:  Shiro uses multithreading whereas Yosai...
@@ -784,20 +852,32 @@ class DelegatingSubject(subject_abcs.Subject):
 
     def get_run_as_identifiers_stack(self):
         """
+        The stack is read from the session once per subject and then kept,
+        written through to the session by push_identity and pop_identity, so
+        that obtaining the subject's identifiers costs no further session
+        reads.  This is new to Yosai.
+
         :returns: an IdentifierCollection
         """
-        session = self.get_session(False)
-        try:
-            return session.get_internal_attribute(
-                self.run_as_identifiers_session_key)
-        except AttributeError:
-            return None
+        if not getattr(self, '_run_as_stack_loaded', False):
+            session = self.get_session(False)
+            try:
+                stack = session.get_internal_attribute(
+                    self.run_as_identifiers_session_key)
+            except AttributeError:
+                stack = None
+            self._run_as_identifiers_stack = stack
+            # a subject without a session has no stack to load until it has:
+            self._run_as_stack_loaded = session is not None
+            return stack
+        return self._run_as_identifiers_stack
 
     def clear_run_as_identities(self):
         session = self.get_session(False)
         if (session is not None):
             session.remove_internal_attribute(
                 self.run_as_identifiers_session_key)
+        self._run_as_identifiers_stack = None
 
     def push_identity(self, identifiers):
         """
@@ -815,6 +895,8 @@ class DelegatingSubject(subject_abcs.Subject):
         stack.appendleft(identifiers)
         session = self.get_session()
         session.set_internal_attribute(self.run_as_identifiers_session_key, stack)
+        self._run_as_identifiers_stack = stack
+        self._run_as_stack_loaded = True
 
     def pop_identity(self):
         """
@@ -1214,10 +1296,16 @@ class DefaultSubjectFactory(subject_abcs.SubjectFactory):
 
 # moved from its own security_utils module so as to avoid circular importing:
 class SecurityUtils:
+    """
+    The Subject loaded by a SecurityUtils is held local to the execution
+    context that loaded it, so that one SecurityUtils may serve concurrent
+    requests, whether from threads or from asyncio tasks.  It is entered with
+    ``with`` or, from a coroutine, ``async with``.
+    """
 
     def __init__(self, security_manager=None):
         self._security_manager = security_manager
-        self._subject = None
+        self._local = ContextLocal(subject=None)
 
     @property
     def subject(self):
@@ -1238,14 +1326,14 @@ class SecurityUtils:
                                         application configuration because a Subject
                                         should *always* be available to the caller)
         """
-        if not self._subject:
+        if not self._local.subject:
             self.load_subject()
-        return self._subject
+        return self._local.subject
 
     def load_subject(self):
         subject_builder = SubjectBuilder(security_utils=self,
                                          security_manager=self.security_manager)
-        self._subject = subject_builder.build_subject()
+        self._local.subject = subject_builder.build_subject()
 
     @property
     def security_manager(self):
@@ -1264,9 +1352,15 @@ class SecurityUtils:
         self._security_manager.security_utils = self
 
     def __enter__(self):
-        global_security_manager.stack.append(self)
+        global_security_manager.push(self)
         return self
 
     def __exit__(self, exc_type=None, exc_value=None, exc_trace=None):
-        self._subject = None
-        global_security_manager.stack.pop()
+        self._local.subject = None
+        global_security_manager.pop()
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type=None, exc_value=None, exc_trace=None):
+        self.__exit__(exc_type, exc_value, exc_trace)
@@ -22,12 +22,81 @@ import datetime
 import time
 import threading
 
+try:
+    import contextvars
+except ImportError:  # Python < 3.7 without the contextvars backport
+    contextvars = None
+
+
+if contextvars is not None:
+    class ContextLocal:
+        """
+        ContextLocal is new to Yosai.  It holds attributes local to the
+        current execution context, much as threading.local holds attributes
+        local to the current thread, but backed by a contextvars.ContextVar so
+        that coroutines interleaved on one event loop thread, each running in
+        a context of its own, don't see each other's attributes.
+
+        Attributes are kept in a dict that is copied rather than mutated when
+        set, so that setting one within a copied context, such as an asyncio
+        task's, never changes it within the context it was copied from.
+        Without contextvars, ContextLocal falls back to a threading.local.
+        """
+
+        def __init__(self, **defaults):
+            object.__setattr__(self, '_var', contextvars.ContextVar(
+                'ContextLocal-{0}'.format(id(self)), default=None))
+            object.__setattr__(self, '_defaults', defaults)
+
+        def __getattr__(self, name):
+            attributes = self._var.get()
+            if attributes is not None and name in attributes:
+                return attributes[name]
+            try:
+                return self._defaults[name]
+            except KeyError:
+                raise AttributeError(name)
+
+        def __setattr__(self, name, value):
+            attributes = dict(self._var.get() or {})
+            attributes[name] = value
+            self._var.set(attributes)
+
+        def __delattr__(self, name):
+            attributes = dict(self._var.get() or {})
+            attributes.pop(name, None)
+            self._var.set(attributes)
+else:
+    class ContextLocal(threading.local):
+
+        def __init__(self, **defaults):
+            self.__dict__.update(defaults)
+
+
+class ContextStateManager:
+    """
+    ContextStateManager is new to Yosai.  It keeps the stack of SecurityUtils
+    entered within the current execution context, as an immutable tuple, so
+    that each asyncio task (or thread) entering a SecurityUtils sees only its
+    own.
+    """
 
-class ThreadStateManager(threading.local):
     def __init__(self):
-        self.stack = []
+        self._local = ContextLocal(stack=())
 
-global_security_manager = ThreadStateManager()
+    @property
+    def stack(self):
+        return self._local.stack
+
+    def push(self, lib):
+        self._local.stack = self._local.stack + (lib,)
+
+    def pop(self):
+        stack = self._local.stack
+        self._local.stack = stack[:-1]
+        return stack[-1]
+
+global_security_manager = ContextStateManager()
 
 
 def get_current_lib():
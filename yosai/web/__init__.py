@@ -36,6 +36,7 @@ from .exceptions import (
 
 
 from yosai.web.session.session import (
+    CookieSessionStore,
     DefaultWebSessionContext,
     DefaultWebSessionStorageEvaluator,
     DefaultWebSessionManager,
@@ -21,6 +21,7 @@ import logging
 
 from yosai.core import (
     AbstractRememberMeManager,
+    ContextLocal,
     DefaultSubjectFactory,
     NativeSecurityManager,
 )
@@ -101,7 +102,7 @@ class WebSecurityManager(NativeSecurityManager):
                          remember_me_manager=CookieRememberMeManager())
 
         self.subject_store.session_storage_evaluator = DefaultWebSessionStorageEvaluator()
-        self._web_registry = None
+        self._registry = ContextLocal(web_registry=None)
 
     # override base method
     def create_subject_context(self):
@@ -125,12 +126,14 @@ class WebSecurityManager(NativeSecurityManager):
 
     @property
     def web_registry(self):
-        return self._web_registry
+        return self._registry.web_registry
 
     @web_registry.setter
     def web_registry(self, webregistry):
-        self._web_registry = webregistry
+        self._registry.web_registry = webregistry
         self.remember_me_manager.web_registry = webregistry
+        if isinstance(self.session_manager, DefaultWebSessionManager):
+            self.session_manager.web_registry = webregistry
 
     # overidden parent method
     def copy(self, subject_context):
@@ -189,15 +192,16 @@ class CookieRememberMeManager(AbstractRememberMeManager):
     """
 
     def __init__(self):
-        self._web_registry = None
+        super().__init__()
+        self._registry = ContextLocal(web_registry=None)
 
     @property
     def web_registry(self):
-        return self._web_registry
+        return self._registry.web_registry
 
     @web_registry.setter
     def web_registry(self, web_registry):
-        self._web_registry = web_registry
+        self._registry.web_registry = web_registry
 
     def remember_serialized_identity(self, subject, serialized):
         """
@@ -288,12 +292,13 @@ class CookieRememberMeManager(AbstractRememberMeManager):
         #     return None
 
         if base64_rememberme:
-            base64 = self.ensure_padding(base64_rememberme)
+            padded = self.ensure_padding(base64_rememberme)
 
             if logger.getEffectiveLevel() <= logging.DEBUG:
-                logger.debug("Acquired Base64 encoded identity [" + base64 + "]")
+                logger.debug("Acquired Base64 encoded identity [{0}]".
+                             format(padded))
 
-            decoded = base64.b64decode(base64)
+            decoded = base64.b64decode(padded)
 
             if logger.getEffectiveLevel() <= logging.DEBUG:
                 logger.debug("Base64 decoded byte array length: {0} bytes".format(
@@ -318,4 +323,12 @@ class CookieRememberMeManager(AbstractRememberMeManager):
                                 ``SubjectBuilder`` implementation
         """
 
+        try:
+            remembered = self.web_registry.remember_me
+            if remembered:
+                self.forget_cached_identifiers(
+                    base64.b64decode(self.ensure_padding(remembered)))
+        except (AttributeError, TypeError, ValueError):
+            self.forget_cached_identifiers()
+
         del self.web_registry.remember_me  # no use of subject data (TBD)
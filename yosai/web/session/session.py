@@ -19,12 +19,15 @@ under the License.
 import logging
 
 from yosai.core import (
+    ContextLocal,
     DefaultNativeSessionHandler,
     DefaultNativeSessionManager,
     DefaultSessionContext,
     DefaultSessionKey,
     DefaultSessionStorageEvaluator,
     DelegatingSession,
+    SealedSessionStore,
+    mgt_settings,
     session_abcs,
 )
 
@@ -119,6 +122,51 @@ class DefaultWebSessionStorageEvaluator(DefaultSessionStorageEvaluator):
         return web_registry.session_creation_enabled
 
 
+class CookieSessionStore(SealedSessionStore):
+    """
+    CookieSessionStore is new to Yosai.  It keeps each session, sealed, within
+    the session cookie rather than on the server, accessing the cookie through
+    the WebRegistry of the current request.  The web registry is set for each
+    request, by the WebSecurityManager, and is held per execution context.
+    """
+
+    def __init__(self, key, mode='fernet', serialization_manager=None,
+                 deny_list=None):
+        super().__init__(key=key,
+                         mode=mode,
+                         serialization_manager=serialization_manager,
+                         deny_list=deny_list)
+        self._registry = ContextLocal(web_registry=None)
+
+    @property
+    def web_registry(self):
+        return self._registry.web_registry
+
+    @web_registry.setter
+    def web_registry(self, web_registry):
+        self._registry.web_registry = web_registry
+
+    def get_token(self):
+        try:
+            return self.web_registry.session_id
+        except AttributeError:  # no web registry
+            return None
+
+    def set_token(self, token):
+        try:
+            self.web_registry.session_id = token
+        except AttributeError:
+            msg = ("No web registry is available to set the session cookie.  "
+                   "The session won't be carried to the next request.")
+            logger.warning(msg)
+
+    def delete_token(self):
+        try:
+            del self.web_registry.session_id
+        except AttributeError:
+            pass
+
+
 class WebSessionHandler(DefaultNativeSessionHandler):
 
     def __init__(self, session_event_handler, auto_touch=True,
@@ -173,6 +221,34 @@ class DefaultWebSessionManager(DefaultNativeSessionManager):
         self.session_handler = \
             WebSessionHandler(session_event_handler=self.session_event_handler)
 
+    def enable_cookie_sessions(self, key=None, mode='fernet'):
+        """
+        Keeps sessions within the session cookie, sealed by a
+        CookieSessionStore, rather than on the server.  The session cookie
+        then holds the sealed session in place of the session id.
+
+        :param key: the secret that seals sessions, defaulting to the
+                    DEFAULT_CIPHER_KEY of the MGT_CONFIG settings
+        :param mode: 'fernet' to encrypt sessions, or 'hmac' to only sign them
+        """
+        if key is None:
+            key = mgt_settings.default_cipher_key
+
+        self.session_handler.session_store = CookieSessionStore(key=key,
+                                                                mode=mode)
+        # the store sets the cookie, so the handler mustn't set the id:
+        self.session_handler.is_session_id_cookie_enabled = False
+
+    @property
+    def web_registry(self):
+        return getattr(self.session_handler.session_store, 'web_registry', None)
+
+    @web_registry.setter
+    def web_registry(self, web_registry):
+        session_store = self.session_handler.session_store
+        if isinstance(session_store, CookieSessionStore):
+            session_store.web_registry = web_registry
+
     # yosai omits get_referenced_session_id method
 
     def create_exposed_session(self, session, key=None, context=None):
@@ -238,11 +238,11 @@ class WebSecurityUtils(SecurityUtils):
 
     @property
     def web_registry(self):
-        return self._web_registry
+        return self._local.web_registry
 
     @web_registry.setter
     def web_registry(self, web_registry):
-        self._web_registry = web_registry
+        self._local.web_registry = web_registry
         self.security_manager.web_registry = web_registry
 
     # overridden:
@@ -256,13 +256,13 @@ class WebSecurityUtils(SecurityUtils):
         except AttributeError:
             msg = "WebSecurityUtils:  WebSubjectBuilder cannot create a Subject"
             raise MissingWebRegistryException(msg)
-        self._subject = subject_builder.build_subject()
+        self._local.subject = subject_builder.build_subject()
 
     def __call__(self, web_registry):
         self.web_registry = web_registry
         return self
 
     def __exit__(self, exc_type=None, exc_value=None, exc_trace=None):
-        self._subject = None
+        self._local.subject = None
         self.web_registry = None
-        global_security_manager.stack.pop()
+        global_security_manager.pop()